@@ -0,0 +1,218 @@
+"""
+Decoder for the xml output of the gluster cli ( --xml ). The output is
+parsed incrementally and turned into plain dicts and lists in a single
+pass, in the same form as xmltodict would give:
+
+- the attributes of an element are keyed by '@<name>'.
+- an element without children and attributes maps to its stripped text,
+  or None if it is empty.
+- the text of an element having children or attributes is kept under
+  '#text'.
+- repeated elements are collected into a list.
+
+A schema can further shape the output while it is being parsed. It is a
+dict with,
+
+- 'lists': paths of the elements which are always collected into a list,
+  even when the element appears once.
+- 'hooks': map of paths to functions which are called with the decoded
+  value of the element and return the value to be stored instead.
+
+The paths are the '/' joined tags below the cliOutput element, for
+example 'volInfo/volumes/volume'.
+"""
+from xml.etree.ElementTree import XMLPullParser
+
+
+class CliXmlDecoder:
+    """
+    Incremental decoder of the gluster cli xml output. The data can be fed
+    in chunks as it is read from the channel, the elements being decoded
+    and released as soon as they end.
+    """
+
+    def __init__(self, schema: dict = None):
+        """
+        Args:
+            schema (dict): Optional schema with the 'lists' and 'hooks'
+                           applied to the output.
+        """
+        schema = schema or {}
+        self.lists = schema.get('lists', ())
+        self.hooks = schema.get('hooks', {})
+        self._parser = XMLPullParser(events=('start', 'end'))
+        self._path = []
+        self._items = []
+        self._root = None
+
+    def feed(self, data):
+        """
+        Feeds a chunk of the xml output to the decoder.
+        Args:
+            data (str|bytes): The chunk of the output.
+        """
+        self._parser.feed(data)
+        self._process_events()
+
+    def close(self):
+        """
+        Ends the decoding.
+        Returns:
+            The decoded content of the cliOutput element.
+        Raises:
+            xml.etree.ElementTree.ParseError if the output isn't a
+            complete xml document.
+        """
+        self._parser.close()
+        self._process_events()
+        return self._root
+
+    def _process_events(self):
+        """
+        Decodes the elements for which the parser has emitted events.
+        """
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                self._path.append(elem.tag)
+                attrs = {f"@{key}": val for key, val in elem.attrib.items()}
+                self._items.append(attrs or None)
+                continue
+
+            path = '/'.join(self._path[1:])
+            tag = self._path.pop()
+            item = self._items.pop()
+
+            # The text of an element is split between its own text and the
+            # tails of its children.
+            data = [elem.text or '']
+            data.extend([child.tail or '' for child in elem])
+            data = ''.join(data).strip() or None
+            # The tail is text of the parent, which is joined only when the
+            # parent ends, hence it outlives the clearing.
+            tail = elem.tail
+            elem.clear()
+            elem.tail = tail
+
+            if item is None:
+                value = data
+            else:
+                if data is not None:
+                    item['#text'] = data
+                value = item
+            if path in self.hooks:
+                value = self.hooks[path](value)
+
+            if not self._items:
+                self._root = value
+                continue
+            self._push(tag, path, value)
+
+    def _push(self, tag: str, path: str, value):
+        """
+        Adds the decoded value of an element to its parent.
+        """
+        parent = self._items[-1]
+        if parent is None:
+            parent = {}
+            self._items[-1] = parent
+
+        if path in self.lists:
+            parent.setdefault(tag, []).append(value)
+        elif tag not in parent:
+            parent[tag] = value
+        elif isinstance(parent[tag], list):
+            parent[tag].append(value)
+        else:
+            parent[tag] = [parent[tag], value]
+
+
+def decode_cli_xml(data, schema: dict = None):
+    """
+    Decodes the xml output of a gluster cli command.
+    Args:
+        data (str|bytes): The complete xml output.
+        schema (dict): Optional schema applied to the output.
+    Returns:
+        The decoded content of the cliOutput element.
+    """
+    decoder = CliXmlDecoder(schema)
+    decoder.feed(data)
+    return decoder.close()
+
+
+def _volumes_by_name(volumes, key: str, renames: dict = None) -> dict:
+    """
+    Keys the volume entries by the volume name, dropping the name from
+    the entry.
+    """
+    renames = renames or {}
+    vol_dict = {}
+    for volume in volumes:
+        vol_dict[volume[key]] = {renames.get(v_key, v_key): v_val
+                                 for v_key, v_val in volume.items()
+                                 if v_key != key}
+    return vol_dict
+
+
+def _vol_info_volumes(value) -> dict:
+    """
+    Shapes the volumes element of the volume info output.
+    """
+    if value is None or value.get('count') == '0':
+        return {}
+    return _volumes_by_name(value.get('volume', []), 'name')
+
+
+def _vol_info_options(value) -> dict:
+    """
+    Shapes the options of a volume into a dict of the option values.
+    """
+    if value is None:
+        return {}
+    return {option['name']: option['value'] for option in value['option']}
+
+
+def _vol_status_volumes(value):
+    """
+    Shapes the volumes element of the volume status output.
+    """
+    if value is None:
+        return None
+    return _volumes_by_name(value.get('volume', []), 'volName',
+                            {'tasks': 'task_status'})
+
+
+def _vol_status_tasks(value):
+    """
+    Shapes the tasks of a volume into a list of the tasks.
+    """
+    if value is None:
+        return None
+    return value.get('task', [value])
+
+
+VOL_INFO = {
+    'lists': ('volInfo/volumes/volume',
+              'volInfo/volumes/volume/bricks/brick',
+              'volInfo/volumes/volume/options/option'),
+    'hooks': {
+        'volInfo/volumes': _vol_info_volumes,
+        'volInfo/volumes/volume/bricks':
+            lambda value: [] if value is None else value['brick'],
+        'volInfo/volumes/volume/options': _vol_info_options
+    }
+}
+
+VOL_STATUS = {
+    'lists': ('volStatus/volumes/volume',
+              'volStatus/volumes/volume/node',
+              'volStatus/volumes/volume/tasks/task'),
+    'hooks': {
+        'volStatus/volumes': _vol_status_volumes,
+        'volStatus/volumes/volume/tasks': _vol_status_tasks
+    }
+}
+
+HEAL_INFO = {
+    'lists': ('healInfo/bricks/brick',)
+}
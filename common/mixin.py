@@ -41,3 +41,7 @@ class RedantMixin(GlusterdOps, VolumeOps, BrickOps, PeerOps,
         super().__init__(server_config, client_config)
         self.es = es
         self.TEST_RES = res
+        self.invalidate_layout_cache()
+        self.invalidate_cluster_state()
+        self.invalidate_resource_samples()
+        self.invalidate_arequal_cache()
@@ -0,0 +1,59 @@
+"""
+Decoder for the newline delimited json output of the helper scripts, like
+'file_dir_ops.py stat --json' and 'walk_dir.py --json'. Every json line of
+the output is a record. The other lines, like the banners printed by the
+scripts, are skipped.
+
+The records are decoded one line at a time, hence a large output can be
+consumed through the line handler of execute_abstract_op_stream without
+holding it in the memory.
+"""
+import json
+
+
+def decode_ndjson_line(line: str):
+    """
+    Decodes a line of the output.
+    Args:
+        line (str): A line of the output.
+    Returns:
+        The decoded record, or None if the line isn't a json object or
+        array.
+    """
+    line = line.strip()
+    if not line or line[0] not in '{[':
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def iter_ndjson(lines):
+    """
+    Decodes the records in the lines of an output.
+    Args:
+        lines (iterable): Lines of the output.
+    Returns:
+        generator: The decoded records, in order.
+    """
+    for line in lines:
+        record = decode_ndjson_line(line)
+        if record is not None:
+            yield record
+
+
+def ndjson_line_handler(record_handler):
+    """
+    Forms a line handler for execute_abstract_op_stream which passes each
+    decoded record to the record handler.
+    Args:
+        record_handler (func): Called with each record.
+    Returns:
+        func: The line handler.
+    """
+    def _handle_line(line: str):
+        record = decode_ndjson_line(line)
+        if record is not None:
+            record_handler(record)
+    return _handle_line
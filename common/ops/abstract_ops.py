@@ -5,7 +5,9 @@ call the functions in the AbstractOps which in turn
 call the funtions in the remote executioner which is
 responsible for executing commands on the nodes.
 """
+import math
 from collections import OrderedDict
+from common.waiter import remaining_time
 
 
 class AbstractOps:
@@ -16,7 +18,8 @@ class AbstractOps:
     """
 
     def execute_abstract_op_node(self, cmd: str, node: str = None,
-                                 excep: bool = True):
+                                 excep: bool = True,
+                                 xml_schema: dict = None):
         """
         Calls the function in the remote executioner to execute
         commands on the nodes. Logging is also performed along
@@ -31,11 +34,14 @@ class AbstractOps:
                           cmd fails. If set to False the exception is
                           bypassed and value from remote executioner is
                           returned. Defaults to True
+            xml_schema (dict): schema from common.gluster_xml used for
+                               shaping the xml output of the command.
+                               Defaults to None
 
         """
         self.logger.info(f"Running {cmd} on {node}")
 
-        ret = self.execute_command(cmd, node)
+        ret = self.execute_command(cmd, node, xml_schema=xml_schema)
 
         if not excep:
             return ret
@@ -85,3 +91,229 @@ class AbstractOps:
                     raise Exception(each_ret['msg']['opErrstr'])
 
         return ret
+
+    def execute_abstract_op_stream(self, cmd: str, node: str = None,
+                                   line_handler=None, max_lines: int = 1000,
+                                   spill_path: str = None,
+                                   excep: bool = True) -> dict:
+        """
+        Calls the function in the remote executioner to execute a command
+        with a large output, the output being streamed to the line handler
+        instead of being held in the memory. Logging is also performed
+        along with handling exceptions while executing the command.
+        Args:
+            cmd  (str): the command to be executed by the rexe
+        Kwargs:
+            node (str): the node on which the command as to be executed.
+                        If the node is None then the rexe chooses the
+                        node randomly and executes the command on it.
+            line_handler (func): called with each line of the output.
+            max_lines (int): number of the last lines of the output kept
+                             in the msg of the result. Defaults to 1000
+            spill_path (str): local file to which the complete output is
+                              written. Defaults to None
+            excep (bool): exception flag to bypass the exception if the
+                          cmd fails. If set to False the exception is
+                          bypassed and value from remote executioner is
+                          returned. Defaults to True
+        """
+        self.logger.info(f"Running {cmd} on {node} with streamed output")
+
+        ret = self.execute_command_stream(cmd, node, line_handler, max_lines,
+                                          spill_path)
+
+        if excep and ret['error_code'] != 0:
+            self.logger.error(ret['error_msg'])
+            raise Exception(ret['error_msg'])
+
+        return ret
+
+    def _check_batch_ret(self, ret_list: list):
+        """
+        Raises an exception for the first failed command in the results of
+        a batch.
+        Args:
+            ret_list (list): Results of the commands of the batch.
+        """
+        for each_ret in ret_list:
+            if each_ret['error_code'] != 0:
+                self.logger.error(each_ret['error_msg'])
+                raise Exception(each_ret['error_msg'])
+            elif isinstance(each_ret['msg'], (OrderedDict, dict)):
+                if int(each_ret['msg']['opRet']) != 0:
+                    self.logger.error(each_ret['msg']['opErrstr'])
+                    raise Exception(each_ret['msg']['opErrstr'])
+
+    def execute_abstract_op_batch(self, cmd_list: list, node: str = None,
+                                  excep: bool = True,
+                                  xml_schemas: list = None) -> list:
+        """
+        Calls the function in the remote executioner to execute a batch
+        of commands on a node in a single round trip. Logging is also
+        performed along with handling exceptions while executing the
+        commands.
+        Args:
+            cmd_list (list): the commands to be executed by the rexe, in
+                             the order in which they are to be run.
+        Kwargs:
+            node (str): the node on which the commands are to be executed.
+                        If the node is None then the rexe chooses the
+                        node randomly and executes the commands on it.
+            excep (bool): exception flag to bypass the exception if any
+                          of the cmds fails. If set to False the exception
+                          is bypassed and value from remote executioner is
+                          returned. Defaults to True
+            xml_schemas (list): schema from common.gluster_xml for each of
+                                the cmds, used for shaping the xml output.
+                                Defaults to None
+        Returns:
+            list: The result dictionary of each command, in the order of
+                  the commands.
+        """
+        self.logger.info(f"Running batch {cmd_list} on {node}")
+
+        ret = self.execute_command_batch(cmd_list, node,
+                                         xml_schemas=xml_schemas)
+
+        if excep:
+            self._check_batch_ret(ret)
+
+        return ret
+
+    def execute_abstract_op_batch_multinode(self, cmd_list: list,
+                                            node: list = None,
+                                            excep: bool = True) -> dict:
+        """
+        Calls the function in the remote executioner to execute a batch
+        of commands on multiple nodes parallely, making a single round trip
+        to each of the nodes. Logging is also performed along with handling
+        exceptions while executing the commands.
+        Args:
+            cmd_list (list|dict): the commands to be executed by the rexe,
+                                  in the order in which they are to be run.
+                                  A dict maps each node to its own commands,
+                                  in which case the node list is ignored.
+            node (list): the list of nodes on which the commands are to be
+                         executed. If the node is None then the commands are
+                         run in all the nodes.
+            excep (bool): exception flag to bypass the exception if any
+                          of the cmds fails. If set to False the exception
+                          is bypassed and value from remote executioner is
+                          returned. Defaults to True
+        Returns:
+            dict: The node mapped to the list of results of the commands.
+        """
+        self.logger.info(f"Running batch {cmd_list} on {node}")
+
+        ret = self.execute_command_batch_multinode(cmd_list, node)
+
+        if excep:
+            for ret_list in ret.values():
+                self._check_batch_ret(ret_list)
+
+        return ret
+
+    @staticmethod
+    def _form_watch_script(check_cmd: str, timeout: float, interval: float,
+                           watch_paths: list = None) -> str:
+        """
+        Forms the shell loop which waits on a node till the check command
+        succeeds, for ever if the timeout is None. If paths to watch are
+        given and inotifywait is present on the node, the loop sleeps till
+        an entry is created or deleted under them instead of for the
+        interval.
+        """
+        waiter = f"sleep {interval}"
+        if watch_paths:
+            # inotifywait exits with 2 on its own timeout, which needs no
+            # further sleep, and with other codes when it can't watch.
+            waiter = ("inotifywait -qq -t 5 -e create,delete,moved_from,"
+                      f"moved_to {' '.join(watch_paths)} > /dev/null 2>&1"
+                      f" || [ $? -eq 2 ] || sleep {interval}")
+        if timeout is None:
+            return (f"until ( {check_cmd} ) > /dev/null 2>&1\n"
+                    "do\n"
+                    f"    {waiter}\n"
+                    "done")
+        return (f"end=$(( $(date +%s) + {math.ceil(timeout)} ))\n"
+                f"until ( {check_cmd} ) > /dev/null 2>&1\n"
+                "do\n"
+                "    [ \"$(date +%s)\" -lt \"$end\" ] || exit 124\n"
+                f"    {waiter}\n"
+                "done")
+
+    def wait_for_remote_conditions(self, conditions: list, timeout: float,
+                                   interval: float = 0.2) -> bool:
+        """
+        Waits till the conditions hold on the nodes. Each condition is
+        polled by a loop running on its node, which ends as soon as the
+        condition holds, hence a wait takes a single round trip per node
+        and the flip is noticed within the interval.
+        Args:
+            conditions (list): Conditions as dicts with the keys,
+                               'node': Node on which the condition is
+                                       checked.
+                               'cmd': Command which succeeds when the
+                                      condition holds.
+                               'watch': Optional list of directories on the
+                                        node whose changes wake the loop.
+            timeout (float): Time in seconds within which all the
+                             conditions have to hold. It is clamped to the
+                             ambient deadline, if any. If None and no
+                             deadline is active, the wait is unbounded.
+        Kwargs:
+            interval (float): Interval in seconds between two checks on a
+                              node. Default is 0.2
+        Returns:
+            bool: True if all the conditions held within the timeout.
+        """
+        timeout = remaining_time(timeout)
+        async_objs = []
+        for cond in conditions:
+            script = self._form_watch_script(cond['cmd'], timeout, interval,
+                                             cond.get('watch'))
+            async_objs.append(self.execute_command_async(script,
+                                                         cond['node']))
+        if not all(async_objs):
+            self.logger.error("Failed to start the waits for "
+                              f"{conditions}")
+            return False
+
+        # A little leeway for the loops on the nodes to time out on their
+        # own, the ones which don't are cancelled.
+        ret = self.wait_for_async_commands(
+            async_objs, None if timeout is None else timeout + 5, True)
+        status = True
+        for (cond, async_obj, ret_dict) in zip(conditions, async_objs, ret):
+            if ret_dict['error_code'] == -1:
+                self.cancel_async_command(async_obj)
+            if ret_dict['error_code'] != 0:
+                self.logger.error(f"Condition {cond['cmd']} didn't hold on "
+                                  f"{cond['node']}")
+                status = False
+        return status
+
+    def wait_for_remote_condition(self, check_cmd: str, node,
+                                  timeout: float, interval: float = 0.2,
+                                  watch_paths: list = None) -> bool:
+        """
+        Waits till a command succeeds on the node(s), through
+        wait_for_remote_conditions.
+        Args:
+            check_cmd (str): Command which succeeds when the condition
+                             holds.
+            node (str|list): Node(s) on which the condition is checked.
+            timeout (float): Time in seconds within which the condition has
+                             to hold.
+        Kwargs:
+            interval (float): Interval in seconds between two checks.
+            watch_paths (list): Directories whose changes wake the check.
+        Returns:
+            bool: True if the condition held on all the nodes.
+        """
+        if not isinstance(node, list):
+            node = [node]
+        conditions = [{'node': nd, 'cmd': check_cmd, 'watch': watch_paths}
+                      for nd in node]
+        return self.wait_for_remote_conditions(conditions, timeout,
+                                               interval)
@@ -3,10 +3,11 @@ Brick ops module deals with the functions related to brick related operations.
 """
 # pylint: disable=too-many-lines
 
-from time import sleep
+from time import time
 import random
 import re
 from common.ops.abstract_ops import AbstractOps
+from common.waiter import wait_until
 
 
 class BrickOps(AbstractOps):
@@ -72,6 +73,8 @@ class BrickOps(AbstractOps):
                 server_brick[node] = []
             server_brick[node].append(bpath)
         self.es.add_bricks_to_brickdata(volname, server_brick)
+        self.invalidate_layout_cache(volname)
+        self.invalidate_cluster_state()
 
         return ret
 
@@ -122,6 +125,10 @@ class BrickOps(AbstractOps):
         if not excep and ret['msg']['opRet'] != '0':
             return ret
 
+        # The layout is rewritten from remove-brick start onwards.
+        self.invalidate_layout_cache(volname)
+        self.invalidate_cluster_state()
+
         if option in ['commit', 'force']:
             server_brick = {}
             for brickd in brick_list:
@@ -192,28 +199,31 @@ class BrickOps(AbstractOps):
         if not isinstance(bricks_list, list):
             bricks_list = [bricks_list]
 
-        count = 0
-        while count < timeout:
+        start = time()
+        status = None
+
+        def _remove_brick_ended():
+            nonlocal status
             status_info = self.get_remove_brick_status(node, volname,
                                                        bricks_list)
             if status_info is None:
-                return False
-
-            status = status_info['aggregate']['statusStr']
-            if status == 'completed':
-                self.logger.info("Remove brick is successfully completed in "
-                                 f"{count} sec")
+                status = None
                 return True
-            elif status == 'failed':
-                self.logger.error("Remove brick failed on one or more nodes. "
-                                  "Check remove brick status for more details")
-                return False
-            else:
-                sleep(10)
-                count += 10
-                self.logger.info("Remove brick operation has not completed. "
-                                 f"Wait timeout is {count}")
+            status = status_info['aggregate']['statusStr']
+            return status in ('completed', 'failed')
+
+        if not wait_until(_remove_brick_ended, timeout, max_interval=5):
+            self.logger.info("Remove brick operation has not completed. "
+                             f"Wait timeout is {timeout}")
+            return False
 
+        if status == 'completed':
+            self.logger.info("Remove brick is successfully completed in "
+                             f"{int(time() - start)} sec")
+            return True
+        elif status == 'failed':
+            self.logger.error("Remove brick failed on one or more nodes. "
+                              "Check remove brick status for more details")
         return False
 
     def replace_brick(self, node: str, volname: str,
@@ -252,6 +262,8 @@ class BrickOps(AbstractOps):
 
         self.es.replace_brick_from_brickdata(volname, src_brick,
                                              dest_brick)
+        self.invalidate_layout_cache(volname)
+        self.invalidate_cluster_state()
 
         return ret
 
@@ -855,7 +867,7 @@ class BrickOps(AbstractOps):
         if not isinstance(bricks_list, list):
             bricks_list = [bricks_list]
 
-        vol_status = self.get_volume_status(volname, node)
+        vol_status = self.get_cached_volume_status(volname, node)
 
         vol_status_brick_list = []
         for n in vol_status[volname]['node']:
@@ -902,7 +914,7 @@ class BrickOps(AbstractOps):
         if not isinstance(bricks_list, list):
             bricks_list = [bricks_list]
 
-        vol_status = self.get_volume_status(volname, node)
+        vol_status = self.get_cached_volume_status(volname, node)
 
         vol_status_brick_list = []
         for brick in vol_status[volname]['node']:
@@ -976,7 +988,7 @@ class BrickOps(AbstractOps):
             NoneType: None on failure.
         """
 
-        vol_info = self.get_volume_info(node, volname)
+        vol_info = self.get_cached_volume_info(node, volname)
         if vol_info is None:
             self.logger.error(f"Unable to get "
                               f"the volinfo of {volname}.")
@@ -1010,7 +1022,8 @@ class BrickOps(AbstractOps):
         """
         online_bricks_list = []
         try:
-            volume_status = self.get_volume_status(volname, node)
+            volume_status = self.get_cached_volume_status(volname,
+                                                          node)
         except Exception as error:
             self.logger.info(f"Volume status failed: {error}")
             return None
@@ -1054,7 +1067,8 @@ class BrickOps(AbstractOps):
         offline_bricks_list = []
         all_bricks = self.get_all_bricks(volname, node)
         try:
-            volume_status = self.get_volume_status(volname, node)
+            volume_status = self.get_cached_volume_status(volname,
+                                                          node)
         except Exception as error:
             self.logger.info(f"Volume status failed: {error}")
             return all_bricks
@@ -1110,16 +1124,19 @@ class BrickOps(AbstractOps):
         for brickd in brick_list:
             if brickd.split(':')[0] not in nd_list:
                 nd_list.append(brickd.split(':')[0])
-        itr = 0
-        while itr < timeout:
+        offline_brick_list = None
+
+        def _bricks_offline():
+            nonlocal offline_brick_list
+            self.invalidate_cluster_state()
             random_node = random.choice(nd_list)
             offline_brick_list = self.get_offline_bricks_list(volname,
                                                               random_node)
-            if offline_brick_list is not None and\
-                    set(brick_list).issubset(set(offline_brick_list)):
-                return True
-            itr += 5
-            sleep(5)
+            return (offline_brick_list is not None
+                    and set(brick_list).issubset(set(offline_brick_list)))
+
+        if wait_until(_bricks_offline, timeout):
+            return True
         self.logger.error(f"Current offline brick list : {offline_brick_list}"
                           " Compared to expected offline brick list :"
                           f" {brick_list}")
@@ -1147,16 +1164,19 @@ class BrickOps(AbstractOps):
         if not isinstance(brick_list, list):
             brick_list = [brick_list]
 
-        itr = 0
-        while itr < timeout:
+        online_brick_list = None
+
+        def _bricks_online():
+            nonlocal online_brick_list
+            self.invalidate_cluster_state()
             random_node = random.choice(server_list)
             online_brick_list = self.get_online_bricks_list(volname,
                                                             random_node)
-            if online_brick_list is not None and\
-                    set(brick_list).issubset(set(online_brick_list)):
-                return True
-            itr += 5
-            sleep(5)
+            return (online_brick_list is not None
+                    and set(brick_list).issubset(set(online_brick_list)))
+
+        if wait_until(_bricks_online, timeout):
+            return True
 
         self.logger.error(f"Current online brick list : {online_brick_list}"
                           " Compared to expected online brick list :"
@@ -1192,6 +1212,7 @@ class BrickOps(AbstractOps):
             cmd = (f"pid=`ps -ef | grep -ve 'grep' | grep -e '{nd}{path}.pid' "
                    " | awk '{print $2}'` && kill -15 $pid || kill -9 $pid")
             ret = self.execute_abstract_op_node(cmd, nd, False)
+            self.invalidate_cluster_state()
             if ret['error_code'] != 0:
                 self.logger.error(f"Failed to bring {brick_list} offline."
                                   f" As {cmd} failed on {nd}")
@@ -1244,6 +1265,7 @@ class BrickOps(AbstractOps):
                 self.restart_glusterd(nd)
                 self.wait_for_glusterd_to_start(nd)
 
+        self.invalidate_cluster_state()
         self.wait_till_all_peers_connected(server_list)
 
         # Wait till all said bricks are online.
@@ -1590,8 +1612,10 @@ class BrickOps(AbstractOps):
         time_counter = 240
         self.logger.debug("The heal monitoring timeout is : "
                           f" {(time_counter // 60)} minutes")
+        failed = False
 
-        while time_counter > 0:
+        def _xattr_in_sync():
+            nonlocal failed
             attr_vals = {}
             for brick in bricks_list:
                 brick_node, brick_path = brick.split(":")
@@ -1600,14 +1624,12 @@ class BrickOps(AbstractOps):
                      f"{brick_path}/{file_path}", attr_name=xattr))
                 if not attr_vals[brick]:
                     self.logger.error("Failed to get extended attributes")
+                    failed = True
                     return False
 
             ec_version_vals = [list(val.values())[0][xattr] for val in
                                list(attr_vals.values())]
-            if len(set(ec_version_vals)) == 1:
-                return True
-            else:
-                sleep(20)
-                time_counter -= 20
+            return len(set(ec_version_vals)) == 1
 
-        return False
+        return bool(wait_until(_xattr_in_sync, time_counter, interval=1,
+                               max_interval=20, abort=lambda: failed))
@@ -0,0 +1,180 @@
+"""
+Local implementation of the Davies-Meyer hash used by gluster's DHT
+( gf_dm_hashfn in libglusterfs/src/hashfn.c ) to place the entries on
+the subvols. Computing it locally saves a remote round trip per name.
+"""
+import ctypes
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DM_DELTA = 0x9E3779B9
+DM_FULLROUNDS = 10
+DM_PARTROUNDS = 6
+DM_H0 = 0x9464a485
+DM_H1 = 0x542e1a94
+MASK32 = 0xffffffff
+
+
+def _to_bytes(name) -> bytes:
+    """
+    Returns the bytes which are fed to the hash function for a name.
+    """
+    if isinstance(name, bytes):
+        return name
+    return str(name).encode('utf-8')
+
+
+def _pad(length: int) -> int:
+    """
+    The pad word used for filling up the last quad.
+    """
+    pad = (length | (length << 8)) & MASK32
+    return (pad | (pad << 16)) & MASK32
+
+
+def _char(byte: int) -> int:
+    """
+    The C function reads the tail bytes through a signed char, hence bytes
+    above 0x7f are sign extended before being or'd into the word.
+    """
+    if byte > 0x7f:
+        return (byte | 0xffffff00) & MASK32
+    return byte
+
+
+def _quads(msg: bytes) -> list:
+    """
+    Splits the message into the quads of 32 bit words on which the rounds
+    are run, the last quad being the padded one.
+    """
+    length = len(msg)
+    full_words = length // 4
+    words = list(struct.unpack(f"<{full_words}I", msg[:full_words * 4]))
+
+    quads = []
+    full_quads = length // 16
+    for i in range(full_quads):
+        quads.append(words[i * 4:i * 4 + 4])
+    words = words[full_quads * 4:]
+
+    pad = _pad(length)
+    tail = msg[full_words * 4:]
+    last = []
+    for j in range(4):
+        if words:
+            last.append(words.pop(0))
+        else:
+            value = pad
+            for byte in tail:
+                value = ((value << 8) | _char(byte)) & MASK32
+            tail = b''
+            last.append(value)
+    quads.append(last)
+    return quads
+
+
+def _dm_round(rounds: int, array: list, h0: int, h1: int) -> tuple:
+    """
+    A single Davies-Meyer round over a quad.
+    """
+    b0 = h0
+    b1 = h1
+    hsum = 0
+    for _ in range(rounds):
+        hsum = (hsum + DM_DELTA) & MASK32
+        b0 = (b0 + ((((b1 << 4) + array[0]) & MASK32)
+                    ^ ((b1 + hsum) & MASK32)
+                    ^ (((b1 >> 5) + array[1]) & MASK32))) & MASK32
+        b1 = (b1 + ((((b0 << 4) + array[2]) & MASK32)
+                    ^ ((b0 + hsum) & MASK32)
+                    ^ (((b0 >> 5) + array[3]) & MASK32))) & MASK32
+    return (h0 + b0) & MASK32, (h1 + b1) & MASK32
+
+
+def dm_hashfn(name) -> int:
+    """
+    Computes the DHT hash of a name.
+    Args:
+        name (str|bytes): The file or directory name.
+    Returns:
+        int: The 32 bit hash value.
+    """
+    h0 = DM_H0
+    h1 = DM_H1
+    quads = _quads(_to_bytes(name))
+    for quad in quads[:-1]:
+        h0, h1 = _dm_round(DM_PARTROUNDS, quad, h0, h1)
+    h0, h1 = _dm_round(DM_FULLROUNDS, quads[-1], h0, h1)
+    return h0 ^ h1
+
+
+def _dm_hashfn_vector(msgs: list) -> list:
+    """
+    Computes the hash of a set of messages of the same length, running
+    the rounds over numpy arrays holding one lane per message.
+    """
+    quads = np.array([_quads(msg) for msg in msgs], dtype=np.uint32)
+    h0 = np.full(len(msgs), DM_H0, dtype=np.uint32)
+    h1 = np.full(len(msgs), DM_H1, dtype=np.uint32)
+    nquads = quads.shape[1]
+    for qidx in range(nquads):
+        rounds = DM_FULLROUNDS if qidx == nquads - 1 else DM_PARTROUNDS
+        arr = quads[:, qidx, :]
+        b0 = h0.copy()
+        b1 = h1.copy()
+        hsum = np.uint32(0)
+        for _ in range(rounds):
+            hsum = np.uint32((int(hsum) + DM_DELTA) & MASK32)
+            b0 += (((b1 << 4) + arr[:, 0]) ^ (b1 + hsum)
+                   ^ ((b1 >> 5) + arr[:, 1]))
+            b1 += (((b0 << 4) + arr[:, 2]) ^ (b0 + hsum)
+                   ^ ((b0 >> 5) + arr[:, 3]))
+        h0 += b0
+        h1 += b1
+    return [int(value) for value in (h0 ^ h1)]
+
+
+def dm_hashfn_batch(names: list) -> list:
+    """
+    Computes the DHT hash of a list of names in one call. When numpy is
+    available the names are grouped by length and hashed as vectors.
+    Args:
+        names (list): List of file or directory names.
+    Returns:
+        list: Hash values in the same order as the names.
+    """
+    msgs = [_to_bytes(name) for name in names]
+    if np is None:
+        return [dm_hashfn(msg) for msg in msgs]
+
+    groups = {}
+    for index, msg in enumerate(msgs):
+        groups.setdefault(len(msg), []).append(index)
+
+    hashes = [0] * len(msgs)
+    for indices in groups.values():
+        values = _dm_hashfn_vector([msgs[index] for index in indices])
+        for index, value in zip(indices, values):
+            hashes[index] = value
+    return hashes
+
+
+def libglusterfs_hashfn(name):
+    """
+    Computes the hash through the gf_dm_hashfn of libglusterfs.so.0, if the
+    library can be loaded in this process.
+    Args:
+        name (str|bytes): The file or directory name.
+    Returns:
+        int: The hash value or None if the library isn't available.
+    """
+    try:
+        glusterfs = ctypes.cdll.LoadLibrary("libglusterfs.so.0")
+    except OSError:
+        return None
+    msg = _to_bytes(name)
+    return ctypes.c_uint32(glusterfs.gf_dm_hashfn(msg, len(msg))).value
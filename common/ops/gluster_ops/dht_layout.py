@@ -0,0 +1,200 @@
+"""
+Analysis of the DHT layouts of a directory tree. The hash ranges of all
+the directories are held in one range table, a set of numpy arrays with
+a row per directory and subvol, so that the holes, the overlaps and the
+shares of the subvols of a whole tree are found in a single pass instead
+of a walk over the ranges of each directory.
+
+The layouts are given as a dict of the directories mapped to the hash
+range of each of their subvols,
+
+    {'/mnt/vol/dir1': {'server1:/bricks/brick1/vol_b0/dir1': (0, 2147483646),
+                       'server2:/bricks/brick1/vol_b1/dir1':
+                           (2147483647, 4294967295)}}
+
+A zeroed range, i.e. (0, 0), is that of a subvol having no share of the
+directory and is left out. Identical ranges of a directory are taken as
+the replicas of a subvol and counted once.
+"""
+import numpy as np
+
+HASH_MAX = 0xffffffff
+HASH_SPACE = HASH_MAX + 1
+
+
+def parse_dht_xattr(value: str) -> tuple:
+    """
+    Parses the hash range out of the hex encoded trusted.glusterfs.dht
+    xattr of a directory.
+    Args:
+        value (str): The hex value, e.g. '0x000000010000000000000000ffffffff'
+    Returns:
+        tuple: (low, high) of the hash range.
+    """
+    # The range is held by the trailing 16 hex digits.
+    trailing_hash_hex = value.strip()[-16:]
+    return (int(trailing_hash_hex[0:8], 16), int(trailing_hash_hex[-8:], 16))
+
+
+def build_range_table(layouts: dict) -> dict:
+    """
+    Builds the range table of a set of directory layouts.
+    Args:
+        layouts (dict): The directories mapped to the hash range of each
+                        of their subvols.
+    Returns:
+        dict: The table, with the 'dirs' and 'subvols' lists and the
+              'dir', 'subvol', 'low' and 'high' arrays, the first two
+              holding the indices into the lists.
+    """
+    dirs = list(layouts)
+    subvols = {}
+    rows = []
+    for (dir_index, dirpath) in enumerate(dirs):
+        for (subvol, hashrange) in layouts[dirpath].items():
+            if hashrange is None:
+                continue
+            sub_index = subvols.setdefault(subvol, len(subvols))
+            rows.append((dir_index, sub_index, hashrange[0], hashrange[1]))
+
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 4)
+    return {'dirs': dirs, 'subvols': list(subvols),
+            'dir': columns[:, 0], 'subvol': columns[:, 1],
+            'low': columns[:, 2], 'high': columns[:, 3]}
+
+
+def _group_bounds(group: np.ndarray) -> tuple:
+    """
+    Marks the first and the last row of each group of a sorted column.
+    """
+    first = np.ones(len(group), dtype=bool)
+    first[1:] = group[1:] != group[:-1]
+    last = np.ones(len(group), dtype=bool)
+    last[:-1] = first[1:]
+    return (first, last)
+
+
+def _collect(report: dict, dirs: list, dir_col, starts, ends):
+    """
+    Adds the (start, end) ranges to the lists of their directories.
+    """
+    for (dir_index, start, end) in zip(dir_col.tolist(), starts.tolist(),
+                                       ends.tolist()):
+        report.setdefault(dirs[dir_index], []).append((start, end))
+
+
+def analyze_range_table(table: dict, tolerance: float = 0.1) -> dict:
+    """
+    Finds the holes, the overlaps and the imbalance of all the layouts of
+    a range table at once.
+    Args:
+        table (dict): The range table, as built by build_range_table.
+        tolerance (float): The spread of the shares of the subvols of a
+                           directory, relative to their mean share, up to
+                           which the layout is taken as balanced.
+    Returns:
+        dict: The report of the form,
+            {
+              'dirs': number of directories,
+              'holes': {dir: [(start, end), ...]},
+              'overlaps': {dir: [(start, end), ...]},
+              'incomplete': [dirs having holes or overlaps],
+              'unbalanced': {dir: spread} for the dirs above tolerance,
+              'imbalance': {'mean': .., 'max': .., 'max_dir': ..},
+              'subvol_share': {subvol: mean fraction of the hash space
+                               held per directory}
+            }
+    """
+    dirs = table['dirs']
+    report = {'dirs': len(dirs), 'holes': {}, 'overlaps': {},
+              'incomplete': [], 'unbalanced': {},
+              'imbalance': {'mean': 0.0, 'max': 0.0, 'max_dir': None},
+              'subvol_share': {}}
+    if not dirs:
+        return report
+
+    keep = ~((table['low'] == 0) & (table['high'] == 0))
+    dir_col = table['dir'][keep]
+    sub_col = table['subvol'][keep]
+    low = table['low'][keep]
+    high = table['high'][keep]
+
+    width = high - low + 1
+    share = np.bincount(sub_col, weights=width,
+                        minlength=len(table['subvols']))
+    share = share / (HASH_SPACE * len(dirs))
+    report['subvol_share'] = dict(zip(table['subvols'], share.tolist()))
+
+    order = np.lexsort((high, low, dir_col))
+    dir_col = dir_col[order]
+    low = low[order]
+    high = high[order]
+    replica = np.zeros(len(dir_col), dtype=bool)
+    replica[1:] = ((dir_col[1:] == dir_col[:-1]) & (low[1:] == low[:-1])
+                   & (high[1:] == high[:-1]))
+    dir_col = dir_col[~replica]
+    low = low[~replica]
+    high = high[~replica]
+    (first, last) = _group_bounds(dir_col)
+
+    # The furthest hash covered so far within each directory. The
+    # directories are spaced apart so that the running maximum doesn't
+    # carry over from one directory to the next.
+    offset = dir_col * (2 * HASH_SPACE)
+    reach = np.maximum.accumulate(high + offset) - offset
+    prev_reach = np.empty_like(reach)
+    prev_reach[0] = -1
+    prev_reach[1:] = reach[:-1]
+    prev_reach[first] = -1
+
+    hole = low > prev_reach + 1
+    _collect(report['holes'], dirs, dir_col[hole], prev_reach[hole] + 1,
+             low[hole] - 1)
+    tail = last & (reach < HASH_MAX)
+    _collect(report['holes'], dirs, dir_col[tail], reach[tail] + 1,
+             np.full(int(tail.sum()), HASH_MAX))
+    overlap = ~first & (low <= prev_reach)
+    _collect(report['overlaps'], dirs, dir_col[overlap], low[overlap],
+             np.minimum(prev_reach[overlap], high[overlap]))
+
+    # A directory without any range is a hole as a whole.
+    covered = np.zeros(len(dirs), dtype=bool)
+    covered[dir_col] = True
+    for dir_index in np.flatnonzero(~covered).tolist():
+        report['holes'][dirs[dir_index]] = [(0, HASH_MAX)]
+
+    report['incomplete'] = [dirpath for dirpath in dirs
+                            if dirpath in report['holes']
+                            or dirpath in report['overlaps']]
+
+    if len(dir_col):
+        starts = np.flatnonzero(first)
+        width = (high - low + 1).astype(np.float64)
+        max_share = np.maximum.reduceat(width, starts)
+        min_share = np.minimum.reduceat(width, starts)
+        mean_share = np.add.reduceat(width, starts) / np.diff(
+            np.append(starts, len(width)))
+        spread = (max_share - min_share) / mean_share
+        spread_dirs = dir_col[starts]
+        worst = int(np.argmax(spread))
+        report['imbalance'] = {'mean': float(spread.mean()),
+                               'max': float(spread[worst]),
+                               'max_dir': dirs[int(spread_dirs[worst])]}
+        above = spread > tolerance
+        report['unbalanced'] = dict(zip(
+            [dirs[index] for index in spread_dirs[above].tolist()],
+            spread[above].tolist()))
+    return report
+
+
+def analyze_layouts(layouts: dict, tolerance: float = 0.1) -> dict:
+    """
+    Analyzes a set of directory layouts in one pass.
+    Args:
+        layouts (dict): The directories mapped to the hash range of each
+                        of their subvols.
+        tolerance (float): As for analyze_range_table.
+    Returns:
+        dict: The report, as returned by analyze_range_table.
+    """
+    return analyze_range_table(build_range_table(layouts), tolerance)
@@ -6,9 +6,14 @@ hashing, layout and so on.
 # pylint: disable=no-name-in-module
 
 import os
-# import ctypes
 import socket
+import stat
 import common.ops.gluster_ops.constants as c
+from common.ndjson import ndjson_line_handler
+from common.ops.gluster_ops.dht_hash import (dm_hashfn, dm_hashfn_batch,
+                                             libglusterfs_hashfn)
+from common.ops.gluster_ops.dht_layout import (analyze_layouts,
+                                               parse_dht_xattr)
 from common.ops.abstract_ops import AbstractOps
 
 
@@ -39,18 +44,153 @@ class DHTOps(AbstractOps):
                               f"Error: {ret['error_msg']}")
             return None
 
-        full_hash_hex = ret['msg'][0].strip()
-        # Grab the trailing 16 hex bytes
-        trailing_hash_hex = full_hash_hex[-16:]
-        # Split the full hash into low and high
-        hash_range_low = int(trailing_hash_hex[0:8], 16)
-        hash_range_high = int(trailing_hash_hex[-8:], 16)
+        return list(parse_dht_xattr(ret['msg'][0]))
 
-        return [hash_range_low, hash_range_high]
+    def invalidate_layout_cache(self, volname: str = None):
+        """
+        Drops the cached DHT layout data of a volume. The cache has to be
+        invalidated whenever the layout of the volume can change, i.e. on
+        volume create and delete, add-brick, remove-brick, replace-brick,
+        rebalance, fix-layout and on setting or removing the
+        trusted.glusterfs.dht xattr.
+
+        Args:
+            volname (str): Optional parameter with default value None. If
+                           None, the cached data of all volumes is dropped.
+        """
+        if volname is None:
+            self.layout_cache = {}
+            self.layout_vol_meta = {}
+            self.layout_brick_roots = {}
+            return
+
+        self.layout_cache = {key: entry for (key, entry)
+                             in self.layout_cache.items()
+                             if key[0] != volname}
+        self.layout_vol_meta.pop(volname, None)
+        self.layout_brick_roots = {root: vol for (root, vol)
+                                   in self.layout_brick_roots.items()
+                                   if vol != volname}
+
+    @staticmethod
+    def _brickdir_key(brickdir_path: str) -> str:
+        """
+        Normalizes a brickdir path to the ip:path form used as the
+        layout cache key.
+        """
+        host, fqpath = brickdir_path.split(':')
+        host = socket.gethostbyname(host)
+        return f"{host}:{os.path.normpath(fqpath)}"
+
+    def _find_brick_root(self, brickdir_key: str) -> str:
+        """
+        Finds the brick, out of the known brick roots, under which the
+        brickdir lies.
+        """
+        brick_root = None
+        for root in self.layout_brick_roots:
+            if (brickdir_key == root or brickdir_key.startswith(f"{root}/")):
+                if brick_root is None or len(root) > len(brick_root):
+                    brick_root = root
+        return brick_root
+
+    def _get_brickdir_volume(self, brickdir_path: str) -> tuple:
+        """
+        Finds the volume and the brick to which a brickdir belongs. The
+        brick roots of all the volumes are refreshed on a miss.
+
+        Args:
+            brickdir_path (str): path of the directory as returned from
+                                 pathinfo
+
+        Returns:
+            tuple: (volname, brick_root) or (None, None) if not found.
+        """
+        brickdir_key = self._brickdir_key(brickdir_path)
+        brick_root = self._find_brick_root(brickdir_key)
+        if brick_root is None:
+            host = brickdir_key.split(':')[0]
+            volume_list = self.get_volume_list(host)
+            for volume in (volume_list or []):
+                brick_list = self.get_all_bricks(volume, host)
+                for brick in (brick_list or []):
+                    self.layout_brick_roots[self._brickdir_key(brick)] = \
+                        volume
+            brick_root = self._find_brick_root(brickdir_key)
+            if brick_root is None:
+                return (None, None)
+        return (self.layout_brick_roots[brick_root], brick_root)
+
+    def get_layout_vol_meta(self, brickdir_path: str) -> dict:
+        """
+        Get the gluster version and the volume type for the volume to
+        which the brickdir belongs. The values are cached per volume.
+
+        Args:
+            brickdir_path (str): path of the directory as returned from
+                                 pathinfo
+            (e.g., server1.example.com:/bricks/brick1/testdir1)
+
+        Returns:
+            dict with keys 'version' and 'voltype'.
+        """
+        volname, _ = self._get_brickdir_volume(brickdir_path)
+        if volname is not None and volname in self.layout_vol_meta:
+            return self.layout_vol_meta[volname]
+
+        host, _ = brickdir_path.split(':')
+        host = socket.gethostbyname(host)
+        meta = {"version": self.get_gluster_version(host),
+                "voltype": self.get_volume_type_from_brickpath(
+                    brickdir_path)}
+        if volname is not None:
+            self.layout_vol_meta[volname] = meta
+        return meta
+
+    def _fill_layout_cache(self, volname: str, rel_path: str, meta: dict):
+        """
+        Reads the trusted.glusterfs.dht xattr of a directory on all the
+        bricks of a volume, using one getfattr per node, and populates
+        the layout cache.
+
+        Args:
+            volname (str): Name of the volume
+            rel_path (str): Path of the directory relative to brick root.
+            meta (dict): The version and volume type of the volume.
+        """
+        node_paths = {}
+        for (root, vol) in self.layout_brick_roots.items():
+            if vol != volname:
+                continue
+            host, fqpath = root.split(':')
+            node_paths.setdefault(host, []).append(
+                os.path.normpath(f"{fqpath}/{rel_path}"))
+
+        for (host, paths) in node_paths.items():
+            path_str = " ".join([f"'{path}'" for path in paths])
+            cmd = (f"getfattr --absolute-names -n trusted.glusterfs.dht "
+                   f"-e hex {path_str} 2> /dev/null")
+            ret = self.execute_abstract_op_node(cmd, host, False)
+
+            fqpath = None
+            for line in ret['msg']:
+                line = line.strip()
+                if line.startswith("# file:"):
+                    fqpath = line[len("# file:"):].strip()
+                elif (line.startswith("trusted.glusterfs.dht=")
+                      and fqpath is not None):
+                    self.layout_cache[(volname, f"{host}:{fqpath}")] = {
+                        "hashrange": list(parse_dht_xattr(
+                            line.split('=')[1])),
+                        "version": meta["version"],
+                        "voltype": meta["voltype"]}
+                    fqpath = None
 
     def get_hashrange(self, brickdir_path: str) -> list:
         """
-        Get the int hash range for a brick.
+        Get the int hash range for a brick. The hash ranges are served from
+        the layout cache which is filled for all the bricks of the volume
+        at once on a miss.
 
         Note:
             If the Gluster version is equal to or greater than 6, the hash
@@ -75,23 +215,34 @@ class DHTOps(AbstractOps):
             list containing the low and high hash for the brickdir.
             None on fail.
         """
-        host, _ = brickdir_path.split(':')
-        host = socket.gethostbyname(host)
-        ver = self.get_gluster_version(host)
-        ret = self.get_volume_type_from_brickpath(brickdir_path)
-        if ret in ('Replicate', 'Disperse', 'Arbiter') and float(ver) >= 6.0:
+        volname, brick_root = self._get_brickdir_volume(brickdir_path)
+        meta = self.get_layout_vol_meta(brickdir_path)
+        if (meta['voltype'] in ('Replicate', 'Disperse', 'Arbiter')
+                and float(meta['version']) >= 6.0):
             self.logger.info("Cannot find hash-range for Replicate/Disperse/"
                              "Arbiter volume type")
             return None
-        else:
+
+        if volname is None:
             ret = self.check_hashrange(brickdir_path)
             if ret is None:
                 self.logger.error("Could not get hashrange")
-                return None
+            return ret
+
+        brickdir_key = self._brickdir_key(brickdir_path)
+        if (volname, brickdir_key) not in self.layout_cache:
+            rel_path = brickdir_key[len(brick_root):].lstrip('/')
+            self._fill_layout_cache(volname, rel_path, meta)
+
+        entry = self.layout_cache.get((volname, brickdir_key))
+        if entry is None:
+            # Fall back to reading the brickdir on its own.
+            ret = self.check_hashrange(brickdir_path)
+            if ret is None:
+                self.logger.error("Could not get hashrange")
+            return ret
 
-            hash_range_low = ret[0]
-            hash_range_high = ret[1]
-            return [hash_range_low, hash_range_high]
+        return list(entry['hashrange'])
 
     def hashrange_contains_hash(self, brickdir_path: str,
                                 filehash: int) -> bool:
@@ -143,48 +294,30 @@ class DHTOps(AbstractOps):
         # append the dirpath to the elements in the list
         final_subvols_list = [x + dirpath for x in trim_subvols_list]
 
-        complete_hash_list = []
-        for fqpath in final_subvols_list:
-            hash_list = self.get_hashrange(fqpath)
-            complete_hash_list.append(hash_list)
-
-        joined_hashranges = [y for x in complete_hash_list for y in x]
-
-        # remove duplicate hashes
-        collapsed_ranges = list(set(joined_hashranges))
-
-        # sort the range list for good measure
-        collapsed_ranges.sort()
-
-        # first hash in the list is 0?
-        if collapsed_ranges[0] != 0:
-            self.logger.error(f"First hash in range ({collapsed_ranges[0]}) "
-                              "is not zero")
-            return False
-
-        # last hash in the list is 32-bits high?
-        if collapsed_ranges[-1] != int(0xffffffff):
-            self.logger.error("Last hash in ranges "
-                              f"({hex(collapsed_ranges[-1])}) is not "
-                              "0xffffffff")
-            return False
+        hashranges = {fqpath: self.get_hashrange(fqpath)
+                      for fqpath in final_subvols_list}
+        report = analyze_layouts({dirpath: hashranges})
+        return self._check_layout_report(report)
 
-        # remove the first and last hashes
-        clipped_ranges = collapsed_ranges[1:-1]
+    def _check_layout_report(self, report: dict) -> bool:
+        """
+        Logs the holes and the overlaps found by the layout analysis.
 
-        # walk through the list in pairs and look for diff == 1
-        iter_ranges = iter(clipped_ranges)
-        for first in iter_ranges:
-            second = next(iter_ranges)
-            hash_difference = second - first
-            if hash_difference > 1:
-                self.logger.error("Layout has holes")
-                return False
-            elif hash_difference < 1:
-                self.logger.error("Layout has overlaps")
-                return False
+        Args:
+            report (dict): The report of the layout analysis.
 
-        return True
+        Returns:
+            bool: True if the layouts of all the directories are complete.
+        """
+        for (dirpath, holes) in report['holes'].items():
+            self.logger.error(f"Layout of {dirpath} has holes: "
+                              + ", ".join([f"{hex(low)}-{hex(high)}"
+                                           for (low, high) in holes]))
+        for (dirpath, overlaps) in report['overlaps'].items():
+            self.logger.error(f"Layout of {dirpath} has overlaps: "
+                              + ", ".join([f"{hex(low)}-{hex(high)}"
+                                           for (low, high) in overlaps]))
+        return not report['incomplete']
 
     @staticmethod
     def create_brickpathlist(subvols: list, path: str) -> list:
@@ -209,41 +342,84 @@ class DHTOps(AbstractOps):
 
     def calculate_hash(self, host: str, filename: str) -> int:
         """
-        Function to import DHT Hash library.
+        Function to calculate the DHT hash of a name. The hash is computed
+        locally by the Davies-Meyer implementation in dht_hash.
 
         Args:
-            host (str): Node on which hash will be calculated
+            host (str): Node on which hash was calculated earlier. Kept for
+                        compatibility, the hash doesn't depend on it.
             filename (str): the name of the file
 
         Returns:
             An integer representation of the hash
+        """
+        return dm_hashfn(filename)
 
-        TODO: For testcases specifically testing hashing routine
-              consider using a baseline external Davies-Meyer hash_value.c
-              Creating comparison hash from same library we are testing
-              may not be best practice here. (Holloway)
-        """
-        # Avoiding check in local machine, due to conflicts with tcmalloc in
-        # upstream gluster installation
-        # try:
-        #     # Check if libglusterfs.so.0 is available locally
-        #     glusterfs = ctypes.cdll.LoadLibrary("libglusterfs.so.0")
-        #     self.logger.debug("Library libglusterfs.so.0 loaded locally")
-        #     computed_hash = (ctypes.c_uint32(glusterfs.gf_dm_hashfn(filename,
-        #                      len(filename))))
-        #     hash_value = int(computed_hash.value)
-        # except OSError:
-        cmd = ("python3 /usr/share/redant/script/compute_hash.py "
-               f"{filename}")
-        host = socket.gethostbyname(host)
-        ret = self.execute_abstract_op_node(cmd, host, False)
-        if ret['error_code'] != 0:
-            self.logger.error(f"Unable to run the script on node: {host}")
-            return 0
+    @staticmethod
+    def calculate_hash_batch(names: list) -> list:
+        """
+        Function to calculate the DHT hash of a list of names in one call.
+
+        Args:
+            names (list): List of file/dir names
+
+        Returns:
+            list of the hash values, in the same order as the names.
+        """
+        return dm_hashfn_batch(names)
 
-        out = " ".join(ret['msg'])
-        hash_value = int(out.split('\n')[0])
-        return hash_value
+    def validate_hash_engine(self, names: list, host: str = None) -> bool:
+        """
+        Validates the local hash implementation bit for bit against
+        gf_dm_hashfn of libglusterfs.so.0. The library is loaded locally
+        if available, or else the names are hashed on the given host in a
+        single call to its agent, or to the compute_hash script.
+
+        Args:
+            names (list): List of names to be hashed.
+            host (str): Optional parameter with default value None. Node
+                        on which the reference hashes are computed when
+                        libglusterfs isn't available locally.
+
+        Returns:
+            bool: True if all the hashes match, else False
+        """
+        if not isinstance(names, list):
+            names = [names]
+
+        local_hashes = self.calculate_hash_batch(names)
+        ref_hashes = [libglusterfs_hashfn(name) for name in names]
+        if None in ref_hashes:
+            if host is None:
+                self.logger.error("libglusterfs.so.0 is not available "
+                                  "locally and no host was given")
+                return False
+            host = socket.gethostbyname(host)
+            ret = self.call_agent('hash', host, names=names)
+            if ret['Flag']:
+                if ret['error_code'] != 0:
+                    self.logger.error("Unable to compute the hashes on "
+                                      f"node: {host}")
+                    return False
+                ref_hashes = ret['msg']
+            else:
+                quoted_names = " ".join([f"'{name}'" for name in names])
+                cmd = ("python3 /usr/share/redant/script/compute_hash.py "
+                       f"{quoted_names}")
+                ret = self.execute_abstract_op_node(cmd, host, False)
+                if ret['error_code'] != 0:
+                    self.logger.error("Unable to run the script on node: "
+                                      f"{host}")
+                    return False
+                ref_hashes = [int(line.strip()) for line in ret['msg']]
+
+        for (name, local_hash, ref_hash) in zip(names, local_hashes,
+                                                ref_hashes):
+            if local_hash != ref_hash:
+                self.logger.error(f"Hash mismatch for {name}: local "
+                                  f"{local_hash}, libglusterfs {ref_hash}")
+                return False
+        return True
 
     def find_specific_hashed(self, subvols_list: list, parent_path: str,
                              subvol: str, existing_names=None) -> tuple:
@@ -273,9 +449,9 @@ class DHTOps(AbstractOps):
             return None
 
         count = -1
-        for item in range(1, 5000):
-            host, _ = bricklist[0].split(':')
-            newhash = self.calculate_hash(host, str(item))
+        candidate_hashes = self.calculate_hash_batch(
+            [str(item) for item in range(1, 5000)])
+        for item, newhash in enumerate(candidate_hashes, start=1):
             for brickdir in bricklist:
                 count += 1
                 _, subvol_path = subvol.split(':')
@@ -374,8 +550,9 @@ class DHTOps(AbstractOps):
         self.logger.debug(f"Oldhashed: {oldhashed}, Oldhash: {hash_num}")
 
         count = -1
-        for item in range(1, 5000):
-            newhash = self.calculate_hash(host, str(item))
+        candidate_hashes = self.calculate_hash_batch(
+            [str(item) for item in range(1, 5000)])
+        for item, newhash in enumerate(candidate_hashes, start=1):
             for brickdir in bricklist:
                 count += 1
                 ret = self.hashrange_contains_hash(brickdir, newhash)
@@ -430,9 +607,13 @@ class DHTOps(AbstractOps):
 
     def validate_files_in_dir(self, node: str, rootdir: str,
                               file_type: int = c.FILETYPE_ALL,
-                              test_type: int = c.TEST_ALL) -> bool:
+                              test_type: int = c.TEST_ALL,
+                              tolerance: float = 0.1) -> bool:
         """
         walk a directory tree and check if layout is_complete.
+        The layouts of all the directories of the tree are read by a scan
+        of the brickdirs of the root and checked at once, hence the layout
+        tests cover every directory of the tree whatever the file type.
 
         Args:
             node (str): The host of the directory being traversed.
@@ -453,6 +634,10 @@ class DHTOps(AbstractOps):
                                 TEST_FILE_EXISTS_ON_HASHED_BRICKS
                                 TEST_ALL
                              Default to 255 i.e, equivalent to TEST_ALL
+            tolerance (float): The spread of the shares of the subvols of a
+                               directory, relative to the mean share, up to
+                               which the layout is taken as balanced.
+                               Default 0.1
 
         Examples:
             # TEST LAYOUTS FOR FILES IN A DIRECTORY
@@ -475,18 +660,12 @@ class DHTOps(AbstractOps):
             validate_files_in_dir(clients[0], '/mnt/glusterfs',
                                   test_type=TEST_FILE_EXISTS_ON_HASHED_BRICKS)
         """
-        # pylint: disable=eval-used
-
         layout_cache = {}
+        layout_tests = (c.TEST_LAYOUT_IS_COMPLETE | c.TEST_LAYOUT_IS_BALANCED)
+        # The tests left to the walk, once the tree wide ones are done.
+        walk_tests = test_type
 
-        script_path = ("/usr/share/redant/script/walk_dir.py")
-        cmd = f"python3 {script_path} {rootdir}"
-        ret = self.execute_abstract_op_node(cmd, node, False)
-        if ret['error_code'] != 0:
-            self.logger.error(f"Unable to run the script on node: {node}")
-            return False
-
-        for walkies in eval(ret['msg'][0]):
+        def _validate_level(walkies):
             self.logger.debug(f"TESTING DIRECTORY {walkies[0]}")
 
             # check directories
@@ -501,9 +680,9 @@ class DHTOps(AbstractOps):
                         layout = self.get_pathinfo(parent_dir, node)
                         layout_cache[parent_dir] = layout
 
-                        self.run_layout_tests(fqpath, layout, test_type)
+                        self.run_layout_tests(fqpath, layout, walk_tests)
 
-                    if test_type & c.TEST_FILE_EXISTS_ON_HASHED_BRICKS:
+                    if walk_tests & c.TEST_FILE_EXISTS_ON_HASHED_BRICKS:
                         self.run_hashed_bricks_test(node, fqpath, layout)
 
             # check files
@@ -518,11 +697,206 @@ class DHTOps(AbstractOps):
                         layout = self.get_pathinfo(parent_dir, node)
                         layout_cache[parent_dir] = layout
 
-                        self.run_layout_tests(fqpath, layout, test_type)
+                        self.run_layout_tests(fqpath, layout, walk_tests)
 
-                    if test_type & c.TEST_FILE_EXISTS_ON_HASHED_BRICKS:
+                    if walk_tests & c.TEST_FILE_EXISTS_ON_HASHED_BRICKS:
                         self.run_hashed_bricks_test(node, fqpath, layout)
-        return True
+
+        def _walk():
+            ret = self.call_agent('walk', node, path=rootdir)
+            if ret['Flag']:
+                if ret['error_code'] != 0:
+                    self.logger.error(f"Unable to walk {rootdir} on node: "
+                                      f"{node}")
+                    return False
+                for walkies in ret['msg']:
+                    _validate_level(walkies)
+                return True
+
+            # The levels are validated as they are streamed by the script,
+            # hence a large tree isn't held in the memory.
+            script_path = ("/usr/share/redant/script/walk_dir.py")
+            cmd = f"python3 {script_path} --json {rootdir}"
+            ret = self.execute_abstract_op_stream(
+                cmd, node, ndjson_line_handler(_validate_level),
+                max_lines=10, excep=False)
+            if ret['error_code'] != 0:
+                self.logger.error(f"Unable to run the script on node: {node}")
+                return False
+            return True
+
+        # The pathinfo of the directories, and the entries and layouts on
+        # the brickdirs of the root are scanned beforehand, sparing a
+        # round trip per directory and per hashed brick. The scan of the
+        # mount gives the levels of the walk as well.
+        with self.scanned_trees([f"{node}:{rootdir}"], xattrs=(),
+                                pathinfo='dirs') as mount_records:
+            layout = self.get_pathinfo(rootdir, node)
+            with self.scanned_trees(layout['brickdir_paths'],
+                                    xattrs=('trusted.glusterfs.dht',)) \
+                    as brick_records:
+                layouts = self._load_tree_layouts(rootdir, brick_records)
+                if layouts is not None:
+                    if test_type & layout_tests and self.get_layout(layout):
+                        self.run_tree_layout_tests(layouts, test_type,
+                                                   tolerance)
+                    walk_tests = test_type & ~layout_tests
+
+                if not walk_tests & (layout_tests
+                                     | c.TEST_FILE_EXISTS_ON_HASHED_BRICKS):
+                    return True
+                records = mount_records[f"{node}:{rootdir}"]
+                if not records:
+                    return _walk()
+                for walkies in self._scan_levels(records):
+                    _validate_level(walkies)
+                return True
+
+    @staticmethod
+    def _scan_levels(records: dict) -> list:
+        """
+        The levels of os.walk out of the records of a tree scan, which
+        are in the order of a top down walk. As for os.walk, a symlink to
+        a directory is listed among the directories and a path which
+        couldn't be stat'ed among the files.
+
+        Args:
+            records (dict): The scan records keyed by the path.
+
+        Returns:
+            list: The levels, each of the form [dirpath, dirs, files].
+        """
+        levels = {}
+        for (path, record) in records.items():
+            is_dir = ('stat' in record
+                      and stat.S_ISDIR(record['stat']['st_mode']))
+            if not levels:
+                levels[path] = ([], [])
+                continue
+            (dirs, files) = levels.setdefault(os.path.dirname(path),
+                                              ([], []))
+            if is_dir:
+                dirs.append(os.path.basename(path))
+                if record['stat']['fileType'] == 'directory':
+                    levels[path] = ([], [])
+            else:
+                files.append(os.path.basename(path))
+        return [[dirpath, dirs, files]
+                for (dirpath, (dirs, files)) in levels.items()]
+
+    def _load_tree_layouts(self, rootdir: str, brick_records: dict) -> dict:
+        """
+        Gathers the layouts of all the directories of a tree out of the
+        scans of the brickdirs of its root. The layout cache is seeded
+        with them on the way.
+
+        Args:
+            rootdir (str): The root of the tree on the mount.
+            brick_records (dict): The scan records of each brickdir of the
+                                  root, holding the trusted.glusterfs.dht
+                                  xattr.
+
+        Returns:
+            dict: The directories of the tree on the mount mapped to the
+                  hash range on each brick, the bricks being named by the
+                  brickdirs of the root. None if a brickdir couldn't be
+                  scanned.
+        """
+        layouts = {}
+        for (brickdir, records) in brick_records.items():
+            if not records:
+                return None
+            volname, _ = self._get_brickdir_volume(brickdir)
+            meta = self.get_layout_vol_meta(brickdir)
+            host, brick_path = self._brickdir_key(brickdir).split(':')
+            for (path, record) in records.items():
+                value = record.get('xattrs', {}).get('trusted.glusterfs.dht')
+                if (value is None or record['stat']['fileType']
+                        != 'directory'):
+                    continue
+                hashrange = parse_dht_xattr(value)
+                dirpath = os.path.normpath(rootdir + path[len(brick_path):])
+                layouts.setdefault(dirpath, {})[brickdir] = hashrange
+                if volname is not None:
+                    self.layout_cache[(volname, f"{host}:{path}")] = {
+                        "hashrange": list(hashrange),
+                        "version": meta["version"],
+                        "voltype": meta["voltype"]}
+        return layouts
+
+    def analyze_tree_layout(self, node: str, rootdir: str,
+                            tolerance: float = 0.1) -> dict:
+        """
+        Analyzes the layouts of all the directories of a tree at once,
+        reading them by a single scan of the brickdirs of the root.
+
+        Args:
+            node (str): The client on which the tree is mounted.
+            rootdir (str): The root of the tree on the mount.
+            tolerance (float): The spread of the shares of the subvols of a
+                               directory, relative to the mean share, up to
+                               which the layout is taken as balanced.
+                               Default 0.1
+
+        Returns:
+            dict: The report of the analysis with the holes, overlaps,
+                  unbalanced directories, imbalance statistics and the
+                  share of each brick, as returned by analyze_layouts
+                  of dht_layout. None if the volume type has no layout to
+                  check or a brickdir couldn't be scanned.
+
+        Example:
+            report = self.analyze_tree_layout(self.client_list[0],
+                                              self.mountpoint)
+            if report['incomplete'] or report['unbalanced']:
+                ...
+        """
+        layout = self.get_pathinfo(rootdir, node)
+        if not self.get_layout(layout):
+            return None
+        with self.scanned_trees(layout['brickdir_paths'],
+                                xattrs=('trusted.glusterfs.dht',)) \
+                as brick_records:
+            layouts = self._load_tree_layouts(rootdir, brick_records)
+        if layouts is None:
+            self.logger.error(f"Failed to read the layouts under {rootdir}")
+            return None
+        return analyze_layouts(layouts, tolerance)
+
+    def run_tree_layout_tests(self, layouts: dict, test_type: int,
+                              tolerance: float = 0.1):
+        """
+        run the is_complete and/or is_balanced tests on the layouts of all
+        the directories of a tree at once
+
+        Args:
+            layouts (dict): The directories mapped to the hash range on
+                            each of their brickdirs.
+            test_type (int): An or'd set of constants defining the test types
+                             to run.
+                                TEST_LAYOUT_IS_COMPLETE
+                                TEST_LAYOUT_IS_BALANCED
+            tolerance (float): The spread of the shares up to which a
+                               layout is taken as balanced. Default 0.1
+        """
+        report = analyze_layouts(layouts, tolerance)
+        self.logger.debug(f"Analyzed the layouts of {report['dirs']} "
+                          f"directories, imbalance {report['imbalance']}")
+        if test_type & c.TEST_LAYOUT_IS_COMPLETE:
+            if not self._check_layout_report(report):
+                msg = (f"Layout for {report['incomplete'][0]} IS NOT "
+                       f"COMPLETE, {len(report['incomplete'])} directories "
+                       "in all")
+                self.logger.error(msg)
+                raise Exception(f"LayoutIsNotComplete: {msg}")
+
+        if test_type & c.TEST_LAYOUT_IS_BALANCED and report['unbalanced']:
+            (dirpath, spread) = next(iter(report['unbalanced'].items()))
+            msg = (f"Layout for {dirpath} IS NOT BALANCED, the shares "
+                   f"spread by {spread:.3%}, {len(report['unbalanced'])} "
+                   "directories in all")
+            self.logger.error(msg)
+            raise Exception(f"LayoutIsNotBalancedError: {msg}")
 
     def run_layout_tests(self, fqpath: str, layout: dict,
                          test_type: int):
@@ -540,7 +914,7 @@ class DHTOps(AbstractOps):
                                 TEST_ALL
         """
         for brickdir_path in layout['brickdir_paths']:
-            if self.get_volume_type_from_brickpath(brickdir_path) in \
+            if self.get_layout_vol_meta(brickdir_path)['voltype'] in \
                ('Replicate', 'Disperse', 'Arbiter'):
                 self.logger.debug("Cannot check for layout completeness as"
                                   " volume under test is Replicate/Disperse"
@@ -571,7 +945,7 @@ class DHTOps(AbstractOps):
         """
         brickdir_list = []
         for brickdir_path in layout['brickdir_paths']:
-            if self.get_volume_type_from_brickpath(brickdir_path) in \
+            if self.get_layout_vol_meta(brickdir_path)['voltype'] in \
                ('Replicate', 'Disperse', 'Arbiter'):
                 self.logger.debug("Cannot check for layout completeness as"
                                   " volume under test is Replicate/Disperse"
@@ -593,64 +967,50 @@ class DHTOps(AbstractOps):
         Returns:
             bool: True on success, else False
         """
-        for brickdir_path in layout['brickdir_paths']:
-            if self.get_volume_type_from_brickpath(brickdir_path) in\
-               ('Replicate', 'Disperse', 'Arbiter'):
-                self.logger.debug("Cannot check for layout completeness as"
-                                  " volume under test is Replicate/Disperse"
-                                  "/Arbiter")
-            else:
-                joined_hashranges = []
-                for brickdir in layout['brickdir_paths']:
-                    # Get hashrange for brickdir
-                    hashrange = self.get_hashrange(brickdir)
-
-                    # join all of the hashranges into a single list
-                    if hashrange:
-                        joined_hashranges += hashrange
-
-                self.logger.debug(f"joined range list: {joined_hashranges}")
-                # remove duplicate hashes
-                collapsed_ranges = list(set(joined_hashranges))
-                # sort the range list for good measure
-                collapsed_ranges.sort()
-
-                # first hash in the list is 0?
-                if collapsed_ranges[0] != 0:
-                    self.logger.error("First hash in range "
-                                      f"({collapsed_ranges[0]}) is not zero")
-                    return False
-
-                # last hash in the list is 32-bits high?
-                if collapsed_ranges[-1] != int(0xffffffff):
-                    self.logger.error("Last hash in ranges "
-                                      f"({hex(collapsed_ranges[-1])}) is not "
-                                      "0xffffffff")
-                    return False
-
-                # remove the first and last hashes
-                clipped_ranges = collapsed_ranges[1:-1]
-                self.logger.debug(f"clipped: {clipped_ranges}")
+        report = self._analyze_layout(layout)
+        if report is None:
+            return False
+        return self._check_layout_report(report)
 
-                # walk through the list in pairs and look for diff == 1
-                iter_ranges = iter(clipped_ranges)
-                for first in iter_ranges:
-                    second = next(iter_ranges)
-                    hash_difference = second - first
-                    self.logger.debug(f"{second} - {first} = "
-                                      f"{hash_difference}")
+    def is_balanced(self, layout: dict, tolerance: float = 0.1) -> bool:
+        """
+        The subvols hold equal shares of the hash space, within the
+        tolerance.
 
-                    if hash_difference > 1:
-                        self.logger.error("Layout has holes")
-                        return False
+        Args:
+            layout (dict): Brickdir_pathinfo
+            tolerance (float): The spread of the shares, relative to the
+                               mean share, up to which the layout is
+                               taken as balanced. Default 0.1
 
-                    elif hash_difference < 1:
-                        self.logger.error("Layout has overlaps")
-                        return False
+        Returns:
+            bool: True on success, else False
+        """
+        report = self._analyze_layout(layout, tolerance)
+        if report is None:
+            return False
+        for (dirpath, spread) in report['unbalanced'].items():
+            self.logger.error(f"Layout of {dirpath} is not balanced, the "
+                              f"shares of the subvols spread by "
+                              f"{spread:.3%}")
+        return not report['unbalanced']
 
-                return True
+    def _analyze_layout(self, layout: dict, tolerance: float = 0.1) -> dict:
+        """
+        Runs the layout analysis on the brickdirs of a directory.
 
-        return False
+        Returns:
+            dict: The report of the analysis, or None if the volume type
+                  has no layout to check.
+        """
+        brickdir_list = self.get_layout(layout)
+        if not brickdir_list:
+            return None
+        hashranges = {brickdir: self.get_hashrange(brickdir)
+                      for brickdir in brickdir_list}
+        self.logger.debug(f"hash ranges: {hashranges}")
+        dirpath = brickdir_list[0].split(':')[1]
+        return analyze_layouts({dirpath: hashranges}, tolerance)
 
     def run_hashed_bricks_test(self, node: str, fqpath: str,
                                layout: dict):
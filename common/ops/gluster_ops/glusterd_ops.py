@@ -3,9 +3,9 @@ This file contains one class - GlusterdOps wich holds
 operations on the glusterd service on the server
 or the client.
 """
-from time import sleep
 import configparser
 from common.ops.abstract_ops import AbstractOps
+from common.waiter import wait_until
 
 
 class GlusterdOps(AbstractOps):
@@ -45,6 +45,7 @@ class GlusterdOps(AbstractOps):
             ret = self.execute_command_multinode(cmd, node)
             self.logger.info(f"Running {cmd} on nodes {node}")
 
+        self.invalidate_cluster_state()
         for result_val in ret:
             if int(result_val['error_code']) != 0:
                 error_msg = result_val['error_msg']
@@ -90,6 +91,7 @@ class GlusterdOps(AbstractOps):
 
         ret = self.execute_command_multinode(cmd, node)
 
+        self.invalidate_cluster_state()
         for result_val in ret:
             if int(result_val['error_code']) != 0:
                 error_msg = result_val['error_msg']
@@ -165,6 +167,7 @@ class GlusterdOps(AbstractOps):
             self.logger.info(f"Running {cmd} on {node}")
             ret = self.execute_command_multinode(cmd, node)
 
+        self.invalidate_cluster_state()
         for result_val in ret:
             if int(result_val['error_code']) != 0:
                 self.logger.error(result_val['error_msg'])
@@ -255,14 +258,13 @@ class GlusterdOps(AbstractOps):
         Returns:
             bool: True if glusterd started on the node or else False.
         """
-        count = 0
-        while count <= timeout:
-            ret = self.is_glusterd_running(node)
-            if ret == 1:
-                return True
-            sleep(1)
-            count += 1
-        return False
+        try:
+            return self.wait_for_remote_condition(
+                "systemctl status glusterd", node, timeout)
+        except Exception as error:
+            self.logger.error(f"Failed to wait for glusterd on {node}: "
+                              f"{error}")
+            return False
 
     def kill_glusterd_ungraceful(self, node: str):
         """
@@ -294,16 +296,13 @@ class GlusterdOps(AbstractOps):
         Returns:
             bool: True if glusterd stopped on the node or else False.
         """
-        count = 0
-        while count <= timeout:
+        def _glusterd_stopped():
             ret = self.is_glusterd_running(node)
-            if ret == 0:
-                return True
-            elif ret == -1:
+            if ret == -1:
                 self.kill_glusterd_ungraceful(node)
-            sleep(1)
-            count += 1
-        return False
+            return ret == 0
+
+        return bool(wait_until(_glusterd_stopped, timeout))
 
     # TODO: Handle command execution in such a manner that this doesn't
     # go under xml version.
@@ -2,7 +2,10 @@
 Heal ops module deals with the functions related to heal related operations.
 """
 
-from time import sleep
+import json
+from time import time
+from common import gluster_xml
+from common.waiter import wait_until
 
 
 class HealOps:
@@ -53,18 +56,14 @@ class HealOps:
                              "to be online")
             return True
 
-        counter = 0
-        flag = 0
-        while counter < timeout:
-            status = self.are_all_self_heal_daemons_online(volname, node)
-            if status:
-                flag = 1
-                break
-            if not status:
-                sleep(10)
-                counter = counter + 10
-
-        if not flag:
+        # The daemons may have changed since the snapshot was taken, later
+        # snapshots being refreshed as they age.
+        self.invalidate_cluster_state()
+
+        def _shds_online():
+            return self.are_all_self_heal_daemons_online(volname, node)
+
+        if not wait_until(_shds_online, timeout, max_interval=5):
             self.logger.error(f"All self-heal-daemons of the volume {volname}"
                               f" are not online even after {timeout//60}"
                               " minutes")
@@ -95,12 +94,10 @@ class HealOps:
                              "to be online")
             return True
 
-        service = 'shd'
         failure_msg = ("Verifying all self-heal-daemons are online failed for "
                        f"volume {volname}")
         # Get volume status
-        vol_status = self.get_volume_status(volname, node, service,
-                                            excep=False)
+        vol_status = self.get_cached_volume_status(volname, node, False)
         if vol_status is None or ('msg' in vol_status
            and vol_status['msg']['opRet'] != '0'):
             self.logger.error(failure_msg)
@@ -141,7 +138,8 @@ class HealOps:
                   heal_info data per brick.
         """
         cmd = f"gluster volume heal {volname} info --xml"
-        ret = self.execute_abstract_op_node(cmd, node, False)
+        ret = self.execute_abstract_op_node(cmd, node, False,
+                                            gluster_xml.HEAL_INFO)
         if ret['msg']['opRet'] != '0':
             self.logger.error("Failed to get the heal info xml output for"
                               f" the volume {volname}.Hence failed to get"
@@ -219,15 +217,83 @@ class HealOps:
                          f" on the volume {volname}")
         return True
 
+    def _watch_heal_progress(self, bricks_list: list, timeout: int,
+                             interval: float, progress: list) -> bool:
+        """
+        Runs the heal monitor on every node hosting the bricks, which
+        watches the xattrop indices of all the bricks of the node and
+        streams the pending heal counts back. The monitors are waited upon
+        together and end as soon as the heal completes on their node.
+
+        Returns:
+            bool: True if the heal completed on all the bricks.
+        """
+        node_bricks = {}
+        for brick in bricks_list:
+            brick_node, brick_path = brick.split(":")
+            node_bricks.setdefault(brick_node, []).append(brick_path)
+
+        async_objs = []
+        for (brick_node, brick_paths) in node_bricks.items():
+            cmd = ("python3 /usr/share/redant/script/heal_monitor.py "
+                   f"-t {timeout} -i {interval} {' '.join(brick_paths)}")
+            async_objs.append(self.execute_command_async(cmd, brick_node))
+
+        pending = {}
+        partial = {}
+
+        def _on_output(async_obj, data, stream):
+            if stream != 'stdout':
+                return
+            key = async_obj['node']
+            lines = (partial.get(key, "")
+                     + data.decode('utf-8', 'replace')).split("\n")
+            partial[key] = lines.pop()
+            for line in lines:
+                try:
+                    sample = json.loads(line)
+                except ValueError:
+                    continue
+                for (brick_path, count) in sample['pending'].items():
+                    pending[f"{key}:{brick_path}"] = count
+                progress.append((time(), dict(pending)))
+                self.logger.debug(f"Pending heals : {pending}")
+
+        heal_complete = True
+        for (index, ret) in self.iter_async_results(async_objs, timeout + 10,
+                                                    on_output=_on_output):
+            if ret['error_code'] == -1:
+                self.cancel_async_command(async_objs[index])
+            if ret['error_code'] != 0:
+                self.logger.error("Heal didn't complete on the bricks of "
+                                  f"{ret['node']}, monitor exited with "
+                                  f"{ret['error_code']} {ret['error_msg']}")
+                heal_complete = False
+
+        if len(progress) > 1:
+            (start, start_pending) = progress[0]
+            (end, end_pending) = progress[-1]
+            healed = (sum(start_pending.values())
+                      - sum(end_pending.values()))
+            if end > start:
+                self.logger.info(f"Healed {healed} entries in "
+                                 f"{end - start:.1f} sec, at "
+                                 f"{healed / (end - start):.1f} entries/s")
+        return heal_complete
+
     def monitor_heal_completion(self, node: str, volname: str,
                                 timeout_period: int = 1200,
                                 bricks: list = None,
-                                interval_check: int = 120) -> bool:
+                                interval_check: int = 120,
+                                progress: list = None) -> bool:
         """
         Monitors heal completion by looking into .glusterfs/indices/xattrop
         directory of every brick for certain time. When there are no entries
         in all the brick directories then heal is successful.
         Otherwise heal is pending on the volume.
+        The indices are watched by the heal monitor script running on each
+        of the nodes, which streams back the pending counts and ends as
+        soon as the heal completes.
 
         Args:
             node : Node on which commands are executed
@@ -236,8 +302,11 @@ class HealOps:
                              Default: 1200 i.e 20 minutes.
             bricks : list of bricks to monitor heal, if not provided
                     heal will be monitored on all bricks of volume
-            interval_check : Time in seconds, for every given interval checks
-                            the heal info, defaults to 120.
+            interval_check : Upper bound in seconds on the time between two
+                             checks of the indices, defaults to 120. The
+                             monitors check at most every half a second.
+            progress : Optional list to which the heal progress is added
+                       as (time, {brick: pending count}) samples.
 
         Returns:
             bool: True if heal is complete within timeout_period.
@@ -263,22 +332,11 @@ class HealOps:
 
             return False
 
-        while time_counter > 0:
-            heal_complete = True
-
-            for brick in bricks_list:
-                brick_node, brick_path = brick.split(":")
-                cmd = (f"ls -1 {brick_path}/.glusterfs/indices/xattrop/ | "
-                       "grep -ve \"xattrop-\" | wc -l")
-                ret = self.execute_abstract_op_node(cmd, brick_node, False)
-                out = int((ret['msg'][0]).rstrip("\n"))
-                if out != 0:
-                    heal_complete = False
-                    break
-            if heal_complete:
-                break
-            sleep(interval_check)
-            time_counter = time_counter - interval_check
+        if progress is None:
+            progress = []
+        heal_complete = self._watch_heal_progress(bricks_list, time_counter,
+                                                  min(interval_check, 0.5),
+                                                  progress)
 
         if heal_complete and bricks:
             # In EC volumes, check heal completion only on online bricks
@@ -299,7 +357,11 @@ class HealOps:
         for brick in bricks_list:
             brick_node, brick_path = brick.split(":")
             cmd = f"ls -1 {brick_path}/.glusterfs/indices/xattrop/ "
-            self.execute_abstract_op_node(cmd, brick_node)
+            ret = self.execute_abstract_op_stream(cmd, brick_node,
+                                                  max_lines=20)
+            self.logger.info(f"{ret['line_count']} entries in the xattrop "
+                             f"index of {brick}, last few being "
+                             f"{ret['msg']}")
         return False
 
     def get_heal_info_split_brain(self, node: str, volname: str) -> list:
@@ -317,7 +379,8 @@ class HealOps:
                 heal_info data per brick.
         """
         cmd = f"gluster volume heal {volname} info split-brain --xml"
-        ret = self.execute_abstract_op_node(cmd, node, False)
+        ret = self.execute_abstract_op_node(cmd, node, False,
+                                            gluster_xml.HEAL_INFO)
         if ret['msg']['opRet'] != '0':
             self.logger.error("Failed to get the heal info xml output for"
                               f" the volume {volname}.Hence failed to get"
@@ -423,21 +486,12 @@ class HealOps:
             bool : True if glustershd releases its parent.
                    False Otherwise
         """
-        counter = 0
-
         if not isinstance(nodes, list):
             nodes = [nodes]
 
-        while counter < timeout:
-            ret, _ = self.get_self_heal_daemon_pid(nodes)
-
-            if ret:
-                break
-
-            self.logger.info("Retry after 3 sec to get"
-                             " self-heal daemon process.....")
-            sleep(3)
-            counter = counter + 3
+        ret = bool(wait_until(
+            lambda: self.get_self_heal_daemon_pid(nodes)[0], timeout,
+            max_interval=3))
 
         if not ret:
             self.logger.error("Either No self heal daemon process found "
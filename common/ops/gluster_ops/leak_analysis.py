@@ -0,0 +1,119 @@
+"""
+Vectorized analysis of the memory usage sampled for the gluster
+processes. The usage of all the processes of a node is held in flat
+numpy arrays, a sample per row along with the index of its process, so
+that the leak heuristics are run over all of them at once instead of a
+python loop over the samples.
+
+Two heuristics are provided,
+
+- the three point check, flagging a gain above the accepted amount
+  which keeps growing in the following samples and by the last one.
+- the growth trend, a least squares fit of the usage over time per
+  process, flagging a steady growth of the usage, which the three point
+  check misses when each step stays below the accepted gain.
+"""
+import numpy as np
+
+
+def three_point_leaks(usage, gain: float) -> tuple:
+    """
+    Runs the three point check over the usage of a process.
+    Args:
+        usage (array): The usage of the process, in sample order.
+        gain (float): The accepted gain between two samples.
+    Returns:
+        tuple: (leak, tail) where leak is True if a gain is followed by a
+               larger one in the two next samples and by the last one, and
+               tail holds the indices of the increments above gain which
+               are too close to the end to be checked this way.
+    """
+    increments = np.diff(np.asarray(usage, dtype=np.float64))
+    instances = np.flatnonzero(increments > gain)
+    checkable = instances[instances < len(increments) - 2]
+    leak = False
+    if len(checkable):
+        base = increments[checkable]
+        leak = bool(np.any((increments[checkable + 1] > base)
+                           & (increments[checkable + 2] > base)
+                           & (increments[-1] > base)))
+    return (leak, instances[instances >= len(increments) - 2])
+
+
+def usage_trends(group, time, usage, size: int = None) -> dict:
+    """
+    Fits a line to the usage over time of each group of samples, all the
+    groups being fitted together.
+    Args:
+        group (array): The index of the group, i.e. the process, of each
+                       sample.
+        time (array): The time of each sample.
+        usage (array): The usage of each sample.
+        size (int): The number of groups, if more than those sampled.
+    Returns:
+        dict: Arrays indexed by the group, of the form,
+            {
+              'samples': number of samples,
+              'slope': usage gained per unit of time,
+              'r2': coefficient of determination of the fit, i.e. how
+                    steady the growth is,
+              'first': first usage, 'last': last usage,
+              'peak': highest usage
+            }
+            The slope and r2 of a group with less than two samples, or
+            whose samples share the same time, are nan.
+    """
+    group = np.asarray(group, dtype=np.int64)
+    order = np.lexsort((np.asarray(time), group))
+    group = group[order]
+    time = np.asarray(time, dtype=np.float64)[order]
+    usage = np.asarray(usage, dtype=np.float64)[order]
+    size = max(size or 0, int(group.max()) + 1 if len(group) else 0)
+
+    samples = np.bincount(group, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # The sums are taken around the means of each group, keeping the
+        # epoch times from swamping the precision of the fit.
+        mean_time = (np.bincount(group, weights=time, minlength=size)
+                     / samples)
+        mean_usage = (np.bincount(group, weights=usage, minlength=size)
+                      / samples)
+        dtime = time - mean_time[group]
+        dusage = usage - mean_usage[group]
+        sxx = np.bincount(group, weights=dtime * dtime, minlength=size)
+        sxy = np.bincount(group, weights=dtime * dusage, minlength=size)
+        syy = np.bincount(group, weights=dusage * dusage, minlength=size)
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        r2 = np.where((sxx > 0) & (syy > 0), sxy * sxy / (sxx * syy),
+                      np.where(sxx > 0, 1.0, np.nan))
+
+    first = np.full(size, np.nan)
+    last = np.full(size, np.nan)
+    peak = np.full(size, np.nan)
+    if len(group):
+        starts = np.flatnonzero(np.diff(group, prepend=-1))
+        ends = np.append(starts[1:], len(group)) - 1
+        present = group[starts]
+        first[present] = usage[starts]
+        last[present] = usage[ends]
+        peak[present] = np.maximum.reduceat(usage, starts)
+    return {'samples': samples, 'slope': slope, 'r2': r2, 'first': first,
+            'last': last, 'peak': peak}
+
+
+def growth_leaks(trends: dict, max_slope: float,
+                 min_r2: float = 0.9, min_samples: int = 10):
+    """
+    Flags the groups whose usage grows steadily faster than allowed.
+    Args:
+        trends (dict): The trends, as returned by usage_trends.
+        max_slope (float): The accepted growth per unit of time.
+        min_r2 (float): The r2 from which the growth is taken as steady.
+        min_samples (int): The samples needed for a group to be judged.
+    Returns:
+        array: A bool per group, True for a leaking one.
+    """
+    with np.errstate(invalid='ignore'):
+        return ((trends['samples'] >= min_samples)
+                & (trends['slope'] > max_slope)
+                & (trends['r2'] >= min_r2))
@@ -1,46 +1,90 @@
 """
     This module deals with memory and cpu logging
 """
+import json
 import numpy as np
 import pandas as pd
 
 from common.ops.abstract_ops import AbstractOps
+from common.ops.gluster_ops.leak_analysis import (three_point_leaks,
+                                                  usage_trends,
+                                                  growth_leaks)
 
 
 class MemoryAndCpuOps(AbstractOps):
     """
     Class which is responsible for memory and cpu logging
     """
-    def _start_logging_processes(self, process: str, servers: list,
-                                 test_name: str, interval: int,
-                                 count: int) -> list:
-        """Start logging processes on all nodes for a given process
+    # Where the samplers write the samples of the tests.
+    SAMPLE_DIR = "/var/log/redant/samples"
+    # The record of the samples, as written by proc_sampler.py.
+    SAMPLE_DTYPE = np.dtype([('time', '<f8'), ('rss', '<u8'),
+                             ('vsz', '<u8'), ('utime', '<u8'),
+                             ('stime', '<u8'), ('read_bytes', '<u8'),
+                             ('write_bytes', '<u8'), ('threads', '<u4'),
+                             ('fds', '<u4')])
+
+    def invalidate_resource_samples(self, test_name: str = None):
+        """
+        Drops the samples pulled from the nodes for a test.
+
+        Args:
+        test_name(str): Name of the testcase. If None, the samples of all
+                        the tests are dropped, along with the record of
+                        the samplers started.
+        """
+        if test_name is None:
+            self.resource_samples = {}
+            self.samplers = {}
+            return
+        self.resource_samples = {key: samples for (key, samples)
+                                 in self.resource_samples.items()
+                                 if key[1] != test_name}
+
+    def _start_samplers(self, nodes: list, test_name: str, interval: float,
+                        count: int, resolution: float) -> list:
+        """Start the resource sampler on the nodes. A single sampler per
+        node samples all the gluster processes of the node, hence a node
+        whose sampler for the test is still running, e.g. a server which
+        is a client as well, isn't started again. A node whose earlier
+        sampler has ended is started afresh, its samples being dropped.
 
         Args:
-        process(str): glusterfs process for which logging is done
-        servers(list): Servers on which CPU and memory usage has to be logged
-        test_name(str): Name of testcase for which logs are to be collected
-        interval(int): Time interval after which logs are to be collected
-        count(int): Number of samples to be captured
+        nodes(list): Nodes on which the usage has to be sampled
+        test_name(str): Name of testcase for which usage is sampled
+        interval(float): Time interval at which the usage is checked
+        count(int): Number of intervals for which the usage is sampled
+        resolution(float): Time interval between two samples
 
         Returns:
-        list: A list of logging processes
+        list: A list of the sampler processes
         """
-        if not isinstance(servers, list):
-            servers = [servers]
-
-        cmd = ("python3 /usr/share/redant/script/memory_and_cpu_logger.py"
-               f" -p {process} -t {test_name} -i {interval} -c {count}")
-        logging_process = []
-        for server in servers:
-            self.logger.debug(f"Start logging for {process} on {server}")
-            proc = self.execute_command_async(cmd, server)
-            logging_process.append(proc)
-        return logging_process
+        if not isinstance(nodes, list):
+            nodes = [nodes]
+
+        # The samples of an earlier run of the test are dropped.
+        cmd = (f"rm -rf {self.SAMPLE_DIR}/{test_name}; "
+               "python3 /usr/share/redant/script/proc_sampler.py"
+               f" -t {test_name} -o {self.SAMPLE_DIR} -i {resolution}"
+               f" -l {interval} -d {interval * count}")
+        sampler_procs = []
+        for node in nodes:
+            running = self.samplers.get((node, test_name))
+            if running and not self.check_async_command_status(running):
+                self.logger.debug(f"{node} is already sampled for "
+                                  f"{test_name}")
+                continue
+            self.resource_samples.pop((node, test_name), None)
+            self.logger.debug(f"Start sampling for {test_name} on {node}")
+            sampler_proc = self.execute_command_async(cmd, node)
+            self.samplers[(node, test_name)] = sampler_proc
+            sampler_procs.append(sampler_proc)
+        return sampler_procs
 
     def log_memory_and_cpu_usage_on_servers(self, servers: list,
                                             test_name: str, interval: int = 60,
-                                            count: int = 100) -> dict:
+                                            count: int = 100,
+                                            resolution: float = 0.5) -> dict:
         """Log memory and CPU usage of gluster server processes
 
         Args:
@@ -50,21 +94,22 @@ class MemoryAndCpuOps(AbstractOps):
          interval(int): Time interval after which logs are to be collected
                         (Default:60)
          count(int): Number of samples to be captured (Default:100)
+         resolution(float): Time interval between two samples taken by the
+                            sampler (Default:0.5). The usage is sampled for
+                            interval * count seconds and checked for leaks
+                            at every interval.
 
         Returns:
-         dict: Logging processes dict for all gluster server processes
+         dict: Sampler processes dict for the servers
         """
-        logging_process_dict = {}
-        for proc_name in ('glusterd', 'glusterfs', 'glusterfsd'):
-            logging_procs = self._start_logging_processes(proc_name, servers,
-                                                          test_name, interval,
-                                                          count)
-            logging_process_dict[proc_name] = logging_procs
-        return logging_process_dict
+        return {'sampler': self._start_samplers(servers, test_name,
+                                                interval, count,
+                                                resolution)}
 
     def log_memory_and_cpu_usage_on_clients(self, servers: list,
                                             test_name: str, interval: int = 60,
-                                            count: int = 100) -> dict:
+                                            count: int = 100,
+                                            resolution: float = 0.5) -> dict:
         """Log memory and CPU usage of gluster client processes
 
         Args:
@@ -74,20 +119,22 @@ class MemoryAndCpuOps(AbstractOps):
          interval(int): Time interval after which logs are to be collected
                         (Defaults:60)
          count(int): Number of samples to be captured (Default:100)
+         resolution(float): Time interval between two samples taken by the
+                            sampler (Default:0.5). The usage is sampled for
+                            interval * count seconds and checked for leaks
+                            at every interval.
 
         Returns:
-         dict: Logging processes dict for all gluster client processes
+         dict: Sampler processes dict for the clients
         """
-        logging_process_dict = {}
-        logging_procs = self._start_logging_processes('glusterfs', servers,
-                                                      test_name, interval,
-                                                      count)
-        logging_process_dict['glusterfs'] = logging_procs
-        return logging_process_dict
+        return {'sampler': self._start_samplers(servers, test_name,
+                                                interval, count,
+                                                resolution)}
 
     def log_memory_and_cpu_usage_on_cluster(self, server: list, client: list,
                                             test_name: str, interval: int = 60,
-                                            count: int = 100) -> dict:
+                                            count: int = 100,
+                                            resolution: float = 0.5) -> dict:
         """Log memory and CPU usage on gluster cluster
 
         Args:
@@ -98,31 +145,24 @@ class MemoryAndCpuOps(AbstractOps):
          interval(int): Time interval after which logs are to be collected
                         (Default:60)
          count(int): Number of samples to be captured (Default:100)
+         resolution(float): Time interval between two samples taken by the
+                            sampler (Default:0.5). The usage is sampled for
+                            interval * count seconds and checked for leaks
+                            at every interval.
 
         Returns:
-         dict: Logging processes dict for all servers and clients
+         dict: Sampler processes dict for all servers and clients
         """
-        # Start logging on all servers
-        server_logging_processes = (self.log_memory_and_cpu_usage_on_servers(
-                                    server, test_name, interval, count))
-        if not server_logging_processes:
-            self.logger.error("server logging process is empty")
-            return {}
-
-        # Starting logging on all clients
-        client_logging_processes = (self.log_memory_and_cpu_usage_on_clients(
-                                    client, test_name, interval, count))
-        if not client_logging_processes:
-            self.logger.error("client logging process is empty")
-            return {}
-
-        # Combining dicts
+        if not isinstance(server, list):
+            server = [server]
+        if not isinstance(client, list):
+            client = [client]
+
         logging_process_dict = {}
-        for node_type, proc_dict in (('server', server_logging_processes),
-                                     ('client', client_logging_processes)):
-            logging_process_dict[node_type] = {}
-            for proc in proc_dict:
-                logging_process_dict[node_type][proc] = (proc_dict[proc])
+        for node_type, nodes in (('server', server), ('client', client)):
+            logging_process_dict[node_type] = {
+                'sampler': self._start_samplers(nodes, test_name, interval,
+                                                count, resolution)}
         return logging_process_dict
 
     def wait_for_logging_processes_to_stop(self, proc_dict: dict,
@@ -139,23 +179,17 @@ class MemoryAndCpuOps(AbstractOps):
         Retruns:
          bool: True if processes are completed else False
         """
-        flag = []
-        if cluster:
-            for sub_dict in proc_dict:
-                for proc_name in proc_dict[sub_dict]:
-                    for proc in proc_dict[sub_dict][proc_name]:
-                        self.logger.debug("Waiting for logging "
-                                          "process to stop")
-                        self.wait_till_async_command_ends(proc)
-                        flag.append(True)
-        else:
-            for proc_name in proc_dict:
-                for proc in proc_dict[proc_name]:
-                    self.logger.debug("Waiting for logging "
-                                      "process to stop")
-                    self.wait_till_async_command_ends(proc)
-                    flag.append(True)
-        return all(flag)
+        proc_dicts = list(proc_dict.values()) if cluster else [proc_dict]
+        async_objs = [proc for sub_dict in proc_dicts
+                      for proc_name in sub_dict
+                      for proc in sub_dict[proc_name]]
+
+        # All the processes are waited upon together, each one being
+        # reaped as soon as it ends.
+        self.logger.debug(f"Waiting for {len(async_objs)} logging "
+                          "processes to stop")
+        self.wait_for_async_commands(async_objs)
+        return True
 
     def _check_for_oom_killers(self, nodes: list, process: str,
                                oom_killer_list: list):
@@ -210,50 +244,136 @@ class MemoryAndCpuOps(AbstractOps):
         self._check_for_oom_killers(nodes, 'glusterfs', oom_killer_list)
         return any(oom_killer_list)
 
-    def create_dataframe_from_csv(self, node: str, proc_name: str,
-                                  test_name: str):
-        """Creates a dataframe from a given process.
+    def collect_resource_samples(self, node: str, test_name: str) -> dict:
+        """Pulls the samples of a test from a node. Only what the sampler
+        appended since the last pull is fetched, hence the samples can be
+        pulled all along a long running test as well as at its end.
 
         Args:
-         node(str): Node from which csv is to be picked
-         proc_name(str): Name of process for which csv is to picked
-         test_name(str): Name of the testcase for which CSV
+         node(str): Node from which the samples are to be pulled
+         test_name(str): Name of the testcase for which the usage was
+                         sampled
 
         Returns:
-         dataframe: Pandas dataframe if CSV file exits else None
+         dict: The samples of the form,
+               {
+                 'sampler': {'clk_tck': .., 'page_size': .., ...},
+                 'procs': {key: {'pid': .., 'name': .., 'role': ..,
+                                 'cmdline': [..],
+                                 'samples': numpy structured array with
+                                            the SAMPLE_DTYPE fields}},
+                 'offsets': {file name: bytes consumed}
+               }
+               or None if the samples couldn't be pulled.
         """
-        # Read the csv file generated by memory_and_cpu_logger.py
-        ret = self.execute_abstract_op_node(f"cat /root/{proc_name}.csv", node)
-        if ret['error_code'] != 0:
-            self.logger.error("Cannot read the csv file")
+        samples = self.resource_samples.setdefault(
+            (node, test_name), {'sampler': {}, 'procs': {}, 'offsets': {}})
+        offsets = samples['offsets']
+        try:
+            files = self.read_files_from_node(
+                f"{self.SAMPLE_DIR}/{test_name}", node, offsets)
+        except Exception as error:
+            self.logger.error(f"Cannot read the samples of {test_name} on "
+                              f"{node}: {error}")
             return None
 
-        raw_data = ret['msg']
-        # Split the complete dump to individual lines
-        data = []
-        for i in raw_data:
-            data.append(i.split("\r\n")[0])
-        rows, flag = [], False
-        for line in data:
-            values = line.split(',')
-            if test_name == values[0]:
-                # Reset rows if it's the second instance
-                if flag:
-                    rows = []
-                flag = True
+        if files.get('sampler.json'):
+            samples['sampler'] = json.loads(files['sampler.json'])
+            offsets['sampler.json'] = len(files['sampler.json'])
+
+        # Only the complete lines and records are consumed, the rest
+        # being fetched again by the next pull.
+        data = files.get('procs.jsonl', b"")
+        data = data[:data.rfind(b"\n") + 1]
+        offsets['procs.jsonl'] = offsets.get('procs.jsonl', 0) + len(data)
+        for line in data.decode().splitlines():
+            proc = json.loads(line)
+            proc['samples'] = np.empty(0, dtype=self.SAMPLE_DTYPE)
+            samples['procs'][proc.pop('key')] = proc
+
+        for (key, proc) in samples['procs'].items():
+            data = files.get(f"{key}.samples", b"")
+            count = len(data) // self.SAMPLE_DTYPE.itemsize
+            if not count:
                 continue
+            offsets[f"{key}.samples"] = (offsets.get(f"{key}.samples", 0)
+                                         + count * self.SAMPLE_DTYPE.itemsize)
+            proc['samples'] = np.concatenate((
+                proc['samples'], np.frombuffer(data, dtype=self.SAMPLE_DTYPE,
+                                               count=count)))
+        return samples
+
+    def create_dataframe_from_samples(self, node: str, proc_name: str,
+                                      test_name: str,
+                                      interval: float = None):
+        """Creates a dataframe for the processes of a given name, out of
+        the samples of the test.
+
+        Args:
+         node(str): Node from which the samples are to be picked
+         proc_name(str): Name of process for which the samples are picked
+         test_name(str): Name of the testcase for which usage was sampled
+        Optional:
+         interval(float): Time interval between two rows of a process, the
+                          first sample of each interval being kept. If
+                          None, the interval at which the usage is checked,
+                          as given when the sampling was started, and 0 to
+                          keep all the samples (Default:None)
+
+        Returns:
+         dataframe: Pandas dataframe with the 'Time stamp', 'Process ID',
+                    'CPU Usage' (%) and 'Memory Usage' (MB) of each row,
+                    or None if the samples couldn't be pulled. The CPU
+                    usage is, as reported by ps, the CPU time of the
+                    process over the time elapsed since it started.
+        """
+        samples = self.collect_resource_samples(node, test_name)
+        if samples is None:
+            return None
 
-            # Pick and append values which have complete entry
-            if flag and len(values) == 4:
-                rows.append(values)
+        sampler = samples['sampler']
+        clk_tck = sampler.get('clk_tck', 100)
+        if interval is None:
+            interval = sampler.get('log_interval', 0)
+        frames = []
+        for proc in samples['procs'].values():
+            arr = proc['samples']
+            if proc['name'] != proc_name or not len(arr):
+                continue
+            if interval:
+                bins = np.floor((arr['time'] - arr['time'][0]) / interval)
+                arr = arr[np.diff(bins, prepend=-1) != 0]
+            started = (sampler.get('btime', 0)
+                       + proc.get('start', 0) / clk_tck)
+            ticks = (arr['utime'] + arr['stime']).astype(np.float64)
+            cpu_usage = (ticks / clk_tck * 100
+                         / np.maximum(arr['time'] - started, 1e-6))
+            frames.append(pd.DataFrame({
+                'Time stamp': pd.to_datetime(arr['time'], unit='s'),
+                'Process ID': proc['pid'],
+                'CPU Usage': cpu_usage,
+                'Memory Usage': arr['rss'] / (1024 * 1024)}))
+
+        if not frames:
+            return pd.DataFrame(columns=['Time stamp', 'Process ID',
+                                         'CPU Usage', 'Memory Usage'])
+        return pd.concat(frames).sort_values('Time stamp',
+                                             ignore_index=True)
+
+    def remove_resource_samples(self, nodes: list, test_name: str):
+        """Removes the samples of a test from the nodes.
 
-        # Create a panda dataframe and set the type for columns
-        dataframe = pd.DataFrame(rows[1:], columns=rows[0])
-        conversion_dict = {'Process ID': int,
-                           'CPU Usage': float,
-                           'Memory Usage': float}
-        dataframe = dataframe.astype(conversion_dict)
-        return dataframe
+        Args:
+         nodes(list): Nodes from which the samples are to be removed
+         test_name(str): Name of the testcase for which usage was sampled
+        """
+        if not isinstance(nodes, list):
+            nodes = [nodes]
+        self.invalidate_resource_samples(test_name)
+        for node in nodes:
+            self.samplers.pop((node, test_name), None)
+        self.execute_abstract_op_multinode(
+            f"rm -rf {self.SAMPLE_DIR}/{test_name}", nodes, False)
 
     def _perform_three_point_check_for_memory_leak(self, dataframe, node: str,
                                                    process: str, gain: float,
@@ -273,61 +393,165 @@ class MemoryAndCpuOps(AbstractOps):
          bool: True if memory leak instances are observed else False
         """
         # Filter dataframe to be process wise if it's volume specific process
-        if process in ('glusterfs', 'glusterfsd'):
-            if process == 'glusterfs' and pid:
-                dataframe = dataframe[dataframe['Process ID'] == pid]
-
-        # Compute usage gain throught the data frame
-        memory_increments = list(dataframe['Memory Usage'].diff().dropna())
-
-        # Check if usage is more than accepted amount of leak
-        memory_leak_decision_array = np.where(
-            dataframe['Memory Usage'].diff().dropna() > gain, True, False)
-        instances_of_leak = np.where(memory_leak_decision_array)[0]
-
-        # If memory leak instances are present check if it's reduced
-        count_of_leak_instances = len(instances_of_leak)
-        if count_of_leak_instances > 0:
-            self.logger.error(f'There are {count_of_leak_instances} instances'
-                              f' of memory leaks on node {node}')
-            for instance in instances_of_leak:
-                # In cases of last log file entry the below op could throw
-                # IndexError which is handled as below.
-                try:
-                    # Check if memory gain had decrease in the consecutive
-                    # entries, after 2 entry and betwen current and last entry
-                    if all([memory_increments[instance+1]
-                           > memory_increments[instance],
-                           memory_increments[instance+2]
-                           > memory_increments[instance],
-                           (memory_increments[len(memory_increments)-1]
-                            > memory_increments[instance])]):
-                        return True
-
-                except IndexError:
-                    # In case of last log file entry rerun the command
-                    # and check for difference
-                    self.logger.info('Instance at last log entry.')
-                    if process in ('glusterfs', 'glusterfsd'):
-                        cmd = ("ps u -p %s | awk 'NR>1 && $11~/%s$/{print "
-                               " $6/1024}'" % (pid, process))
-                    else:
-                        cmd = ("ps u -p `pgrep glusterd` | "
-                               "awk 'NR>1 && $11~/glusterd$/{print $6/1024}'")
-                    ret = self.execute_abstract_op_node(cmd, node)
-                    if ret['error_code'] != 0:
-                        self.logger.error('Unable to run the command to '
-                                          'fetch current memory utilization.')
-                        continue
-                    usage_now = float(ret['msg'].replace('\n', '')[2])
-                    last_entry = dataframe['Memory Usage'].iloc[-1]
+        if process in ('glusterfs', 'glusterfsd') and pid:
+            dataframe = dataframe[dataframe['Process ID'].astype(str)
+                                  == str(pid)]
+
+        # Check if usage is more than accepted amount of leak, and if so
+        # whether it kept on growing
+        (leak, tail) = three_point_leaks(
+            dataframe['Memory Usage'].to_numpy(), gain)
+        if leak or len(tail):
+            self.logger.error(f'There are instances of memory leaks on node '
+                              f'{node}')
+        if leak:
+            return True
+
+        if len(tail):
+            # The instances at the last samples are checked against the
+            # current usage.
+            self.logger.info('Instance at last log entry.')
+            if process in ('glusterfs', 'glusterfsd'):
+                cmd = ("ps u -p %s | awk 'NR>1 && $11~/%s$/{print "
+                       " $6/1024}'" % (pid, process))
+            else:
+                cmd = ("ps u -p `pgrep glusterd` | "
+                       "awk 'NR>1 && $11~/glusterd$/{print $6/1024}'")
+            ret = self.execute_abstract_op_node(cmd, node)
+            if ret['error_code'] != 0:
+                self.logger.error('Unable to run the command to '
+                                  'fetch current memory utilization.')
+                return False
+            usage_now = float(ret['msg'].replace('\n', '')[2])
+            last_entry = dataframe['Memory Usage'].iloc[-1]
 
-                    # Check if current memory usage is higher than last entry
-                    fresh_diff = last_entry - usage_now
-                    if gain < fresh_diff < last_entry:
-                        return True
+            # Check if current memory usage is higher than last entry
+            fresh_diff = last_entry - usage_now
+            if gain < fresh_diff < last_entry:
+                return True
         return False
 
+    def _memory_trends(self, node: str, test_name: str, proc_name: str,
+                       warmup: float) -> tuple:
+        """Fits the memory usage over time of the sampled processes of a
+        node, all the processes being fitted at once.
+
+        Returns:
+         tuple: (procs, trends) where procs is the list of the processes
+                and trends the arrays of usage_trends, indexed alike, in
+                MB and hours. None if the samples couldn't be pulled.
+        """
+        samples = self.collect_resource_samples(node, test_name)
+        if samples is None:
+            return None
+
+        procs = [proc for proc in samples['procs'].values()
+                 if proc_name is None or proc['name'] == proc_name]
+        arrays = [proc['samples'] for proc in procs]
+        group = np.repeat(np.arange(len(procs)),
+                          [len(arr) for arr in arrays])
+        stacked = np.concatenate(arrays or [np.empty(
+            0, dtype=self.SAMPLE_DTYPE)])
+        if warmup and len(stacked):
+            starts = np.array([arr['time'][0] if len(arr) else 0
+                               for arr in arrays])
+            keep = stacked['time'] >= starts[group] + warmup
+            group = group[keep]
+            stacked = stacked[keep]
+
+        trends = usage_trends(group, stacked['time'] / 3600,
+                              stacked['rss'] / (1024 * 1024), len(procs))
+        return (procs, trends)
+
+    def analyze_memory_growth(self, node: str, test_name: str,
+                              proc_name: str = None,
+                              warmup: float = 0) -> list:
+        """Fits the memory usage over time of each of the sampled
+        processes of a node.
+
+        Args:
+         node(str): Node on which the usage was sampled
+         test_name(str): Name of the testcase for which usage was sampled
+        Optional:
+         proc_name(str): Name of the processes to be analyzed, e.g.
+                         glusterfsd. All the processes if None.
+                         (Default:None)
+         warmup(float): Seconds at the start of the sampling of a process
+                        which are left out, the usage settling down after
+                        the process starts (Default:0)
+
+        Returns:
+         list: The trend of the usage of each process,
+               [{'pid': .., 'name': .., 'role': ..,
+                 'samples': number of samples fitted,
+                 'slope': growth of the usage in MB per hour,
+                 'r2': steadiness of the growth, from 0 to 1,
+                 'growth': last usage - first usage in MB,
+                 'peak': highest usage in MB}]
+               or None if the samples couldn't be pulled.
+        """
+        ret = self._memory_trends(node, test_name, proc_name, warmup)
+        if ret is None:
+            return None
+
+        (procs, trends) = ret
+        growth = trends['last'] - trends['first']
+        return [{'pid': proc['pid'], 'name': proc['name'],
+                 'role': proc['role'],
+                 'samples': int(trends['samples'][index]),
+                 'slope': float(trends['slope'][index]),
+                 'r2': float(trends['r2'][index]),
+                 'growth': float(growth[index]),
+                 'peak': float(trends['peak'][index])}
+                for (index, proc) in enumerate(procs)]
+
+    def check_for_memory_growth(self, nodes: list, test_name: str,
+                                max_slope: float = 100.0,
+                                min_r2: float = 0.9,
+                                proc_name: str = None,
+                                warmup: float = 60) -> bool:
+        """Check for a steady growth of the memory usage of the gluster
+        processes, as a leak leaking less than the accepted gain over an
+        interval doesn't show up in the three point check.
+
+        Args:
+         nodes(list): Nodes on which memory growth has to be checked
+         test_name(str): Name of testcase for which memory growth has to be
+                         checked
+        Optional:
+         max_slope(float): Accepted growth of the usage in MB per hour
+                           (Default:100)
+         min_r2(float): Steadiness of the growth, from 0 to 1, above which
+                        it is taken as a leak (Default:0.9)
+         proc_name(str): Name of the processes to be checked. All the
+                         processes if None (Default:None)
+         warmup(float): Seconds at the start of the sampling of a process
+                        which are left out (Default:60)
+
+        Returns:
+         bool: True if a steady memory growth was observed else False
+        """
+        self.logger.debug("Checking for memory growth")
+        if not isinstance(nodes, list):
+            nodes = [nodes]
+        is_there_a_leak = False
+        for node in nodes:
+            ret = self._memory_trends(node, test_name, proc_name, warmup)
+            if ret is None:
+                self.logger.error(f"Cannot analyze the samples on {node}")
+                continue
+
+            (procs, trends) = ret
+            for index in np.flatnonzero(growth_leaks(trends, max_slope,
+                                                     min_r2)).tolist():
+                self.logger.error(
+                    f"Memory growth of {trends['slope'][index]:.1f} MB/hour"
+                    f" (r2 {trends['r2'][index]:.2f}) observed on node "
+                    f"{node} in {procs[index]['role']} process "
+                    f"{procs[index]['pid']}")
+                is_there_a_leak = True
+        return is_there_a_leak
+
     def check_for_memory_leaks_in_glusterd(self, nodes: list, test_name: str,
                                            gain: int = 30.0) -> bool:
         """Check for memory leaks in glusterd
@@ -346,9 +570,9 @@ class MemoryAndCpuOps(AbstractOps):
         self.logger.debug("Checking for memory leak in glusterd")
         is_there_a_leak = []
         for node in nodes:
-            dataframe = self.create_dataframe_from_csv(node, 'glusterd',
-                                                       test_name)
-            if dataframe.empty:
+            dataframe = self.create_dataframe_from_samples(
+                node, 'glusterd', test_name)
+            if dataframe is None or dataframe.empty:
                 self.logger.error("Dataframe is Empty")
                 return False
 
@@ -391,9 +615,9 @@ class MemoryAndCpuOps(AbstractOps):
             if volume_status is None:
                 self.logger.error("Failed to get volume status")
                 return False
-            dataframe = self.create_dataframe_from_csv(node, 'glusterfs',
-                                                       test_name)
-            if dataframe.empty:
+            dataframe = self.create_dataframe_from_samples(
+                node, 'glusterfs', test_name)
+            if dataframe is None or dataframe.empty:
                 self.logger.error("Dataframe is Empty")
                 return False
 
@@ -443,9 +667,9 @@ class MemoryAndCpuOps(AbstractOps):
             if volume_status is None:
                 self.logger.error("Failed to get volume status")
                 return False
-            dataframe = self.create_dataframe_from_csv(node, 'glusterfsd',
-                                                       test_name)
-            if dataframe.empty:
+            dataframe = self.create_dataframe_from_samples(
+                node, 'glusterfsd', test_name)
+            if dataframe is None or dataframe.empty:
                 self.logger.error("Dataframe is Empty")
                 return False
 
@@ -471,7 +695,9 @@ class MemoryAndCpuOps(AbstractOps):
     def check_for_memory_leaks_and_oom_kills_on_servers(self, test_id: str,
                                                         nodes: list,
                                                         vol_name: str,
-                                                        gain=30.0) -> bool:
+                                                        gain=30.0,
+                                                        max_slope=None
+                                                        ) -> bool:
         """Check for memory leaks and OOM kills on servers
 
         Args:
@@ -481,6 +707,9 @@ class MemoryAndCpuOps(AbstractOps):
         Optional:
          gain(float): Accepted amount of leak for a given testcase in MB
                       (Default:30)
+         max_slope(float): Accepted steady growth of the usage in MB per
+                           hour. The growth isn't checked if None
+                           (Default:None)
 
         Returns:
          bool: True if memory leaks or OOM kills are observed else false
@@ -509,6 +738,13 @@ class MemoryAndCpuOps(AbstractOps):
             self.logger.error("Memory leak on brick process.")
             return True
 
+        # Check for a steady growth of all gluster server processes
+        if (max_slope is not None
+                and self.check_for_memory_growth(nodes, test_id,
+                                                 max_slope)):
+            self.logger.error("Memory growth on servers.")
+            return True
+
         # Check OOM kills on servers for all gluster server processes
         if self.check_for_oom_killers_on_servers(nodes):
             self.logger.error('OOM kills present on servers.')
@@ -539,9 +775,9 @@ class MemoryAndCpuOps(AbstractOps):
         is_there_a_leak = []
         for node in nodes:
             # Get the volume status on the node
-            dataframe = self.create_dataframe_from_csv(node, 'glusterfs',
-                                                       test_name)
-            if dataframe.empty:
+            dataframe = self.create_dataframe_from_samples(
+                node, 'glusterfs', test_name)
+            if dataframe is None or dataframe.empty:
                 self.logger.error("Dataframe is Empty")
                 return False
 
@@ -576,7 +812,9 @@ class MemoryAndCpuOps(AbstractOps):
 
     def check_for_memory_leaks_and_oom_kills_on_clients(self, test_id: str,
                                                         nodes: list,
-                                                        gain=30) -> bool:
+                                                        gain=30,
+                                                        max_slope=None
+                                                        ) -> bool:
         """Check for memory leaks and OOM kills on clients
 
         Args:
@@ -585,6 +823,9 @@ class MemoryAndCpuOps(AbstractOps):
         Optional:
          gain(float): Accepted amount of leak for a given testcase in MB
                       (Default:30)
+         max_slope(float): Accepted steady growth of the usage in MB per
+                           hour. The growth isn't checked if None
+                           (Default:None)
 
         Returns:
          bool: True if memory leaks or OOM kills are observed else false
@@ -595,6 +836,13 @@ class MemoryAndCpuOps(AbstractOps):
             self.logger.error("Memory leaks observed on FUSE clients.")
             return True
 
+        # Check for a steady growth of the glusterfs fuse process
+        if (max_slope is not None
+                and self.check_for_memory_growth(nodes, test_id, max_slope,
+                                                 proc_name='glusterfs')):
+            self.logger.error("Memory growth observed on FUSE clients.")
+            return True
+
         # Check for oom kills on clients
         if self.check_for_oom_killers_on_clients(nodes):
             self.logger.error("OOM kills present on clients.")
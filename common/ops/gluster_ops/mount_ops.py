@@ -3,7 +3,6 @@ This file contains one class - MountOps which
 holds mount related APIs which will be called
 from the test case.
 """
-from time import sleep
 from common.ops.abstract_ops import AbstractOps
 
 
@@ -152,16 +151,7 @@ class MountOps(AbstractOps):
 
         """
         cmd = f"stat -c '%a' {mountpoint}"
-        count = 0
-        while count <= timeout:
-            ret = self.execute_abstract_op_node(cmd,
-                                                client_node,
-                                                False)
-            if ret['error_code'] == 0:
-                return True
-            sleep(1)
-            count += 1
-        return False
+        return self.wait_for_remote_condition(cmd, client_node, timeout)
 
     def mount_snap(self, server: str, volname: str, snapname: str,
                    node: str, path: str, excep: bool = True) -> dict:
@@ -8,6 +8,7 @@ import random
 from time import sleep
 import socket
 from common.ops.abstract_ops import AbstractOps
+from common.waiter import wait_until
 
 
 class PeerOps(AbstractOps):
@@ -44,6 +45,7 @@ class PeerOps(AbstractOps):
         cmd = f'gluster --xml peer probe {server}'
 
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_cluster_state()
 
         return ret
 
@@ -136,6 +138,7 @@ class PeerOps(AbstractOps):
             cmd = f"gluster --xml peer detach {server} --mode=script"
 
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_cluster_state()
 
         return ret
 
@@ -389,14 +392,8 @@ class PeerOps(AbstractOps):
         if not isinstance(servers, list):
             servers = [servers]
 
-        count = 0
-        while count <= wait_timeout:
-            ret = self.is_peer_connected(servers, node)
-            if ret:
-                return True
-            sleep(1)
-            count += 1
-        return False
+        return bool(wait_until(lambda: self.is_peer_connected(servers, node),
+                               wait_timeout))
 
     def validate_peers_are_connected(self, server_list: list,
                                      node: str = None) -> bool:
@@ -451,12 +448,5 @@ class PeerOps(AbstractOps):
         Returns:
             bool: True if everything is perfect. Else False
         """
-        iter_v = 0
-        while iter_v < timeout:
-            ret = self.validate_peers_are_connected(server_list)
-            if ret:
-                return True
-            sleep(1)
-            iter_v += 1
-
-        return False
+        return bool(wait_until(
+            lambda: self.validate_peers_are_connected(server_list), timeout))
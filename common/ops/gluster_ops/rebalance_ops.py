@@ -3,8 +3,8 @@ This file contains one class - RebalanceOps which
 holds rebalance operation functions which will be called
 from the test case.
 """
-import time
 from common.ops.abstract_ops import AbstractOps
+from common.waiter import wait_until
 
 
 class RebalanceOps(AbstractOps):
@@ -61,6 +61,9 @@ class RebalanceOps(AbstractOps):
         cmd = f"gluster volume rebalance {volname} {flayout} start {frce}"
         ret = self.execute_abstract_op_node(cmd, node, excep)
 
+        # Rebalance and fix-layout rewrite the directory layouts.
+        self.invalidate_layout_cache(volname)
+
         return ret
 
     def rebalance_stop(self, volname: str, node: str) -> dict:
@@ -117,21 +120,18 @@ class RebalanceOps(AbstractOps):
             True on success, False otherwise
         """
 
-        count = 0
-        while count < timeout:
-            status_info = self.get_rebalance_status(volname, node)
+        status = self._wait_for_rebalance_status(
+            volname, node, ('fix-layout completed', 'fix-layout failed'),
+            timeout)
+        if status == 'fix-layout completed':
+            self.logger.info("Fix-layout is successfully completed")
+            self.invalidate_layout_cache(volname)
+            return True
+        if status == 'fix-layout failed':
+            self.logger.error("Fix-layout failed on one or more nodes."
+                              "Check rebalance status for more details")
+            return False
 
-            status = status_info['aggregate']['statusStr']
-            if status == 'fix-layout completed':
-                self.logger.info("Fix-layout is successfully completed")
-                return True
-            if status == 'fix-layout failed':
-                self.logger.error("Fix-layout failed on one or more nodes."
-                                  "Check rebalance status for more details")
-                return False
-
-            time.sleep(5)
-            count += 5
         self.logger.error("Fix layout has not completed. Wait timeout.")
         return False
 
@@ -149,25 +149,41 @@ class RebalanceOps(AbstractOps):
             True on success, False otherwise
         """
 
-        count = 0
-        while count < timeout:
-            status_info = self.get_rebalance_status(volname, node)
+        status = self._wait_for_rebalance_status(
+            volname, node, ('completed', 'failed'), timeout)
+        if status == 'completed':
+            self.logger.info("Rebalance is successfully completed")
+            self.invalidate_layout_cache(volname)
+            return True
+        if status == 'failed':
+            self.logger.error("Rebalance failed on one or more nodes."
+                              "Check rebalance status for more details")
+            return False
 
-            status = status_info['aggregate']['statusStr']
-            if status == 'completed':
-                self.logger.info("Rebalance is successfully completed")
-                return True
-            if status == 'failed':
-                self.logger.error("Rebalance failed on one or more nodes."
-                                  "Check rebalance status for more details")
-                return False
-
-            time.sleep(5)
-            count += 5
         self.logger.error("Rebalance operation has not completed."
                           "Wait timeout.")
         return False
 
+    def _wait_for_rebalance_status(self, volname: str, node: str,
+                                   end_states: tuple, timeout: int) -> str:
+        """
+        Waits till the aggregate status of the rebalance reaches one of the
+        end states.
+
+        Returns:
+            str: The status reached, or the last status seen on timeout.
+        """
+        status = None
+
+        def _status_reached():
+            nonlocal status
+            status_info = self.get_rebalance_status(volname, node)
+            status = status_info['aggregate']['statusStr']
+            return status in end_states
+
+        wait_until(_status_reached, timeout, max_interval=5)
+        return status
+
     def set_rebalance_throttle(self, volname: str, node: str,
                                throttle_type='normal',
                                excep: bool = True) -> dict:
@@ -268,6 +268,7 @@ class SnapshotOps(AbstractOps):
         cmd = (f"gluster snapshot clone {clonename} {snapname} --mode=script"
                " --xml")
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_cluster_state()
         if not excep and ret['msg']['opRet'] != '0':
             return ret
 
@@ -319,7 +320,9 @@ class SnapshotOps(AbstractOps):
                 - node : node on which the command got executed
         """
         cmd = (f"gluster snapshot restore {snapname} --mode=script --xml")
-        return self.execute_abstract_op_node(cmd, node, excep)
+        ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_cluster_state()
+        return ret
 
     def snap_restore_complete(self, volname: str, snapname: str,
                               node: str, excep: bool = True) -> bool:
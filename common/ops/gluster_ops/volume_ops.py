@@ -5,9 +5,11 @@ from the test case.
 """
 # pylint: disable=too-many-lines
 
-from time import sleep
+from time import sleep, time
 import socket
+from common import gluster_xml
 from common.ops.abstract_ops import AbstractOps
+from common.waiter import Deadline, wait_until
 
 
 class VolumeOps(AbstractOps):
@@ -17,6 +19,8 @@ class VolumeOps(AbstractOps):
     fetch information.
     """
 
+    cluster_state_ttl = 3
+
     def setup_volume(self, volname: str, node: str, conf_hash: dict,
                      server_list: list, brick_root: dict,
                      force: bool = False, create_only: bool = False,
@@ -152,6 +156,8 @@ class VolumeOps(AbstractOps):
             cmd = (f"{cmd} force")
 
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_layout_cache(volname)
+        self.invalidate_cluster_state()
 
         # Don't add data in case volume creation fails
         if ret['error_code'] == 0:
@@ -219,6 +225,8 @@ class VolumeOps(AbstractOps):
             cmd = (f"{cmd} force")
 
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_layout_cache(volname)
+        self.invalidate_cluster_state()
 
         # Don't add data in case volume creation fails
         if ret['error_code'] == 0:
@@ -261,6 +269,7 @@ class VolumeOps(AbstractOps):
             cmd = f"gluster volume start {volname} --mode=script --xml"
 
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_cluster_state()
 
         if not excep and (ret['error_code'] != 0
            or ret['msg']['opRet'] != '0'):
@@ -302,6 +311,7 @@ class VolumeOps(AbstractOps):
             cmd = f"gluster volume stop {volname} --mode=script --xml"
 
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_cluster_state()
 
         if ret['msg']['opRet'] == '0':
             self.es.set_volume_start_status(volname, False)
@@ -334,6 +344,8 @@ class VolumeOps(AbstractOps):
         cmd = f"gluster volume delete {volname} --mode=script --xml"
 
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_layout_cache(volname)
+        self.invalidate_cluster_state()
 
         # Delete volume for volds only if the command succeded
         if ret['msg']['opRet'] == '0':
@@ -874,46 +886,13 @@ class VolumeOps(AbstractOps):
 
         cmd = f"gluster volume info {volname} --xml"
 
-        ret = self.execute_abstract_op_node(cmd, node, excep)
+        ret = self.execute_abstract_op_node(cmd, node, excep,
+                                            gluster_xml.VOL_INFO)
 
         if not excep and ret['msg']['opRet'] != '0':
             return ret
 
-        volume_info = ret['msg']['volInfo']['volumes']
-        ret_dict = {}
-        if volume_info['count'] == '0':
-            return ret_dict
-        volume_list = volume_info['volume']
-        if not isinstance(volume_list, list):
-            volume_list = [volume_list]
-        for volume in volume_list:
-            for key, val in volume.items():
-                if key == 'name':
-                    volname = val
-                    ret_dict[volname] = {}
-                elif key == 'bricks':
-                    ret_dict[volname]['bricks'] = []
-                    brick_list = val['brick']
-                    if not isinstance(brick_list, list):
-                        brick_list = [brick_list]
-                    for brick in brick_list:
-                        brick_info = {}
-                        for b_key, b_val in brick.items():
-                            brick_info[b_key] = b_val
-                        ret_dict[volname]['bricks'].append(brick_info)
-                elif key == 'options':
-                    ret_dict[volname]['options'] = {}
-                    for option in val['option']:
-                        for opt, opt_val in option.items():
-                            if opt == 'name':
-                                opt_name = opt_val
-                            elif opt == 'value':
-                                opt_value = opt_val
-                        ret_dict[volname]['options'][opt_name] = opt_value
-                else:
-                    ret_dict[volname][key] = val
-
-        return ret_dict
+        return ret['msg']['volInfo']['volumes']
 
     def get_volume_type_info(self, node: str, volname: str) -> dict:
         """
@@ -1062,13 +1041,8 @@ class VolumeOps(AbstractOps):
         Returns:
             True if offline else False.
         """
-        itr = 0
-        while itr < timeout:
-            if not self.is_volume_started(volname, node):
-                return True
-            itr += 5
-            sleep(5)
-        return False
+        return bool(wait_until(
+            lambda: not self.is_volume_started(volname, node), timeout))
 
     def wait_for_vol_to_come_online(self, volname: str, node: str,
                                     timeout: int = 120) -> bool:
@@ -1085,13 +1059,8 @@ class VolumeOps(AbstractOps):
         Returns:
             True if online else False.
         """
-        itr = 0
-        while itr < timeout:
-            if self.is_volume_started(volname, node):
-                return True
-            itr += 5
-            sleep(5)
-        return False
+        return bool(wait_until(
+            lambda: self.is_volume_started(volname, node), timeout))
 
     def get_volume_list(self, node: str = None) -> list:
         """
@@ -1154,6 +1123,7 @@ class VolumeOps(AbstractOps):
             cmd = f"gluster volume reset {volname} --mode=script --xml"
 
         ret = self.execute_abstract_op_node(cmd, node, excep)
+        self.invalidate_cluster_state()
 
         return ret
 
@@ -1206,81 +1176,154 @@ class VolumeOps(AbstractOps):
                                                   },
                                         'pid': '669307'
                                       }],
-                             'tasks': None
+                             'task_status': None
                            }
             }
         """
         ret = {}
 
         cmd = f"gluster volume status {volname} {service} {options} --xml"
-        ret = self.execute_abstract_op_node(cmd, node, excep)
+        ret = self.execute_abstract_op_node(cmd, node, excep,
+                                            gluster_xml.VOL_STATUS)
         if not excep and ret['msg']['opRet'] != '0':
             return ret
 
-        volume_status = ret['msg']['volStatus']['volumes']
+        ret_dict = ret['msg']['volStatus']['volumes']
+        if ret_dict is None:
+            return None
+
+        self._fix_status_paths(ret_dict, node)
+        return ret_dict
+
+    def _fix_status_paths(self, vol_status_dict: dict, node: str):
+        """
+        The daemons report the localhost or their hostname as the path,
+        which are replaced by the address of the node.
+        """
+        for vol_status in vol_status_dict.values():
+            for node_info in vol_status.get('node', []):
+                if node_info.get('path') == 'localhost':
+                    node_info['path'] = node
+                elif node_info.get('hostname') in ['Snapshot Daemon',
+                                                   'Bitrot Daemon',
+                                                   'Scrubber Daemon',
+                                                   'Self-heal Daemon']:
+                    ip_val = self.convert_hosts_to_ip(node_info['path'],
+                                                      node)
+                    node_info['path'] = ip_val[0]
+
+    def invalidate_cluster_state(self):
+        """
+        Drops the cluster state snapshots of all the volumes. The snapshots
+        have to be invalidated whenever the volume info or status can
+        change, i.e. on volume create, start, stop, delete, set, reset,
+        add-brick, remove-brick, replace-brick, snapshot restore and clone,
+        peer probe and detach and on bringing bricks offline or online.
+        """
+        self.cluster_state = {}
 
-        if volume_status is None:
+    def get_cluster_state(self, node: str, volname: str,
+                          refresh: bool = False) -> dict:
+        """
+        Gives the snapshot of the volume info and the volume status of a
+        volume, as seen from a node. Both are fetched in a single round
+        trip and only the volume is queried, hence the locks of the other
+        volumes aren't taken. The snapshot of each volume and node is
+        served till it is older than cluster_state_ttl seconds or is
+        invalidated.
+
+        Args:
+            node (str): Node whose view of the volume is given.
+            volname (str): Name of the volume.
+            refresh (bool): Optional parameter with default value False. If
+                            True, the snapshot is fetched again.
+
+        Returns:
+            dict: The snapshot, of the form
+                  {
+                    'time': <time of the fetch>,
+                    'node': <node used for the fetch>,
+                    'volname': <name of the volume>,
+                    'info': <get_volume_info(node, volname) output>,
+                    'status': <get_volume_status(volname, node) output>
+                  }
+                  The status is empty if the volume isn't started.
+            NoneType: None if the snapshot couldn't be fetched.
+        """
+        key = (node, volname)
+        state = self.cluster_state.get(key)
+        if (not refresh and state is not None
+           and time() - state['time'] < self.cluster_state_ttl):
+            return state
+
+        self.cluster_state.pop(key, None)
+        cmd_list = [f"gluster volume info {volname} --xml",
+                    f"gluster volume status {volname} --xml"]
+        ret = self.execute_abstract_op_batch(cmd_list, node, False,
+                                             [gluster_xml.VOL_INFO,
+                                              gluster_xml.VOL_STATUS])
+        info_ret, status_ret = ret
+        if (info_ret['error_code'] != 0
+           or info_ret['msg']['opRet'] != '0'
+           or not info_ret['msg']['volInfo']['volumes']):
+            self.logger.error(f"Failed to get the volume info of {volname}"
+                              f" on {node}")
             return None
 
-        ret_dict = {}
-        volume_list = volume_status['volume']
-        if not isinstance(volume_list, list):
-            volume_list = [volume_list]
-        for volume in volume_list:
-            for key, val in volume.items():
-                if key == 'volName':
-                    volname = val
-                    ret_dict[volname] = {}
-                elif key == 'node':
-                    ret_dict[volname]['node'] = []
-                    node_list = val
-                    if not isinstance(node_list, list):
-                        node_list = [node_list]
-                    for node_i in node_list:
-                        node_info = {}
-                        check_flag = False
-                        for n_key, n_val in node_i.items():
-                            if n_key == 'hostname' and\
-                                n_val in ['Snapshot Daemon', 'Bitrot Daemon',
-                                          'Scrubber Daemon',
-                                          'Self-heal Daemon']:
-                                check_flag = True
-                            if n_key == 'ports':
-                                port_info = {}
-                                for p_key, p_val in n_val.items():
-                                    port_info[p_key] = p_val
-                                node_info[n_key] = port_info
-                            elif n_key == 'path' and n_val == 'localhost':
-                                node_info[n_key] = node
-                            elif check_flag and n_key == 'path':
-
-                                ip_val = self.convert_hosts_to_ip(n_val,
-                                                                  node)
-                                node_info[n_key] = ip_val[0]
-                                check_flag = False
-                            else:
-                                node_info[n_key] = n_val
-                        ret_dict[volname]['node'].append(node_info)
-                elif key == 'tasks':
-                    nodename = 'task_status'
-                    if val is None:
-                        ret_dict[volname][nodename] = None
-                        continue
-                    if not isinstance(val, list):
-                        tasks = [val]
-                    for task in tasks:
-                        if 'task' in list(task.keys()):
-                            if nodename not in list(ret_dict[volname].keys()):
-                                ret_dict[volname][nodename] = [task['task']]
-                            else:
-                                ret_dict[volname][nodename].append(
-                                    task['task'])
-                        else:
-                            ret_dict[volname][nodename] = [task]
-                else:
-                    ret_dict[volname][key] = val
+        vol_status = {}
+        # Volume status fails when the volume isn't started.
+        if (status_ret['error_code'] == 0
+           and status_ret['msg']['opRet'] == '0'):
+            vol_status = status_ret['msg']['volStatus']['volumes'] or {}
+            self._fix_status_paths(vol_status, node)
+
+        self.cluster_state[key] = {
+            'time': time(),
+            'node': node,
+            'volname': volname,
+            'info': info_ret['msg']['volInfo']['volumes'],
+            'status': vol_status
+        }
+        return self.cluster_state[key]
 
-        return ret_dict
+    def get_cached_volume_info(self, node: str, volname: str,
+                               excep: bool = True) -> dict:
+        """
+        Gives the volume info of a volume from the cluster state snapshot,
+        falling back to get_volume_info if the snapshot couldn't be taken.
+
+        Args:
+            node (str): Node on which cmd has to be executed.
+            volname (str): Name of the volume.
+            excep (bool): exception flag passed on to get_volume_info.
+
+        Returns:
+            dict: Same as get_volume_info(node, volname, excep).
+        """
+        state = self.get_cluster_state(node, volname)
+        if state is not None and volname in state['info']:
+            return {volname: state['info'][volname]}
+        return self.get_volume_info(node, volname, excep)
+
+    def get_cached_volume_status(self, volname: str, node: str,
+                                 excep: bool = True) -> dict:
+        """
+        Gives the volume status of a volume from the cluster state
+        snapshot, falling back to get_volume_status if the volume isn't in
+        it, as is the case for a stopped volume.
+
+        Args:
+            volname (str): Name of the volume.
+            node (str): Node on which cmd has to be executed.
+            excep (bool): exception flag passed on to get_volume_status.
+
+        Returns:
+            dict: Same as get_volume_status(volname, node, excep=excep).
+        """
+        state = self.get_cluster_state(node, volname)
+        if state is not None and volname in state['status']:
+            return {volname: state['status'][volname]}
+        return self.get_volume_status(volname, node, excep=excep)
 
     def get_volume_options(self, volname: str = 'all', option: str = 'all',
                            node: str = None, excep: bool = True) -> dict:
@@ -1359,6 +1402,7 @@ class VolumeOps(AbstractOps):
             set_volume_options("test-vol1", options, server)
         """
 
+        self.invalidate_cluster_state()
         volume_options = options
         if 'group' in volume_options:
             group_options = volume_options.pop('group')
@@ -1454,6 +1498,7 @@ class VolumeOps(AbstractOps):
             cmd = f"gluster vol reset {volname} {option} --mode=script --xml"
 
         ret = self.execute_abstract_op_node(cmd, node)
+        self.invalidate_cluster_state()
         self.es.reset_volume_option(volname, option)
 
         return ret
@@ -1498,12 +1543,12 @@ class VolumeOps(AbstractOps):
             bool : True if the volume is distributed volume. False otherwise
             NoneType: None if volume does not exist.
         """
-        volume_dict = self.get_volume_type_info(node, volname)
-        if not volume_dict:
+        volinfo = self.get_cached_volume_info(node, volname)
+        if not volinfo or volname not in volinfo:
             self.logger.error("Failed to check the volume type")
             return False
 
-        if volume_dict['volume_type_info']['typeStr'] == "Distribute":
+        if volinfo[volname].get('typeStr') == "Distribute":
             return True
 
         return False
@@ -1534,19 +1579,21 @@ class VolumeOps(AbstractOps):
             self.logger.error(f"Failed to get brick list of volume {volname}")
             return False
 
-        # Wait for bricks to be online
-        bricks_online_status = (
-            self.wait_for_bricks_to_come_online(volname, server_list,
-                                                brick_list))
-        if not bricks_online_status:
-            self.logger.error(f"Failed to wait for the volume {volname} "
-                              "processes to be online")
-            return False
+        # Both the waits below share the timeout.
+        with Deadline(timeout):
+            # Wait for bricks to be online
+            bricks_online_status = (
+                self.wait_for_bricks_to_come_online(volname, server_list,
+                                                    brick_list))
+            if not bricks_online_status:
+                self.logger.error(f"Failed to wait for the volume {volname} "
+                                  "processes to be online")
+                return False
 
-        # Wait for self-heal-daemons to be online
-        self_heal_daemon_online_status = (
-            self.wait_for_self_heal_daemons_to_be_online(volname, node,
-                                                         timeout))
+            # Wait for self-heal-daemons to be online
+            self_heal_daemon_online_status = (
+                self.wait_for_self_heal_daemons_to_be_online(volname, node,
+                                                             timeout))
         if not self_heal_daemon_online_status:
             self.logger.error(f"Failed to wait for the volume {volname}"
                               " processes to be online")
@@ -1572,7 +1619,7 @@ class VolumeOps(AbstractOps):
         """
         subvols = []
 
-        volinfo = self.get_volume_info(node, volname)
+        volinfo = self.get_cached_volume_info(node, volname)
         if volinfo:
             voltype = volinfo[volname]['typeStr']
             brick_list = volinfo[volname]['bricks']
@@ -2,8 +2,14 @@
 This file contains one class - IoOps which
 holds API for running all the IO commands.
 """
+import hashlib
+import json
 import os
 import re
+import socket
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+from common.ndjson import iter_ndjson, ndjson_line_handler
 from common.ops.abstract_ops import AbstractOps
 
 
@@ -16,6 +22,14 @@ class IoOps(AbstractOps):
     the other the io_ops which execute on mountpoints.
     """
 
+    # Xattrs collected by the tree scans unless told otherwise.
+    SCAN_XATTRS = ('trusted.glusterfs.dht', 'trusted.gfid',
+                   'trusted.glusterfs.dht.linkto', 'trusted.afr.*')
+    # Scans consulted by the per path helpers, see scanned_trees.
+    _tree_scans = ()
+    # Addresses of the node names seen within the scans, see _scan_node.
+    _scan_addrs = {}
+
     def create_file(self, path: str, filename: str, node: str) -> bool:
         """
         Creates a file in the specified specified path
@@ -123,10 +137,32 @@ class IoOps(AbstractOps):
         if not isinstance(list_of_paths, list):
             list_of_paths = (list_of_paths.split(" "))
 
-        for path in list_of_paths:
-            cmd = f"stat {path}"
-            ret = self.execute_command_multinode(cmd, list_of_nodes)
-            for each_ret in ret:
+        # The paths under a scanned tree are answered by the scan, the
+        # rest being stat'ed on their node.
+        cmd_dict = {}
+        for node in list_of_nodes:
+            for path in list_of_paths:
+                (scan, record) = self._lookup_tree_scan(node, path)
+                if scan is None:
+                    cmd_dict.setdefault(node, []).append(f"stat {path}")
+                elif record is None:
+                    self.logger.error(f"stat: cannot stat '{path}': No such "
+                                      f"file or directory on node {node}")
+                    return False
+
+        if not cmd_dict:
+            return True
+        ret = self.execute_command_batch_multinode(cmd_dict)
+        for node in cmd_dict:
+            # A node whose batch failed to run leaves the paths unchecked.
+            node_ret = ret.get(node, [])
+            if (len(node_ret) != len(cmd_dict[node])
+                    or not all('error_code' in each_ret
+                               for each_ret in node_ret)):
+                self.logger.error(f"Unable to check the paths on node "
+                                  f"{node}")
+                return False
+            for each_ret in node_ret:
                 if each_ret['error_code'] != 0:
                     error_string = each_ret['error_msg'].rstrip('\n')
                     self.logger.error(f"{error_string} on node "
@@ -249,43 +285,57 @@ class IoOps(AbstractOps):
               "msg" : DICT or string of error
             }
         """
-        ret_val = {'error_code': 0, 'msg': {}}
-        cmd = (f"python3 /usr/share/redant/script/file_dir_ops.py stat {path}")
+        (scan, record) = self._lookup_tree_scan(node, path)
+        if scan is not None:
+            if record is None:
+                return {'error_code': 1,
+                        'msg': f"Unable to get the stat of path {path} : "
+                               "No such file or directory"}
+            return {'error_code': 0, 'msg': dict(record['stat'])}
+
+        ret = self.call_agent('stat', node, path=path)
+        if ret['Flag']:
+            if ret['error_code'] != 0:
+                return {'error_code': ret['error_code'],
+                        'msg': f"Unable to get the stat of path {path} : "
+                               f"{ret['error_msg']}"}
+            return {'error_code': 0, 'msg': ret['msg']}
+
+        cmd = ("python3 /usr/share/redant/script/file_dir_ops.py stat "
+               f"--json {path}")
         ret = self.execute_abstract_op_node(cmd, node, False)
-        if ret['error_code'] != 0:
-            ret_val['error_code'] = ret['error_code']
-            ret_val['msg'] = ret['error_msg']
-            return ret_val
-        tmp_msg = ret['msg'][2:-3]
-        tmp_msg = tmp_msg[0][tmp_msg[0].find('{'):-1]
-        stat_res = {}
-        for list_val in tmp_msg.split(','):
-            tmp_val = list_val.split(':')
-            if len(tmp_val) == 1:
-                tmp_val = list_val.split('=')
-            if tmp_val[0].find('{') >= 0:
-                tmp_val[0] = tmp_val[0][1:]
-            if tmp_val[1].find('}') >= 0:
-                tmp_val[1] = tmp_val[1][:-1]
-            if tmp_val[1].find(')') >= 0:
-                tmp_val[1] = tmp_val[1][:-1]
-            tmp_val[0] = tmp_val[0].strip().replace("'", "")
-            tmp_val[1] = tmp_val[1].strip().replace("'", "")
-            if tmp_val[0] == 'stat':
-                tmp_val[0] = tmp_val[1][15:].split('=')[0]
-                tmp_val[1] = tmp_val[1][15:].split('=')[1]
-            if tmp_val[1].isdigit():
-                tmp_val[1] = float(tmp_val[1])
-                if tmp_val[1].is_integer():
-                    tmp_val[1] = int(tmp_val[1])
-            stat_res[tmp_val[0]] = tmp_val[1]
-        ret_val['msg'] = stat_res
-        return ret_val
+        records = list(iter_ndjson(ret['msg']))
+        if not records:
+            return {'error_code': ret['error_code'] or 1,
+                    'msg': ret['error_msg']}
+        if 'error' in records[0]:
+            return {'error_code': ret['error_code'] or 1,
+                    'msg': records[0]['error']}
+        return {'error_code': 0, 'msg': records[0]['stat']}
+
+    def _form_workload_opts(self, size_dist: str, fsync: str,
+                            workers: int, seed: int = None) -> str:
+        """
+        Forms the workload options of the create commands of the
+        file_dir_ops script.
+        """
+        opts = ""
+        if size_dist is not None:
+            opts += f" --size-dist {size_dist}"
+        if fsync is not None:
+            opts += f" --fsync {fsync}"
+        if workers is not None:
+            opts += f" --workers {workers}"
+        if seed is not None:
+            opts += f" --seed {seed}"
+        return opts
 
     def create_files(self, fix_fil_size: str, path: str, node: str,
                      num_files: int = 1,
                      base_file_name: str = "testfile",
-                     file_type: str = "txt") -> dict:
+                     file_type: str = "txt", size_dist: str = None,
+                     fsync: str = None, workers: int = None,
+                     seed: int = None) -> dict:
         """
         Create files with fixed size. This function encapsulates the
         operation of the file_dir_ops script present in the client machines.
@@ -297,19 +347,34 @@ class IoOps(AbstractOps):
                              under 'dir'
             base_file_name (str): Base file name
             file_type (str): Type of file to create
+            size_dist (str): Distribution of the file sizes, overriding
+                             fix_fil_size, e.g. uniform:1k:1M or
+                             lognormal:64k:1.0
+            fsync (str): 'file' to fsync every file, 'end' to sync once
+                         at the end, 'none' not to sync.
+            workers (int): Number of files written in parallel. Defaults
+                           to the number of cores of the node.
+            seed (int): Seeds the size and the content of every file by
+                        its path relative to 'path', for them to be
+                        checked by verify_seeded_files.
         Returns:
             async_object
         """
         cmd = (f"python3 /usr/share/redant/script/file_dir_ops.py create_files"
                f" -f {num_files} --fixed-file-size {fix_fil_size} "
                f"--base-file-name {base_file_name} "
-               f"--file-types {file_type} {path}")
+               f"--file-types {file_type}"
+               f"{self._form_workload_opts(size_dist, fsync, workers, seed)}"
+               f" {path}")
         return self.execute_command_async(cmd, node)
 
     def create_deep_dirs_with_files(self, path: str, dir_start_no: int,
                                     dir_depth: int, dir_length: int,
                                     max_no_dirs: int, no_files: int,
-                                    node: str) -> dict:
+                                    node: str, size_dist: str = None,
+                                    fsync: str = None,
+                                    workers: int = None,
+                                    seed: int = None) -> dict:
         """
         Create deep directories and files. This function encapsulates the
         operation of the file_dir_ops script present in the client machines.
@@ -323,6 +388,12 @@ class IoOps(AbstractOps):
             no_files (int) : The number of files to be created under a
                              directory.
             node (str) : Node wherein the commad has to be run.
+            size_dist (str): Distribution of the file sizes, as for
+                             create_files.
+            fsync (str): fsync policy, as for create_files.
+            workers (int): Number of files written in parallel per top
+                           level dir.
+            seed (int): Seeds the files, as for create_files.
         Returns:
             async_object
         """
@@ -330,9 +401,141 @@ class IoOps(AbstractOps):
                f" create_deep_dirs_with_files --dirname-start-num"
                f" {dir_start_no} --dir-depth {dir_depth}"
                f" --dir-length {dir_length} --max-num-of-dirs {max_no_dirs} "
-               f"--num-of-files {no_files} {path}")
+               f"--num-of-files {no_files}"
+               f"{self._form_workload_opts(size_dist, fsync, workers, seed)}"
+               f" {path}")
         return self.execute_command_async(cmd, node)
 
+    def get_workload_report(self, ret: dict) -> dict:
+        """
+        Picks the throughput achieved by a create command of the
+        file_dir_ops script out of its output.
+        Args:
+            ret (dict): The result of the command, as returned on waiting
+                        for its async_object.
+        Returns:
+            dict: The report with the files, bytes, seconds, workers,
+                  files_per_sec and mb_per_sec, or None if the output
+                  holds no report.
+        """
+        lines = ret['msg']
+        if isinstance(lines, str):
+            lines = lines.splitlines()
+        for line in lines:
+            if line.startswith("Workload report: "):
+                return json.loads(line[len("Workload report: "):])
+        return None
+
+    def verify_seeded_files(self, trees: list, seed: int,
+                            fix_fil_size: str = None, size_dist: str = None,
+                            size_check: bool = True, workers: int = None,
+                            exclude: tuple = None,
+                            expected_files=None,
+                            expected_count: int = None) -> dict:
+        """
+        Verifies the files created with a seed under a set of trees, e.g.
+        the mounts and the bricks of a replicated volume, parallely. The
+        expected content of every file is recomputed on the node out of
+        the seed and the path of the file relative to the root of its
+        tree, hence nothing is stored nor compared across the nodes.
+
+        Args:
+            trees (list): Roots of the trees in the form 'node:path', e.g.
+                          'client1:/mnt/vol/dir' and 'server1:/bricks/
+                          brick1/vol_b0/dir'.
+            seed (int): Seed the files were created with.
+            fix_fil_size (str): Fixed file size the files were created
+                                with.
+            size_dist (str): Distribution of the file sizes the files were
+                             created with.
+            size_check (bool): False to verify the content of the files
+                               without checking their sizes.
+            workers (int): Number of files verified in parallel per tree.
+                           Defaults to the number of cores of the node.
+            exclude (tuple): Names of the dirs not to descend into.
+                             Defaults to .glusterfs and .trashcan.
+            expected_files (list|dict): Paths of the files expected under
+                                        every tree, relative to its root,
+                                        or a dict mapping a tree to its
+                                        own list. The expected files not
+                                        found are reported as 'missing'.
+            expected_count (int): Number of files expected under every
+                                  tree. A tree holding another number of
+                                  files is reported with a 'count'
+                                  mismatch.
+
+        Returns:
+            dict: The trees, keyed as they were given, mapped to their
+                  report, or to None if the verification couldn't run,
+                  {
+                    'files': .., 'bytes': .., 'seconds': ..,
+                    'mb_per_sec': ..,
+                    'mismatches': [{'path': .., 'error': 'content'|'size'|
+                                    'unreadable'|'missing'|'count',
+                                    'offset': first mismatching byte,
+                                    'size': .., 'expected_size': ..}]
+                  }
+        """
+        opts = f" --seed {seed}"
+        if fix_fil_size is not None:
+            opts += f" --fixed-file-size {fix_fil_size}"
+        if size_dist is not None:
+            opts += f" --size-dist {size_dist}"
+        if not size_check:
+            opts += " --skip-size-check"
+        if workers is not None:
+            opts += f" --workers {workers}"
+        for name in exclude or ():
+            opts += f" -e {name}"
+
+        async_objs = []
+        for tree in trees:
+            (node, root) = tree.split(':', 1)
+            paths = expected_files
+            if isinstance(expected_files, dict):
+                paths = expected_files.get(tree)
+            expected = " --expected-files -" if paths is not None else ""
+            cmd = ("python3 /usr/share/redant/script/file_dir_ops.py verify"
+                   f"{opts}{expected} {root}")
+            async_obj = self.execute_command_async(cmd, node)
+            if paths is not None and async_obj:
+                self.send_async_input(async_obj,
+                                      "".join(f"{path}\n" for path in paths))
+            async_objs.append(async_obj)
+
+        reports = {}
+        for (index, ret) in self.iter_async_results(async_objs):
+            records = list(iter_ndjson(ret['msg']))
+            if (ret['error_code'] not in (0, 1) or not records
+                    or 'summary' not in records[-1]):
+                self.logger.error(f"Failed to verify {trees[index]}: "
+                                  f"{ret['error_msg']}")
+                reports[trees[index]] = None
+                continue
+
+            report = records[-1]['summary']
+            report['mismatches'] = records[:-1]
+            if (expected_count is not None
+                    and report['files'] != expected_count):
+                report['mismatches'].append({
+                    'path': trees[index].split(':', 1)[1], 'error': 'count',
+                    'offset': 0, 'size': report['files'],
+                    'expected_size': expected_count})
+            for record in report['mismatches']:
+                if record['error'] == 'missing':
+                    self.logger.error(f"{trees[index]}: {record['path']} "
+                                      "is missing")
+                elif record['error'] == 'count':
+                    self.logger.error(f"{trees[index]}: {record['size']} "
+                                      f"files found instead of "
+                                      f"{record['expected_size']}")
+                else:
+                    self.logger.error(f"{trees[index]}: {record['error']} "
+                                      f"mismatch of {record['path']} at "
+                                      f"offset {record['offset']}")
+            reports[trees[index]] = report
+        return reports
+
     def get_file_permission(self, node: str, path: str) -> dict:
         """
         Function to get file permissions.
@@ -524,41 +727,148 @@ class IoOps(AbstractOps):
         if not isinstance(bricks_list, list):
             bricks_list = [bricks_list]
 
-        arequal_list = []
+        # The bricks are checksummed concurrently, the anonymous inode
+        # directories of each brick being found and ignored within the
+        # same command.
+        async_objs = []
         for brick in bricks_list:
-
-            # Running arequal-checksum on the brick.
             node, brick_path = brick.split(':')
-
-            # this finds the anonymous inode directories
-            # and creates the command to ignore those
-            anon_dir_cmd = ""
-            cmd = f'ls -ap {brick_path} | grep .glusterfs-anonymous-inode'
-            ret = self.execute_abstract_op_node(cmd, node, False)
-            if ret['error_code'] != 0 and ret['msg'] == []:
-                pass
-            elif ret['error_code'] == 0:
-                for anon_dir in ret['msg']:
-                    anon_dir = anon_dir.rstrip("/\n")
-                    anon_dir_cmd = f"{anon_dir_cmd} -i {anon_dir}"
-            else:
-                self.logger.error("Failed to check brick path")
-                return None
-
-            cmd = (f'arequal-checksum -p {brick_path} -i .glusterfs -i '
-                   f'.landfill -i .trashcan {anon_dir_cmd}')
-            ret = self.execute_abstract_op_node(cmd, node, False)
-
-            # Generating list accordingly
+            cmd = (f"ls -ap {brick_path} >/dev/null && "
+                   f"anon_dir_cmd=$(ls -ap {brick_path} | grep "
+                   ".glusterfs-anonymous-inode | sed -e 's#/$##' "
+                   "-e 's#^#-i #'); "
+                   f"arequal-checksum -p {brick_path} -i .glusterfs "
+                   "-i .landfill -i .trashcan $anon_dir_cmd")
+            async_objs.append(self.execute_command_async(cmd, node))
+
+        brick_arequal = {}
+        for (index, ret) in self.iter_async_results(async_objs):
+            brick = bricks_list[index]
             if ret['error_code'] != 0:
-                self.logger.error(f'Failed to get arequal on brick {brick}')
-                arequal_list.append(None)
+                self.logger.error('Failed to get arequal on brick '
+                                  f'{brick}')
+                brick_arequal[brick] = None
             else:
                 self.logger.info('Successfully calculated arequal'
                                  f' for brick {brick}')
-                arequal_list.append(ret['msg'])
+                brick_arequal[brick] = ret['msg']
+
+        return [brick_arequal[brick] for brick in bricks_list]
+
+    def invalidate_arequal_cache(self, tree: str = None):
+        """
+        Drops the cached shard checksums of a tree, see
+        collect_arequal_shards.
+
+        Args:
+            tree (str): Optional parameter with default value None. The
+                        tree in the form 'node:path'. If None, the cached
+                        checksums of all the trees are dropped.
+        """
+        if tree is None:
+            self.arequal_cache = {}
+            return
+        self.arequal_cache.pop(tree, None)
+
+    def collect_arequal_shards(self, trees: list, parallel: int = None,
+                               ignore: tuple = None,
+                               use_cache: bool = True) -> dict:
+        """
+        Collects the arequal checksums of a set of trees, each tree being
+        split into its top level directories, the shards, which are
+        checksummed in parallel on its node through
+        tools/scripts/arequal_shards.py, while all the trees are
+        processed concurrently. The checksums of the shards are cached
+        along with a signature of the mtimes, ctimes and sizes of their
+        entries, hence a repeated collection re-checksums only the shards
+        which changed since. The cached signatures are sent on the stdin
+        of the script.
+
+        Args:
+            trees (list): Roots of the trees in the form 'node:path', e.g.
+                          the bricks or 'client1:/mnt/vol'.
+            parallel (int): Optional parameter. Number of shards of a tree
+                            checksummed in parallel. Defaults to the number
+                            of cores of the node.
+            ignore (tuple): Optional parameter. Names of the directories
+                            left out. Defaults to .glusterfs, .landfill,
+                            .trashcan and the anonymous inode directories.
+            use_cache (bool): Optional parameter. False to checksum all the
+                              shards again. Default being True.
 
-        return arequal_list
+        Returns:
+            dict: The trees, keyed as they were given, mapped to
+                  {
+                    'shards': {shard: arequal-checksum output lines},
+                    'checksum': digest merging the checksums of all the
+                                shards
+                  }
+                  the entries directly under the root forming the '.'
+                  shard. A tree which failed is mapped to None. The
+                  checksums of two trees holding the same data, like a
+                  mount and the bricks of a replica set, are equal.
+        """
+        if not isinstance(trees, list):
+            trees = [trees]
+
+        opts = ""
+        if parallel is not None:
+            opts += f" -P {parallel}"
+        for name in ignore or ():
+            opts += f" -i {name}"
+
+        async_objs = []
+        for tree in trees:
+            (node, root) = tree.split(':', 1)
+            if not use_cache:
+                self.invalidate_arequal_cache(tree)
+            # The known signatures go on the stdin, as thousands of shards
+            # would exceed the limit of the command line.
+            known = {shard: signature for (shard, (signature, _))
+                     in self.arequal_cache.get(tree, {}).items()}
+            known_opt = " --known-from -" if known else ""
+            cmd = ("python3 /usr/share/redant/script/arequal_shards.py"
+                   f"{opts}{known_opt} {root}")
+            async_obj = self.execute_command_async(cmd, node)
+            if known and async_obj:
+                self.send_async_input(async_obj, json.dumps(known))
+            async_objs.append(async_obj)
+
+        result = {}
+        for (index, ret) in self.iter_async_results(async_objs):
+            tree = trees[index]
+            records = list(iter_ndjson(ret['msg']))
+            failed = [record for record in records if record.get('rc')]
+            if ret['error_code'] != 0 or failed or not records:
+                self.logger.error(f"Failed to get arequal on {tree}: "
+                                  f"{ret['error_msg']}"
+                                  f"{''.join(r['error'] for r in failed)}")
+                self.invalidate_arequal_cache(tree)
+                result[tree] = None
+                continue
+
+            cached = self.arequal_cache.get(tree, {})
+            shards = {}
+            for record in records:
+                if record.get('cached'):
+                    shards[record['shard']] = cached[record['shard']]
+                else:
+                    shards[record['shard']] = (record['signature'],
+                                               record['output'])
+            # The shards which are gone are dropped from the cache.
+            self.arequal_cache[tree] = shards
+
+            digest = hashlib.md5()
+            for shard in sorted(shards):
+                digest.update(f"{shard}\n".encode())
+                digest.update("\n".join(shards[shard][1]).encode())
+            self.logger.info(f"Checksummed {len(records)} shards of {tree}, "
+                             f"{sum(1 for r in records if r.get('cached'))}"
+                             " of them cached")
+            result[tree] = {'shards': {shard: output for (shard, (_, output))
+                                       in shards.items()},
+                            'checksum': digest.hexdigest()}
+        return result
 
     def log_mounts_info(self, mounts: list):
         """
@@ -615,11 +925,21 @@ class IoOps(AbstractOps):
         for mount in mounts:
             self.logger.info(
                 f"Stat of mount {mount['client']}:{mount['mountpath']}")
-            cmd = (f"python3 /usr/share/redant/script/file_dir_ops.py stat -R"
-                   f" {mount['mountpath']}")
-            ret = self.execute_abstract_op_node(cmd, mount['client'], False)
-            if ret['error_code'] != 0:
+            cmd = ("python3 /usr/share/redant/script/file_dir_ops.py stat -R"
+                   f" --json {mount['mountpath']}")
+            errors = []
+
+            def _check_record(record):
+                if 'error' in record:
+                    errors.append(record['error'])
+
+            ret = self.execute_abstract_op_stream(
+                cmd, mount['client'], ndjson_line_handler(_check_record),
+                max_lines=10, excep=False)
+            if ret['error_code'] != 0 or errors:
                 _rc = False
+                for error in errors[:10]:
+                    self.logger.error(error)
 
             if not _rc:
                 self.logger.error("Stat of some or all files/directories "
@@ -766,7 +1086,8 @@ class IoOps(AbstractOps):
         return _rc
 
     def validate_io_procs(self, all_mounts_async_objs: list,
-                          mounts: list, timeout: int = None) -> bool:
+                          mounts: list, timeout: int = None,
+                          fail_fast: bool = False) -> bool:
         """
         Validate whether IO was successful or not.
         Args:
@@ -775,8 +1096,11 @@ class IoOps(AbstractOps):
                                           self.execute_command_async method.
             mounts (list): List of all mountpoints on which process were
                            started.
-            timeout (int) : Time until which the async command status shall
+            timeout (int) : Time until which the IO on all the mounts shall
                             be checked
+            fail_fast (bool) : If True, the IO on the other mounts is
+                               cancelled once the IO fails on a mount.
+                               Default is False.
         Returns:
             bool: True if IO is successful on all mounts. False otherwise.
         """
@@ -788,10 +1112,10 @@ class IoOps(AbstractOps):
 
         _rc = True
         self.logger.info("Start validating IO procs")
-        for i, async_obj in enumerate(all_mounts_async_objs):
+        for (i, ret) in self.iter_async_results(all_mounts_async_objs,
+                                                timeout, fail_fast):
             self.logger.info(f"Validating IO on {mounts[i]['client']}:"
                              f"{mounts[i]['mountpath']}")
-            ret = self.wait_till_async_command_ends(async_obj, timeout)
             if ret['error_code'] != 0:
                 self.logger.error(f"IO Failed on {mounts[i]['client']}:"
                                   f"{mounts[i]['mountpath']}")
@@ -809,7 +1133,7 @@ class IoOps(AbstractOps):
                                           as returned by g.run_async method.
             mounts (list): List of all mountpoints on which process were
                            started.
-            timeout (int) : Time until which the async command status shall
+            timeout (int) : Time until which the IO on all the mounts shall
                             be checked
         Returns:
             bool: True if IO is complete on all mounts. False otherwise.
@@ -821,11 +1145,10 @@ class IoOps(AbstractOps):
             mounts = [mounts]
 
         _rc = True
-        for i, async_obj in enumerate(all_mounts_async_objs):
-            self.logger.info(f"Waiting for IO to be complete on "
-                             f"{mounts[i]['client']}:"
+        for (i, ret) in self.iter_async_results(all_mounts_async_objs,
+                                                timeout):
+            self.logger.info(f"IO ended on {mounts[i]['client']}:"
                              f"{mounts[i]['mountpath']}")
-            ret = self.wait_till_async_command_ends(async_obj, timeout)
             if ret['error_code'] != 0:
                 self.logger.error(f"IO Not complete on {mounts[i]['client']}:"
                                   f"{mounts[i]['mountpath']}")
@@ -1121,11 +1444,60 @@ class IoOps(AbstractOps):
             getfattr result on success. Exception thrown on failure.
         """
         cmd = f"getfattr --absolute-names -e '{encode}' -n '{fattr}' {fpath}"
-        ret = self.execute_abstract_op_node(cmd, node, excep)
+        ret = None
+        if encode == "hex":
+            ret = self._get_fattr_from_scan(fpath, fattr, node, cmd)
+        if ret is None and encode == "hex":
+            ret = self._get_fattr_from_agent(fpath, fattr, node, cmd)
+        if ret is None:
+            ret = self.execute_abstract_op_node(cmd, node, excep)
         if not excep:
             return ret
-        else:
-            return ret['msg']
+        if ret['error_code'] != 0:
+            self.logger.error(ret['error_msg'])
+            raise Exception(ret['error_msg'])
+        return ret['msg']
+
+    def _get_fattr_from_scan(self, fpath: str, fattr: str, node: str,
+                             cmd: str) -> dict:
+        """
+        Gets a hex encoded fattr from the scan covering the path, in the
+        form of the getfattr output.
+        Returns:
+            dict: The result as it would be for the getfattr command, or
+                  None if no scan holds the fattr.
+        """
+        (scan, record) = self._lookup_tree_scan(node, fpath)
+        if (scan is None or record is None
+           or fattr not in record.get('xattrs', {})):
+            return None
+        return {'Flag': True, 'error_code': 0, 'error_msg': "",
+                'node': node, 'cmd': cmd,
+                'msg': [f"# file: {fpath}\n",
+                        f"{fattr}={record['xattrs'][fattr]}\n", "\n"]}
+
+    def _get_fattr_from_agent(self, fpath: str, fattr: str, node: str,
+                              cmd: str) -> dict:
+        """
+        Gets a hex encoded fattr through the agent of the node, in the form
+        of the getfattr output.
+        Returns:
+            dict: The result as it would be for the getfattr command, or
+                  None if the agent couldn't be reached.
+        """
+        ret = self.call_agent('getxattr', node, path=fpath, name=fattr)
+        if not ret['Flag']:
+            return None
+        ret['cmd'] = cmd
+        if ret['error_code'] != 0:
+            # getfattr exits with 1 on any failure.
+            ret['error_code'] = 1
+            ret['error_msg'] = f"{fpath}: {fattr}: {ret['error_msg']}\n"
+            ret['msg'] = []
+            return ret
+        ret['msg'] = [f"# file: {fpath}\n",
+                      f"{fattr}={ret['msg'][fattr]}\n", "\n"]
+        return ret
 
     def get_fattr_list(self, fqpath: str, node: str,
                        encode_hex=False) -> dict:
@@ -1141,6 +1513,14 @@ class IoOps(AbstractOps):
             xattr_list (dict): dict of xattr values.
         """
 
+        if encode_hex:
+            ret = self.call_agent('getxattr', node, path=fqpath)
+            if ret['Flag']:
+                if ret['error_code'] != 0:
+                    self.logger.error(ret['error_msg'])
+                    raise Exception(ret['error_msg'])
+                return ret['msg']
+
         cmd = f"getfattr --absolute-names -d -m - {fqpath}"
         if encode_hex:
             cmd = f"getfattr --absolute-names -d -m - -e hex {fqpath}"
@@ -1171,6 +1551,10 @@ class IoOps(AbstractOps):
         """
         cmd = (f"setfattr -n {fattr} -v {value} {fpath}")
         ret = self.execute_abstract_op_node(cmd, node, False)
+        if fattr == "trusted.glusterfs.dht":
+            # The volume of the path isn't known, hence the cached
+            # layouts of all the volumes are dropped.
+            self.invalidate_layout_cache()
         return ret
 
     def delete_fattr(self, fpath: str, fattr: str, node: str) -> list:
@@ -1186,6 +1570,8 @@ class IoOps(AbstractOps):
         """
         cmd = (f"setfattr -x {fattr} {fpath}")
         ret = self.execute_abstract_op_node(cmd, node)
+        if fattr == "trusted.glusterfs.dht":
+            self.invalidate_layout_cache()
         return ret['msg']
 
     def check_if_pattern_in_file(self, node: str, pattern: str,
@@ -1441,9 +1827,15 @@ class IoOps(AbstractOps):
             A dictionary of pathinfo data for a remote file. None on fail.
         """
         pathinfo = {}
-        pathinfo['raw'] = self.get_fattr(fqpath,
-                                         'trusted.glusterfs.pathinfo',
-                                         node, encode="text")
+        (scan, record) = self._lookup_tree_scan(node, fqpath)
+        if record is not None and 'pathinfo' in record:
+            pathinfo['raw'] = [f"# file: {fqpath}\n",
+                               "trusted.glusterfs.pathinfo="
+                               f"\"{record['pathinfo']}\"\n", "\n"]
+        else:
+            pathinfo['raw'] = self.get_fattr(fqpath,
+                                             'trusted.glusterfs.pathinfo',
+                                             node, encode="text")
 
         pathinfo['brickdir_paths'] = re.findall(r".*?POSIX.*?:(\S+)\>",
                                                 ''.join(pathinfo['raw']))
@@ -1562,6 +1954,17 @@ class IoOps(AbstractOps):
         Returns:
             bool: True if the file is linkto_file or False.
         """
+        (scan, record) = self._lookup_tree_scan(host, fqpath)
+        if (scan is not None
+           and self._is_xattr_scanned(scan, 'trusted.glusterfs.dht.linkto')):
+            if record is None:
+                return False
+            # A regular file with the sticky bit, as 'file' would tell.
+            mode = record['stat']['mode']
+            return (mode[0] == '-' and mode[-1] in 'tT'
+                    and record['stat']['st_size'] == 0
+                    and 'trusted.glusterfs.dht.linkto' in record['xattrs'])
+
         cmd = f"file {fqpath}"
         ret = self.execute_abstract_op_node(cmd, host, False)
         if ret['error_code'] == 0:
@@ -1596,6 +1999,192 @@ class IoOps(AbstractOps):
 
         return linkto_xattr
 
+    @staticmethod
+    def _form_tree_scan_cmd(root: str, xattrs: tuple, pathinfo,
+                            exclude: tuple) -> str:
+        """
+        Forms the command running the tree scan script.
+        """
+        cmd = f"python3 /usr/share/redant/script/tree_scan.py {root}"
+        if xattrs:
+            cmd += "".join(f" -x '{name}'" for name in xattrs)
+        else:
+            cmd += " --no-xattrs"
+        if pathinfo:
+            cmd += " -p dirs" if pathinfo == 'dirs' else " -p all"
+        cmd += "".join(f" -e '{name}'" for name in exclude)
+        return cmd
+
+    def scan_tree(self, node: str, root: str, xattrs: tuple = None,
+                  pathinfo=False, exclude: tuple = ('.glusterfs',),
+                  record_handler=None) -> dict:
+        """
+        Collects the stat, the xattrs and the pathinfo of a root and of
+        every entry under it, in a single pass on the node. The records
+        are streamed back, hence a large tree can be consumed through the
+        record handler without being held in the memory.
+
+        Args:
+            node (str): The node hosting the tree.
+            root (str): Root of the tree, on a mount or a brick.
+            xattrs (tuple): Xattrs to collect, a '*' matching any
+                            characters. Defaults to SCAN_XATTRS.
+            pathinfo (bool|str): True to collect the pathinfo of all the
+                                 entries, 'dirs' for the directories only.
+                                 Valid only on a glusterfs mount.
+            exclude (tuple): Names of the directories not to descend into.
+            record_handler (func): Called with each record, of the form
+                                   {'path': .., 'stat': {..}, 'xattrs':
+                                   {name: hex value}, 'pathinfo': ..}, or
+                                   {'path': .., 'error': ..}.
+
+        Returns:
+            dict: The records keyed by the path, empty if they were passed
+                  to the record handler. None on failure.
+        """
+        if xattrs is None:
+            xattrs = self.SCAN_XATTRS
+        records = {}
+        if record_handler is None:
+            def record_handler(record):
+                records[record['path']] = record
+
+        cmd = self._form_tree_scan_cmd(root, xattrs, pathinfo, exclude)
+        ret = self.execute_abstract_op_stream(
+            cmd, node, ndjson_line_handler(record_handler), max_lines=10,
+            excep=False)
+        if ret['error_code'] != 0:
+            self.logger.error(f"Failed to scan {root} on {node}: "
+                              f"{ret['error_msg']}")
+            return None
+        return records
+
+    @contextmanager
+    def scanned_trees(self, trees: list, xattrs: tuple = None,
+                      pathinfo=False, exclude: tuple = ('.glusterfs',)):
+        """
+        Scans a set of trees parallely and lets the per path helpers,
+        i.e. path_exists, get_file_stat, get_fattr (hex), get_pathinfo and
+        is_linkto_file, answer from the scans for the paths under them
+        within the block. A path missing from the scan of its tree is
+        taken as not existing. The scans are a snapshot, hence the block
+        shouldn't span changes to the trees. A tree which fails to scan
+        is left to the live commands.
+
+        Args:
+            trees (list): Roots of the trees in the form 'node:path', like
+                          the bricks or the brickdir paths.
+            xattrs, pathinfo, exclude: As for scan_tree.
+
+        Yields:
+            dict: The records of each tree keyed by the path, the trees
+                  being keyed as they were given.
+
+        Example:
+            with self.scanned_trees(layout['brickdir_paths']):
+                for fqpath in fqpaths:
+                    self.exists_on_hashed_bricks(node, fqpath, layout)
+        """
+        if xattrs is None:
+            xattrs = self.SCAN_XATTRS
+        saved_addrs = self._scan_addrs
+        self._scan_addrs = dict(saved_addrs)
+        scans = []
+        async_objs = []
+        for tree in trees:
+            (node, root) = tree.split(':', 1)
+            scans.append({'tree': tree, 'node': self._scan_node(node),
+                          'root': os.path.normpath(root),
+                          'xattrs': tuple(xattrs), 'exclude': tuple(exclude),
+                          'records': {}})
+            cmd = self._form_tree_scan_cmd(scans[-1]['root'], xattrs,
+                                           pathinfo, exclude)
+            async_objs.append(self.execute_command_async(cmd, node))
+
+        index_of = {id(async_obj): index
+                    for (index, async_obj) in enumerate(async_objs)}
+        partial = {}
+
+        def _on_output(async_obj, data, stream):
+            if stream != 'stdout':
+                return
+            index = index_of[id(async_obj)]
+            lines = (partial.get(index, "")
+                     + data.decode('utf-8', 'replace')).split("\n")
+            partial[index] = lines.pop()
+            for record in iter_ndjson(lines):
+                scans[index]['records'][record['path']] = record
+
+        active = []
+        for (index, ret) in self.iter_async_results(async_objs,
+                                                    on_output=_on_output):
+            if ret['error_code'] != 0:
+                self.logger.error(f"Failed to scan {scans[index]['tree']}: "
+                                  f"{ret['error_msg']}")
+                continue
+            for record in iter_ndjson([partial.get(index, "")]):
+                scans[index]['records'][record['path']] = record
+            active.append(scans[index])
+
+        saved = self._tree_scans
+        self._tree_scans = saved + tuple(active)
+        try:
+            yield {scan['tree']: scan['records'] for scan in scans}
+        finally:
+            self._tree_scans = saved
+            self._scan_addrs = saved_addrs
+
+    def _scan_node(self, node: str) -> str:
+        """
+        The address of a node, by which the scans are matched, as a node
+        can be named by its hostname or by its address. The address is
+        resolved once per scan block, as the per path helpers look it up
+        for every path.
+        """
+        addr = self._scan_addrs.get(node)
+        if addr is None:
+            try:
+                addr = socket.gethostbyname(node)
+            except socket.error:
+                addr = node
+            self._scan_addrs[node] = addr
+        return addr
+
+    def _lookup_tree_scan(self, node: str, path: str) -> tuple:
+        """
+        Looks up a path in the active scans.
+
+        Returns:
+            tuple: (scan, record) where the scan is None if no active scan
+                   covers the path, and the record is None if the path
+                   wasn't found under the scanned tree. A path which the
+                   scan couldn't stat isn't taken as covered.
+        """
+        if not self._tree_scans:
+            return (None, None)
+        node = self._scan_node(node)
+        path = os.path.normpath(path)
+        for scan in reversed(self._tree_scans):
+            if scan['node'] != node:
+                continue
+            prefix = scan['root'].rstrip('/') + '/'
+            if path != scan['root'] and not path.startswith(prefix):
+                continue
+            if set(path[len(prefix):].split('/')) & set(scan['exclude']):
+                continue
+            record = scan['records'].get(path)
+            if record is not None and 'error' in record:
+                continue
+            return (scan, record)
+        return (None, None)
+
+    @staticmethod
+    def _is_xattr_scanned(scan: dict, name: str) -> bool:
+        """
+        Tells whether an xattr is collected by a scan.
+        """
+        return any(fnmatchcase(name, pattern) for pattern in scan['xattrs'])
+
     def kill_process(self, node: str, process_ids: str = '',
                      process_names: str = '') -> bool:
         """
@@ -1691,6 +2280,13 @@ class IoOps(AbstractOps):
         Returns:
             The md5sum of the file on success. None on fail.
         """
+        ret = self.call_agent('checksum', host, path=fqpath)
+        if ret['Flag']:
+            if ret['error_code'] != 0:
+                self.logger.error("Failed to get md5sum")
+                return None
+            return f"{ret['msg']}  {fqpath}\n"
+
         cmd = f"md5sum {fqpath}"
         ret = self.execute_abstract_op_node(cmd, host, False)
         if ret['error_code'] != 0:
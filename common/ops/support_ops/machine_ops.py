@@ -3,10 +3,10 @@ Machine ops is the swiss army knife of operational functions required
 to perform server related configuration changes, be it network stack,
 systemd changes or maybe a node reboot itself.
 """
-import time
 import os
 import socket
 from common.ops.abstract_ops import AbstractOps
+from common.waiter import wait_until
 
 
 class MachineOps(AbstractOps):
@@ -77,25 +77,15 @@ class MachineOps(AbstractOps):
         Returns:
             bool value: True if node is online or False.
         """
-        node_status = {}
-        iter_v = 0
-        while iter_v < timeout:
-            status = self.check_node_power_status(node)
-            if isinstance(node, list):
-                for n in node:
-                    if status[n]:
-                        self.logger.debug(f"{n} online.")
-                        node_status[n] = True
-                    else:
-                        node_status[n] = False
-                if all(node_status.values()):
-                    return True
-            else:
-                if status[node]:
-                    self.logger.debug(f"{node} online.")
-                    return True
-            time.sleep(1)
-            iter_v += 1
+        nodes = node if isinstance(node, list) else [node]
+
+        def _all_online():
+            status = self.check_node_power_status(nodes)
+            return all(status[n] for n in nodes)
+
+        if wait_until(_all_online, timeout):
+            self.logger.debug(f"{node} online.")
+            return True
 
         self.logger.error(f"{node} still offline.")
         return False
@@ -108,43 +98,90 @@ class MachineOps(AbstractOps):
         Returns:
             bool value: True if node is offline or False.
         """
-        node_status = {}
-        iter_v = 0
-        while iter_v < timeout:
-            status = self.check_node_power_status(node)
-            if isinstance(node, list):
-                for n in node:
-                    if not status[n]:
-                        self.logger.debug(f"{n} offline.")
-                        node_status[n] = True
-                    else:
-                        node_status[n] = False
-                if all(node_status.values()):
-                    return True
-            else:
-                if not status[node]:
-                    self.logger.debug(f"{node} offline.")
-                    return True
-            time.sleep(1)
-            iter_v += 1
+        nodes = node if isinstance(node, list) else [node]
+
+        def _all_offline():
+            status = self.check_node_power_status(nodes)
+            return not any(status[n] for n in nodes)
+
+        if wait_until(_all_offline, timeout):
+            self.logger.debug(f"{node} offline.")
+            return True
 
         self.logger.error(f"{node} still online.")
         return False
 
+    @staticmethod
+    def _form_brick_wipe_cmd(brick_list: list) -> str:
+        """
+        Forms the command which clears out the bricks of a node parallely.
+        A brick which can't be cleared is remounted and cleared again. The
+        exit code of the wipe of each brick is printed as a
+        '<brick> <exit code>' line.
+        """
+        bricks = " ".join(brick_list)
+        return ("wipe() { rm -rf \"$1\"/* || { umount \"$1\"; "
+                "mount \"$1\"; rm -rf \"$1\"/*; }; }\n"
+                f"for brick in {bricks}; do\n"
+                "    ( wipe \"$brick\"; echo \"$brick $?\" ) &\n"
+                "done\n"
+                "wait")
+
+    def _form_cleanup_cmds(self, node: str, server_list: list,
+                           client_list: list, brick_root: dict) -> list:
+        """
+        Forms the cleanup sequence of a node, as per its roles.
+        Returns:
+            list: The commands to be run in order on the node.
+        """
+        cmd_list = []
+        if node in server_list:
+            # TODO. Add other gluster related processes later.
+            cmd_list += ["pkill glusterfs; pkill glusterfsd; true",
+                         ("rm -rf /var/lib/glusterd/vols/* "
+                          "/var/lib/glusterd/peers/* "
+                          "/var/lib/glusterd/snaps/* "
+                          "/var/lib/glusterd/glusterfind/.keys/* "
+                          "/var/run/gluster*")]
+        if brick_root.get(node):
+            cmd_list.append(self._form_brick_wipe_cmd(brick_root[node]))
+        if node in client_list:
+            cmd_list += ["pkill glusterfs; true",
+                         "umount /mnt/*; rm -rf /mnt/*"]
+        if node in server_list:
+            # Unmount the snap bricks and remove the snap LVs, i.e. the
+            # ones named <32 chars>_<alnum>.
+            cmd_list += [("for mnt in `mount | grep 'run/gluster/snaps' |"
+                          "awk '{print $3}'`;do umount $mnt; done"),
+                         ("lvs --noheadings -o lv_path | awk '{print $1}' | "
+                          "grep -E '/[^_/]{32}_[[:alnum:]]+$' | "
+                          "xargs -r -n1 lvremove --force")]
+        return cmd_list
+
     def hard_terminate(self, server_list: list, client_list: list,
-                       brick_root: dict):
+                       brick_root: dict) -> dict:
         """
         hard terminate is inconsiderate. It will clear out the env
         completely and is to be used with caution. Don't use it inside the
         non disruptive tests or else, you might have a string of failures.
+        The cleanup sequence of each node is run as a single batch, the
+        nodes being cleaned up parallely.
         Args:
             server_list (list): List of gluster server machines
             client_list (list): List of gluster client machines
             brick_root (dict): Dictionary of brick roots and nodes.
+        Returns:
+            dict: The cleanup report of each node, for example,
+                  {
+                    "node1" : {
+                        "bricks" : {"/bricks/brick0" : 0, ...},
+                        "errors" : {"<failed cmd>" : "<stderr>", ...}
+                    },
+                    ...
+                  }
         """
         # Wait for nodes to power up.
-        for server in server_list:
-            self.wait_node_power_up(server)
+        self.wait_node_power_up(server_list)
 
         # Stop glusterd on the servers.
         self.stop_glusterd(server_list)
@@ -154,53 +191,40 @@ class MachineOps(AbstractOps):
             raise Exception("Sheer panic! As hard terminate fails to stop"
                             "glusterd!")
 
-        # Kill glusterfs and glusterfsd processes in the server machines.
-        # TODO. Add other gluster related processes later.
-        cmd = "pkill glusterfs; pkill glusterfsd"
-        for node in server_list:
-            self.execute_abstract_op_node(cmd, node, False)
-
-        # Also need to kill the fuse process in the clients
-        cmd = "pkill glusterfs"
-        for node in client_list:
-            self.execute_abstract_op_node(cmd, node, False)
-
-        # Clear out the content in vol, peer, snaps and glusterfind keys
-        # directory on the servers.
-        cmd = ("rm -rf /var/lib/glusterd/vols/*; rm -rf /var/lib/glusterd"
-               "/peers/*; rm -rf /var/lib/glusterd/snaps/*; "
-               "rm -rf /var/lib/glusterd/glusterfind/.keys/*; "
-               "rm -rf /var/run/gluster*; ")
-        for node in server_list:
-            self.execute_abstract_op_node(cmd, node, False)
-
-        # Clear out the brick dirs under the brick roots.
-        for (server, brick_list) in brick_root.items():
-            for brick in brick_list:
-                cmd = (f"rm -rf {brick}/*")
-                ret = self.execute_abstract_op_node(cmd, server, False)
-                if ret['error_code'] != 0:
-                    cmd = f"umount {brick}"
-                    self.execute_abstract_op_node(cmd, server, False)
-                    cmd = f"mount {brick}"
-                    self.execute_abstract_op_node(cmd, server, False)
-                    cmd = (f"rm -rf {brick}/*")
-                    self.execute_abstract_op_node(cmd, server, False)
-
-        # Clear out the mountpoints in clients.
-        cmd = "umount /mnt/*; rm -rf /mnt/*"
-        for node in client_list:
-            self.execute_abstract_op_node(cmd, node, False)
-
-        # Unmount snap bricks.
-        self.umount_snap_brick_from_servers(server_list)
-
-        # Check for stray LVs and delete them.
-        lv_dict = self.get_lv_paths_from_servers(server_list)
-
-        self.remove_snap_lv(lv_dict)
+        # Kill the gluster processes, clear out the glusterd state, the
+        # bricks and the mountpoints, and remove the snap LVs.
+        nodes = list(dict.fromkeys(server_list + client_list
+                                   + list(brick_root)))
+        cmd_dict = {node: self._form_cleanup_cmds(node, server_list,
+                                                  client_list, brick_root)
+                    for node in nodes}
+        ret = self.execute_abstract_op_batch_multinode(cmd_dict,
+                                                       excep=False)
+
+        report = {}
+        for node in nodes:
+            node_report = {'bricks': {}, 'errors': {}}
+            for cmd_ret in ret.get(node, []):
+                if cmd_ret['cmd'].startswith("wipe()"):
+                    for line in cmd_ret['msg']:
+                        (brick, ret_code) = line.rsplit(None, 1)
+                        node_report['bricks'][brick] = int(ret_code)
+                elif cmd_ret['error_code'] != 0:
+                    node_report['errors'][cmd_ret['cmd']] = \
+                        cmd_ret.get('error_msg')
+            if node not in ret:
+                node_report['errors']['*'] = "Cleanup batch didn't run"
+            failed = [brick for brick, ret_code
+                      in node_report['bricks'].items() if ret_code != 0]
+            if failed or node_report['errors']:
+                self.logger.warning(f"Cleanup of {node} is incomplete. "
+                                    f"Bricks not cleared: {failed}, "
+                                    "failed commands: "
+                                    f"{list(node_report['errors'])}")
+            report[node] = node_report
 
         self.es.reset_ds()
+        return report
 
     def check_os(self, os_name: str, nodes: str,
                  os_version: str = None) -> bool:
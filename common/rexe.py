@@ -1,78 +1,428 @@
 import os
+import json
 import time
+import struct
 import random
+import reprlib
+import shlex
+import selectors
+import threading
+import collections
 import concurrent.futures
-import json
 import socket
 import paramiko
-import xmltodict
 from multipledispatch import dispatch
+from .gluster_xml import CliXmlDecoder, decode_cli_xml
+
+
+class ConnectionPool:
+    """
+    Process wide pool of authenticated SSH clients. One client is kept
+    alive per node and is shared by every Rexe object in the process, the
+    channels for the commands being opened on it on demand. The pool is
+    fork aware, a child process ( like the non disruptive worker processes
+    of the TestRunner ) drops the clients inherited from the parent and
+    dials its own.
+    """
+
+    _lock = threading.Lock()
+    _node_locks = {}
+    _clients = {}
+    _owner_pid = os.getpid()
+    keepalive_interval = 30
+
+    @classmethod
+    def _check_owner(cls):
+        """
+        Drop the state inherited over a fork. The inherited transports share
+        their sockets with the parent process, hence they are only forgotten
+        and not closed as closing them would tear down the parent's session.
+        """
+        if cls._owner_pid != os.getpid():
+            cls._lock = threading.Lock()
+            cls._node_locks = {}
+            cls._clients = {}
+            cls._owner_pid = os.getpid()
+
+    @classmethod
+    def _get_node_lock(cls, node: str):
+        """
+        Returns the lock serializing the dials to a given node.
+        """
+        cls._check_owner()
+        with cls._lock:
+            if node not in cls._node_locks:
+                cls._node_locks[node] = threading.Lock()
+            return cls._node_locks[node]
+
+    @staticmethod
+    def is_healthy(client) -> bool:
+        """
+        Checks if the transport of a pooled client is still usable.
+        Args:
+            client (SSHClient)
+        Returns:
+            bool: True if the transport is alive, else False.
+        """
+        if client is None:
+            return False
+        transport = client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except Exception:
+            return False
+        return True
+
+    @classmethod
+    def dial(cls, node: str, timeout: int = None):
+        """
+        Opens a new SSH client to the node and replaces the pooled one, if
+        any.
+        Args:
+            node (str)
+            timeout (int): Connection timeout in seconds.
+        Returns:
+            SSHClient
+        """
+        with cls._get_node_lock(node):
+            return cls._dial(node, timeout)
+
+    @classmethod
+    def _dial(cls, node: str, timeout: int = None):
+        """
+        Dials the node. Needs to be called with the node lock held.
+        """
+        if timeout is None:
+            timeout_opt = {}
+        else:
+            timeout_opt = {'timeout': timeout}
+
+        node_ssh_client = paramiko.SSHClient()
+        node_ssh_client.load_host_keys(
+            os.path.expanduser('~/.ssh/known_hosts'))
+        node_ssh_client.connect(hostname=node, username='root',
+                                **timeout_opt)
+        node_ssh_client.get_transport().set_keepalive(
+            cls.keepalive_interval)
+
+        old_client = cls._clients.get(node)
+        cls._clients[node] = node_ssh_client
+        if old_client is not None:
+            old_client.close()
+        return node_ssh_client
+
+    @classmethod
+    def get_client(cls, node: str, timeout: int = None):
+        """
+        Returns a healthy pooled client for the node. A client whose
+        transport has died, say due to a node reboot, is transparently
+        re-dialed.
+        Args:
+            node (str)
+            timeout (int): Connection timeout used in case of a re-dial.
+        Returns:
+            SSHClient
+        """
+        with cls._get_node_lock(node):
+            client = cls._clients.get(node)
+            if cls.is_healthy(client):
+                return client
+            return cls._dial(node, timeout)
+
+    @classmethod
+    def invalidate(cls, node: str):
+        """
+        Closes and removes the pooled client of a node, so that the next
+        request dials afresh.
+        Arg:
+            node (str)
+        """
+        with cls._get_node_lock(node):
+            client = cls._clients.pop(node, None)
+            if client is not None:
+                client.close()
+
+    @classmethod
+    def close_all(cls):
+        """
+        Closes all the pooled clients of this process.
+        """
+        cls._check_owner()
+        with cls._lock:
+            nodes = list(cls._clients.keys())
+        for node in nodes:
+            cls.invalidate(node)
+
+
+class RemoteAgent:
+    """
+    Client end of the helper agent ( tools/scripts/redant_agent.py ) running
+    on a node. The requests are served one at a time over the channel of
+    the agent.
+    """
+
+    _header = struct.Struct(">I")
+
+    def __init__(self, client, cmd: str):
+        """
+        Starts the agent over a new channel of the client.
+        Args:
+            client (SSHClient)
+            cmd (str): Command which runs the agent.
+        """
+        self.lock = threading.Lock()
+        self.request_id = 0
+        self.channel = client.get_transport().open_session()
+        self.channel.exec_command(cmd)
+        self.stdin = self.channel.makefile_stdin('wb')
+        self.stdout = self.channel.makefile('rb')
+
+    def _read_exact(self, size: int) -> bytes:
+        """
+        Reads the given number of bytes of the response.
+        """
+        data = b""
+        while len(data) < size:
+            chunk = self.stdout.read(size - len(data))
+            if not chunk:
+                raise EOFError("Agent exited with "
+                               f"{self.channel.recv_exit_status()}")
+            data += chunk
+        return data
+
+    def request(self, op: str, args: dict, timeout: float = None):
+        """
+        Sends a request to the agent and waits for its response.
+        Args:
+            op (str): The operation to be run by the agent.
+            args (dict): The arguments of the operation.
+            timeout (float): Time in seconds to wait for the response.
+        Returns:
+            dict: The response of the agent.
+        Raises:
+            An exception if the agent can't be reached. The agent is
+            unusable thereafter.
+        """
+        with self.lock:
+            self.request_id += 1
+            data = json.dumps({'id': self.request_id, 'op': op,
+                               'args': args}).encode()
+            self.channel.settimeout(timeout)
+            self.stdin.write(self._header.pack(len(data)) + data)
+            self.stdin.flush()
+            size = self._header.unpack(self._read_exact(self._header.size))
+            response = json.loads(self._read_exact(size[0]).decode())
+            if response.get('id') != self.request_id:
+                raise Exception("Agent response out of sequence")
+            return response
+
+    def close(self):
+        """
+        Closes the channel, which ends the agent.
+        """
+        self.channel.close()
+
+
+class AgentPool:
+    """
+    Process wide pool of the helper agents, one per node, started on the
+    pooled SSH clients. Like the connection pool, it is fork aware. A node
+    on which the agent can't be started isn't retried for a while, the
+    callers falling back to the helper scripts meanwhile.
+    """
+
+    agent_cmd = "python3 /usr/share/redant/script/redant_agent.py"
+    retry_interval = 60
+
+    _lock = threading.Lock()
+    _node_locks = {}
+    _agents = {}
+    _failed = {}
+    _owner_pid = os.getpid()
+
+    @classmethod
+    def _check_owner(cls):
+        """
+        Drop the agents inherited over a fork, without closing them.
+        """
+        if cls._owner_pid != os.getpid():
+            cls._lock = threading.Lock()
+            cls._node_locks = {}
+            cls._agents = {}
+            cls._failed = {}
+            cls._owner_pid = os.getpid()
+
+    @classmethod
+    def _get_node_lock(cls, node: str):
+        """
+        Returns the lock serializing the start of the agent of a node.
+        """
+        cls._check_owner()
+        with cls._lock:
+            if node not in cls._node_locks:
+                cls._node_locks[node] = threading.Lock()
+            return cls._node_locks[node]
+
+    @classmethod
+    def get_agent(cls, node: str, timeout: float = None):
+        """
+        Returns the agent of the node, starting it if needed.
+        Args:
+            node (str)
+            timeout (float): Time in seconds to wait for the agent to come
+                             up.
+        Returns:
+            RemoteAgent, or None if the agent can't be run on the node.
+        """
+        with cls._get_node_lock(node):
+            agent = cls._agents.get(node)
+            if agent is not None:
+                return agent
+            if time.time() - cls._failed.get(node, 0) < cls.retry_interval:
+                return None
+            try:
+                agent = RemoteAgent(ConnectionPool.get_client(node),
+                                    cls.agent_cmd)
+                agent.request('ping', {}, timeout)
+            except Exception:
+                cls._failed[node] = time.time()
+                return None
+            cls._agents[node] = agent
+            return agent
+
+    @classmethod
+    def discard(cls, node: str, agent):
+        """
+        Closes the agent of a node and removes it from the pool.
+        Args:
+            node (str)
+            agent (RemoteAgent): The agent which is known to be unusable.
+        """
+        cls._check_owner()
+        with cls._get_node_lock(node):
+            if cls._agents.get(node) is agent:
+                del cls._agents[node]
+        agent.close()
+
+    @classmethod
+    def close_all(cls):
+        """
+        Closes all the agents of this process.
+        """
+        cls._check_owner()
+        with cls._lock:
+            agents = list(cls._agents.values())
+            cls._agents = {}
+            cls._failed = {}
+        for agent in agents:
+            agent.close()
 
 
 class Rexe:
+    # Policy for logging the command results. The outputs are cut down to
+    # the said number of lines and characters per line in the logs.
+    log_max_lines = 20
+    log_max_line_len = 512
+    # Bytes of stderr kept by the streaming commands.
+    stream_max_stderr = 65536
+    # Whether the helpers may use the agent on the nodes, in place of
+    # running the helper scripts.
+    use_agent = True
+
     def __init__(self, server_dict, client_dict):
         self.host_generic = ['alls', 'allp']
         self.host_dict = {**client_dict, **server_dict}
         self.server_dict = server_dict
         self.client_dict = client_dict
+        self.connect_flag = False
+        self.connect_timeout = None
+
+    @classmethod
+    def _trunc_repr(cls, ret) -> str:
+        """
+        Gives the representation of a result for the logs, the long outputs
+        being truncated as per the logging policy.
+        """
+        trunc = reprlib.Repr()
+        trunc.maxlevel = 6
+        trunc.maxlist = cls.log_max_lines
+        trunc.maxdict = cls.log_max_lines
+        trunc.maxstring = cls.log_max_line_len
+        trunc.maxother = cls.log_max_line_len
+        return trunc.repr(ret)
 
     def _random_node(self):
         """
         Module to select a random node from the
-        existing node_dict
+        existing host_dict
         """
-        return random.choice(list(self.node_dict.keys()))
+        return random.choice(list(self.host_dict.keys()))
 
-    def connect_node(self, node, timeout=None):
+    def _get_client(self, node: str):
         """
-        Function to establish connection with the given node.
+        Function to obtain the pooled SSH client of a node.
         """
-        if timeout is None:
-            timeout_opt = {}
-        else:
-            timeout_opt = {'timeout': timeout}
+        try:
+            return ConnectionPool.get_client(node, self.connect_timeout)
+        except Exception as e:
+            self.logger.error(f"Connection failure. Exception: {e}")
+            raise e
 
-        node_ssh_client = paramiko.SSHClient()
-        node_ssh_client.load_host_keys(
-            os.path.expanduser('~/.ssh/known_hosts'))
+    def connect_node(self, node, timeout=None):
+        """
+        Function to (re)establish connection with the given node. The
+        pooled connection of the node, if any, is replaced.
+        """
         try:
-            node_ssh_client.connect(
-                hostname=node,
-                username='root',
-                **timeout_opt
-            )
+            ConnectionPool.dial(node, timeout)
         except Exception as e:
             self.logger.error(f"Connection failure. Exception: {e}")
             self.connect_flag = False
             raise e
-        self.node_dict[node] = node_ssh_client
 
     def establish_connection(self, timeout=15):
         """
         Function to establish connection with the given
-        set of hosts.
+        set of hosts. The connections are obtained from the process
+        wide pool, hence only the nodes which don't have a healthy
+        pooled connection are dialed.
         """
         self.logger.debug("establish connection")
-        self.node_dict = {}
+        self.connect_timeout = timeout
         self.connect_flag = True
 
-        for node in self.host_dict:
-            self.connect_node(node, timeout)
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(len(self.host_dict), 1)) as executor:
+            future_conn = [executor.submit(ConnectionPool.get_client, node,
+                                           timeout)
+                           for node in self.host_dict]
+        for future_handle in future_conn:
+            try:
+                future_handle.result()
+            except Exception as e:
+                self.logger.error(f"Connection failure. Exception: {e}")
+                self.connect_flag = False
+                raise e
 
-    def deconstruct_connection(self):
+    def deconstruct_connection(self, purge: bool = False):
         """
-        Function to close the existing connections.
+        Function to release the connections. The pooled connections
+        are kept alive for the other objects in the process unless
+        purge is set.
+        Args:
+            purge (bool): If True, the pooled connections are closed.
+                          Defaults to False.
         """
         self.logger.debug("Deconstructing connection.")
-        if not self.connect_flag:
-            return
-        for node in self.host_dict:
-            if self.node_dict[node]:
-                (self.node_dict[node]).close()
-        return
+        if purge:
+            AgentPool.close_all()
+            ConnectionPool.close_all()
+        self.connect_flag = False
 
     @dispatch(str)
-    def execute_command(self, cmd):
+    def execute_command(self, cmd, xml_schema=None):
         """
         Module to handle random node execution.
         Returns:
@@ -84,12 +434,17 @@ class Rexe:
                 - cmd : command that got executed
                 - node : node on which the command got executed
         """
-        return self.execute_command(cmd, self._random_node())
+        return self.execute_command(cmd, self._random_node(),
+                                    xml_schema=xml_schema)
 
     @dispatch(str, str)
-    def execute_command(self, cmd, node):
+    def execute_command(self, cmd, node, xml_schema=None):
         """
-        Function to execute command in the given node.
+        Function to execute command in the given node. The output of the
+        commands run with --xml is decoded as it is read from the channel.
+        Kwargs:
+            xml_schema (dict): Schema from common.gluster_xml used for
+                               shaping the decoded xml output.
         Returns:
             ret: A dictionary consisting
                 - Flag : Flag to check if connection failed
@@ -106,12 +461,12 @@ class Rexe:
             ret_dict['Flag'] = False
             return ret_dict
         try:
-            _, stdout, stderr = self.node_dict[node].exec_command(cmd)
+            _, stdout, stderr = self._get_client(node).exec_command(cmd)
         except Exception:
             # Reconnection to be done.
             self.connect_node(node)
             # On rebooting the node
-            _, stdout, stderr = self.node_dict[node].exec_command(cmd)
+            _, stdout, stderr = self._get_client(node).exec_command(cmd)
 
         if stdout.channel.recv_exit_status() != 0:
             ret_dict['Flag'] = False
@@ -121,9 +476,10 @@ class Rexe:
                 ret_dict['error_msg'] = "".join(ret_dict['error_msg'])
         else:
             if cmd.find("--xml") != -1:
-                stdout_xml_string = "".join(stdout.readlines())
-                ret_dict['msg'] = json.loads(json.dumps(xmltodict.parse(
-                    stdout_xml_string)))['cliOutput']
+                decoder = CliXmlDecoder(xml_schema)
+                for chunk in iter(lambda: stdout.read(65536), b''):
+                    decoder.feed(chunk)
+                ret_dict['msg'] = decoder.close()
             else:
                 ret_dict['msg'] = stdout.readlines()
             ret_dict['Flag'] = True
@@ -131,7 +487,65 @@ class Rexe:
         ret_dict['cmd'] = cmd
         ret_dict['error_code'] = stdout.channel.recv_exit_status()
 
-        self.logger.debug(ret_dict)
+        self.logger.debug(self._trunc_repr(ret_dict))
+        return ret_dict
+
+    def call_agent(self, op: str, node: str, timeout: float = 300,
+                   **args) -> dict:
+        """
+        Function to run an operation through the helper agent of the node.
+        The agent is started on the first call and kept running. If the
+        agent stops responding, it is restarted once for the call. The
+        Flag tells whether the agent could be reached, hence whether the
+        caller has to fall back to the helper script.
+        Args:
+            op (str): The operation, one of ping, stat, walk, hash,
+                      getxattr and checksum.
+            node (str): The node wherein the operation is to be run.
+            timeout (float): Time in seconds to wait for the response.
+                             Default is 300.
+            args: The arguments of the operation.
+        Returns:
+            ret: A dictionary consisting
+                - Flag : False if the agent couldn't be reached
+                - msg : The result of the operation
+                - error_msg : The error, if any
+                - error_code : 0 on success, the errno of the failure
+                               or -1 if the agent can't be used
+                - cmd : The operation
+                - node : Node wherein the operation was run
+        """
+        ret_dict = {'Flag': False, 'msg': None, 'error_msg': "",
+                    'error_code': -1, 'cmd': op, 'node': node}
+        if not self.connect_flag or not self.use_agent:
+            ret_dict['error_msg'] = "Agent not in use"
+            return ret_dict
+
+        for _ in range(2):
+            agent = AgentPool.get_agent(node, timeout)
+            if agent is None:
+                ret_dict['error_msg'] = f"Agent not available on {node}"
+                return ret_dict
+            try:
+                response = agent.request(op, args, timeout)
+                break
+            except Exception as error:
+                AgentPool.discard(node, agent)
+                ret_dict['error_msg'] = f"Agent failure : {error}"
+                if isinstance(error, socket.timeout):
+                    return ret_dict
+        else:
+            return ret_dict
+
+        ret_dict['Flag'] = True
+        ret_dict['error_msg'] = ""
+        if 'error' in response:
+            ret_dict['error_msg'] = response['error']
+            ret_dict['error_code'] = response['errno']
+        else:
+            ret_dict['msg'] = response['result']
+            ret_dict['error_code'] = 0
+        self.logger.debug(self._trunc_repr(ret_dict))
         return ret_dict
 
     @dispatch(str)
@@ -151,6 +565,8 @@ class Rexe:
     def execute_command_async(self, cmd: str, node: str) -> dict:
         """
         Function to execute command asynchronously in the given node.
+        The command is run in a process group of its own, so that it can
+        be cancelled along with its children.
         Args:
             cmd (string): Command to be executed.
             node (string) : The node ip wherein the command is to be run.
@@ -160,23 +576,59 @@ class Rexe:
                 - node : Node wherein the command was run
                 - stdout : The stdout handle
                 - stderr : The stderr handle
+                - pgid_file : File on the node holding the process group id
         """
         async_obj = {}
 
         if not self.connect_flag:
             return async_obj
+        pgid_file = f"/tmp/redant_async_{random.getrandbits(64):016x}.pgid"
+        wrapped_cmd = self._form_cancellable_cmd(cmd, pgid_file)
         try:
-            stdin, stdout, stderr = self.node_dict[node].exec_command(cmd)
+            stdin, stdout, stderr = \
+                self._get_client(node).exec_command(wrapped_cmd)
         except Exception:
             # Reconnection to be done.
             self.connect_node(node)
             # On rebooting the node
-            stdin, stdout, stderr = self.node_dict[node].exec_command(cmd)
+            stdin, stdout, stderr = \
+                self._get_client(node).exec_command(wrapped_cmd)
 
         async_obj = {"cmd": cmd, "node": node, "stdout": stdout,
-                     "stderr": stderr, "stdin": stdin}
+                     "stderr": stderr, "stdin": stdin,
+                     "pgid_file": pgid_file}
         return async_obj
 
+    @staticmethod
+    def _form_cancellable_cmd(cmd: str, pgid_file: str) -> str:
+        """
+        Wraps an async command so that it runs as a job of its own process
+        group, the id of which is written to the pgid file for the time
+        the command runs. The stdin, the output and the exit status of the
+        command are those of the wrapper.
+        """
+        pgid_file = shlex.quote(pgid_file)
+        script = (f"set -m; eval {shlex.quote(cmd)} & set +m; "
+                  f"echo $! > {pgid_file}; wait $!; rc=$?; "
+                  f"rm -f {pgid_file}; exit $rc")
+        return f"bash -c {shlex.quote(script)}"
+
+    def send_async_input(self, async_obj: dict, data):
+        """
+        Writes the input of an async command to its stdin and closes the
+        stdin, hence a large input, like a list of paths, is passed
+        without going through the command line.
+        Args:
+            async_obj (dict) : Contains the details about the async command,
+                               with keys -> 'stdout', 'stderr', 'cmd', 'node'
+                               and 'stdin'
+            data (str|bytes) : The input of the command.
+        """
+        stdin = async_obj['stdin']
+        stdin.write(data)
+        stdin.flush()
+        stdin.channel.shutdown_write()
+
     def check_async_command_status(self, async_obj: dict) -> bool:
         """
         A check to see if the async execution of a command which
@@ -198,6 +650,9 @@ class Rexe:
         Returns:
             dict: Returns the resultant dictionary
         """
+        if 'result' in async_obj:
+            return async_obj['result']
+
         ret_dict = {}
         if async_obj['stdout'].channel.recv_exit_status() != 0:
             ret_dict['Flag'] = False
@@ -207,9 +662,8 @@ class Rexe:
                 ret_dict['error_msg'] = "".join(ret_dict['error_msg'])
         else:
             if async_obj['cmd'].find("--xml") != -1:
-                stdout_xml_string = "".join(async_obj['stdout'].readlines())
-                ret_dict['msg'] = json.loads(json.dumps(xmltodict.parse(
-                    stdout_xml_string)))['cliOutput']
+                ret_dict['msg'] = decode_cli_xml(
+                    async_obj['stdout'].read())
             else:
                 ret_dict['msg'] = async_obj['stdout'].readlines()
             ret_dict['Flag'] = True
@@ -217,9 +671,310 @@ class Rexe:
         ret_dict['cmd'] = async_obj['cmd']
         ret_dict['error_code'] = async_obj['stdout'].channel.recv_exit_status()
 
-        self.logger.debug(ret_dict)
+        self.logger.debug(self._trunc_repr(ret_dict))
         return ret_dict
 
+    def iter_async_output(self, async_obj: dict, chunks: bool = False,
+                          max_lines: int = 1000, spill_path: str = None):
+        """
+        Streams the stdout of an async command, yielding the lines or the
+        raw chunks as they arrive, without holding the whole output in the
+        memory. Once the command ends, its result is stored in the async
+        object, to be fetched using collect_async_result. The msg of the
+        result holds only the last max_lines lines of the output.
+        Args:
+            async_obj (dict) : Contains the details about the async command,
+                               with keys -> 'stdout', 'stderr', 'cmd', 'node'
+            chunks (bool) : If True, the raw chunks of bytes are yielded
+                            instead of the lines. Default is False.
+            max_lines (int) : Number of the last lines kept in the result.
+                              None keeps all the lines. Default is 1000.
+            spill_path (str) : Local file to which the complete stdout is
+                               written. Default is None.
+        Yields:
+            str|bytes: A line of the stdout, along with the newline, or a
+                       chunk of the stdout.
+        """
+        channel = async_obj['stdout'].channel
+        tail = collections.deque(maxlen=max_lines)
+        err = bytearray()
+        partial = b""
+        line_count = 0
+        spill_fd = None
+        if spill_path is not None:
+            spill_fd = open(spill_path, 'wb')
+
+        selector = selectors.DefaultSelector()
+        selector.register(channel, selectors.EVENT_READ)
+        try:
+            ended = False
+            while not ended:
+                # All the data is in the buffers once the EOF is received,
+                # hence the check before the final read.
+                ended = channel.eof_received or channel.closed
+                while channel.recv_stderr_ready():
+                    data = channel.recv_stderr(32768)
+                    err += data[:self.stream_max_stderr - len(err)]
+                while channel.recv_ready():
+                    data = channel.recv(32768)
+                    if spill_fd is not None:
+                        spill_fd.write(data)
+                    if chunks:
+                        yield data
+                    lines = (partial + data).split(b"\n")
+                    partial = lines.pop()
+                    for line in lines:
+                        line = line.decode('utf-8', 'replace') + "\n"
+                        line_count += 1
+                        tail.append(line)
+                        if not chunks:
+                            yield line
+                if not ended:
+                    selector.select()
+            if partial:
+                line = partial.decode('utf-8', 'replace')
+                line_count += 1
+                tail.append(line)
+                if not chunks:
+                    yield line
+        finally:
+            selector.close()
+            if spill_fd is not None:
+                spill_fd.close()
+
+        ret_code = channel.recv_exit_status()
+        ret_dict = {}
+        ret_dict['Flag'] = (ret_code == 0)
+        ret_dict['msg'] = list(tail)
+        if ret_code != 0:
+            ret_dict['error_msg'] = err.decode('utf-8', 'replace')
+        ret_dict['node'] = async_obj['node']
+        ret_dict['cmd'] = async_obj['cmd']
+        ret_dict['error_code'] = ret_code
+        ret_dict['line_count'] = line_count
+        ret_dict['truncated'] = line_count > len(tail)
+        ret_dict['spill_path'] = spill_path
+        self.logger.debug(self._trunc_repr(ret_dict))
+        async_obj['result'] = ret_dict
+
+    def execute_command_stream(self, cmd: str, node: str = None,
+                               line_handler=None, max_lines: int = 1000,
+                               spill_path: str = None) -> dict:
+        """
+        Function to execute a command with a large output in the given
+        node. The output is streamed to the line handler as it arrives
+        and only its last lines are kept in the result. Use it for the
+        commands whose output is only to be counted, filtered or tailed.
+        The xml output isn't parsed.
+        Args:
+            cmd (str): Command to be executed.
+            node (str): The node wherein the command is to be run. If None,
+                        a random node is picked.
+            line_handler (func): Called with each line of the output.
+            max_lines (int): Number of the last lines kept in the msg. None
+                             keeps all the lines. Default is 1000.
+            spill_path (str): Local file to which the complete output is
+                              written. Default is None.
+        Returns:
+            dict: The result dictionary, as returned by execute_command,
+                  along with
+                  - line_count : number of lines in the output
+                  - truncated : True if msg doesn't hold all the lines
+                  - spill_path : the spill file, if any
+        """
+        if node is None:
+            node = self._random_node()
+        async_obj = self.execute_command_async(cmd, node)
+        if not async_obj:
+            return {'Flag': False, 'msg': [], 'error_code': -1,
+                    'error_msg': f"Not connected to {node}", 'node': node,
+                    'cmd': cmd, 'line_count': 0, 'truncated': False,
+                    'spill_path': spill_path}
+        for line in self.iter_async_output(async_obj, False, max_lines,
+                                           spill_path):
+            if line_handler is not None:
+                line_handler(line)
+        return self.collect_async_result(async_obj)
+
+    def _form_async_result(self, async_obj: dict, ret_code: int,
+                           out: str, err: str) -> dict:
+        """
+        Forms the result dictionary of an async command from the output
+        gathered by the async waiter, in the form of collect_async_result.
+        """
+        ret_dict = {}
+        if ret_code != 0:
+            ret_dict['Flag'] = False
+            ret_dict['msg'] = out.splitlines(True)
+            ret_dict['error_msg'] = err
+        else:
+            if async_obj['cmd'].find("--xml") != -1:
+                ret_dict['msg'] = decode_cli_xml(out)
+            else:
+                ret_dict['msg'] = out.splitlines(True)
+            ret_dict['Flag'] = True
+        ret_dict['node'] = async_obj['node']
+        ret_dict['cmd'] = async_obj['cmd']
+        ret_dict['error_code'] = ret_code
+
+        self.logger.debug(self._trunc_repr(ret_dict))
+        return ret_dict
+
+    @staticmethod
+    def _incomplete_async_result(async_obj: dict) -> dict:
+        """
+        Result of an async command which didn't end within the timeout.
+        """
+        return {'error_code': -1, 'Flag': False, 'msg': "",
+                'error_msg': "Command execution incomplete",
+                'node': async_obj['node'], 'cmd': async_obj['cmd']}
+
+    def cancel_async_command(self, async_obj: dict):
+        """
+        Cancels an async command. The process group of the command is sent
+        a SIGTERM over a separate exec, hence the command and its children
+        are stopped even if they don't write to the channel, and then the
+        channel is closed.
+        Args:
+            async_obj (dict) : Contains the details about the async command,
+                               with keys -> 'stdout', 'stderr', 'cmd', 'node'
+                               and 'pgid_file'
+        """
+        channel = async_obj['stdout'].channel
+        if channel.closed:
+            return
+        self.logger.info(f"Cancelling {async_obj['cmd']} on "
+                         f"{async_obj['node']}")
+        if not channel.exit_status_ready():
+            pgid_file = shlex.quote(async_obj['pgid_file'])
+            self.execute_command(f"pgid=$(cat {pgid_file} 2>/dev/null) && "
+                                 f"kill -TERM -- -$pgid; rm -f {pgid_file}",
+                                 async_obj['node'])
+        channel.close()
+
+    def iter_async_results(self, async_objs: list, timeout: int = None,
+                           fail_fast: bool = False, on_output=None):
+        """
+        Waits for a set of async commands together, yielding the result
+        of each command as soon as it ends. The channels of all the
+        commands are watched through a selector, their output being read
+        as it arrives so that a long running command doesn't stall on a
+        full channel window.
+        Args:
+            async_objs (list) : Async objects as returned by
+                                execute_command_async.
+            timeout (int) : Time in seconds within which all the commands
+                            should end. The commands which don't, are
+                            yielded with error_code -1. Default is None,
+                            i.e. no timeout.
+            fail_fast (bool) : If True, on the first command which fails,
+                               the remaining commands are cancelled and
+                               yielded with error_code -1.
+            on_output (func) : Called as on_output(async_obj, data, stream)
+                               for every chunk of output read, stream being
+                               'stdout' or 'stderr'.
+        Yields:
+            tuple: (index of the async object in the list, result dict)
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        selector = selectors.DefaultSelector()
+        pending = {}
+        for (index, async_obj) in enumerate(async_objs):
+            if 'result' in async_obj:
+                yield (index, async_obj['result'])
+                continue
+            channel = async_obj['stdout'].channel
+            # The output read so far is kept with the async object, for
+            # the next wait in case this one times out.
+            pending[index] = async_obj.setdefault('output',
+                                                  {"out": [], "err": []})
+            selector.register(channel, selectors.EVENT_READ, index)
+
+        try:
+            while pending:
+                wait_time = None
+                if deadline is not None:
+                    wait_time = max(deadline - time.time(), 0)
+                events = selector.select(wait_time)
+                if not events and deadline is not None \
+                   and time.time() >= deadline:
+                    for index in list(pending.keys()):
+                        async_obj = async_objs[index]
+                        selector.unregister(async_obj['stdout'].channel)
+                        del pending[index]
+                        yield (index,
+                               self._incomplete_async_result(async_obj))
+                    break
+
+                for (key, _) in events:
+                    index = key.data
+                    async_obj = async_objs[index]
+                    channel = key.fileobj
+                    buffers = pending[index]
+                    # The EOF is checked ahead of the reads, as the output
+                    # arriving in between is read along.
+                    ended = channel.eof_received or channel.closed
+                    while channel.recv_ready():
+                        data = channel.recv(32768)
+                        buffers["out"].append(data)
+                        if on_output is not None:
+                            on_output(async_obj, data, 'stdout')
+                    while channel.recv_stderr_ready():
+                        data = channel.recv_stderr(32768)
+                        buffers["err"].append(data)
+                        if on_output is not None:
+                            on_output(async_obj, data, 'stderr')
+                    if not ended:
+                        continue
+
+                    # The exit status follows the EOF right away.
+                    ret_code = channel.recv_exit_status()
+                    selector.unregister(channel)
+                    del pending[index]
+                    ret_dict = self._form_async_result(
+                        async_obj, ret_code,
+                        b"".join(buffers["out"]).decode('utf-8', 'replace'),
+                        b"".join(buffers["err"]).decode('utf-8', 'replace'))
+                    async_obj['result'] = ret_dict
+                    yield (index, ret_dict)
+
+                    if fail_fast and ret_code != 0:
+                        for rem_index in list(pending.keys()):
+                            rem_obj = async_objs[rem_index]
+                            selector.unregister(rem_obj['stdout'].channel)
+                            del pending[rem_index]
+                            self.cancel_async_command(rem_obj)
+                            ret_dict = \
+                                self._incomplete_async_result(rem_obj)
+                            ret_dict['error_msg'] = "Command cancelled"
+                            yield (rem_index, ret_dict)
+                        break
+        finally:
+            selector.close()
+
+    def wait_for_async_commands(self, async_objs: list, timeout: int = None,
+                                fail_fast: bool = False) -> list:
+        """
+        Waits for a set of async commands to end.
+        Args:
+            async_objs (list) : Async objects as returned by
+                                execute_command_async.
+            timeout (int) : Time in seconds within which all the commands
+                            should end. Default is None, i.e. no timeout.
+            fail_fast (bool) : If True, the remaining commands are cancelled
+                               as soon as one of the commands fails.
+        Returns:
+            list: The result dictionaries in the order of the async objects.
+        """
+        ret_list = [None] * len(async_objs)
+        for (index, ret_dict) in self.iter_async_results(async_objs, timeout,
+                                                         fail_fast):
+            ret_list[index] = ret_dict
+        return ret_list
+
     def wait_till_async_command_ends(self, async_obj: dict,
                                      timeout: int = None) -> dict:
         """
@@ -233,31 +988,7 @@ class Rexe:
         Returns:
             dict: Returns the resultant dictionary after the command ends.
         """
-
-        ret_dict = {}
-        if timeout:
-            while timeout:
-                if not async_obj['stdout'].channel.exit_status_ready():
-                    time.sleep(1)
-                    timeout -= 1
-                else:
-                    break
-
-            if not timeout:
-                ret_dict['error_code'] = -1
-                ret_dict['Flag'] = False
-                ret_dict['msg'] = ""
-                ret_dict['error_msg'] = "Command execution incomplete"
-                ret_dict['node'] = async_obj['node']
-                ret_dict['cmd'] = async_obj['cmd']
-                return ret_dict
-
-        else:
-            while not async_obj['stdout'].channel.exit_status_ready():
-                time.sleep(1)
-
-        ret_dict = self.collect_async_result(async_obj)
-        return ret_dict
+        return self.wait_for_async_commands([async_obj], timeout)[0]
 
     @dispatch(str)
     def execute_command_multinode(self, cmd):
@@ -265,7 +996,7 @@ class Rexe:
         Function to execute command in multiple nodes parallely
         when node list isn't given.
         """
-        return self.execute_command_multinode(cmd, list(self.node_dict.keys()))
+        return self.execute_command_multinode(cmd, list(self.host_dict.keys()))
 
     @dispatch(str, list)
     def execute_command_multinode(self, cmd, node_list):
@@ -285,7 +1016,168 @@ class Rexe:
                     ret_val.append(future_handle.result())
                 except Exception as exc:
                     print(f"Generated exception : {exc}")
-        self.logger.info(ret_val)
+        self.logger.info(self._trunc_repr(ret_val))
+        return ret_val
+
+    @staticmethod
+    def _form_batch_script(cmd_list: list, marker: str) -> str:
+        """
+        Forms the shell script which runs a batch of commands. Each command
+        is run in its own subshell, as it would be when run on its own,
+        its stdout and stderr being collected in temporary files. After
+        each command, a header line with the marker, the exit code and the
+        sizes of the stdout and stderr is printed followed by the stdout
+        and stderr themselves.
+        """
+        script = ['__rd=$(mktemp -d) || exit 1; trap \'rm -rf "$__rd"\' EXIT']
+        for cmd in cmd_list:
+            script.append(f'(\n{cmd}\n) > "$__rd/o" 2> "$__rd/e" < /dev/null')
+            script.append(f'printf "{marker} %d %d %d\\n" $? '
+                          '$(wc -c < "$__rd/o") $(wc -c < "$__rd/e")')
+            script.append('cat "$__rd/o" "$__rd/e"')
+        return "\n".join(script)
+
+    @staticmethod
+    def _parse_batch_output(output: bytes, marker: str) -> list:
+        """
+        Splits the output of a batch script into the exit code, stdout and
+        stderr of each of the commands.
+        Returns:
+            list: List of tuples of the form (exit code, stdout, stderr)
+        """
+        results = []
+        offset = 0
+        marker = marker.encode()
+        while offset < len(output):
+            line_end = output.index(b'\n', offset)
+            header = output[offset:line_end].split()
+            if len(header) != 4 or header[0] != marker:
+                raise Exception("Malformed batch output")
+            (ret_code, out_len, err_len) = [int(val) for val in header[1:]]
+            out_start = line_end + 1
+            err_start = out_start + out_len
+            offset = err_start + err_len
+            results.append((ret_code,
+                            output[out_start:err_start].decode(
+                                'utf-8', 'replace'),
+                            output[err_start:offset].decode(
+                                'utf-8', 'replace')))
+        return results
+
+    def execute_command_batch(self, cmd_list: list, node: str = None,
+                              xml_schemas: list = None) -> list:
+        """
+        Function to execute a batch of commands in the given node in a
+        single round trip. The commands are run one after the other in
+        the order given, irrespective of the failure of the earlier ones.
+        Args:
+            cmd_list (list): Commands to be executed.
+            node (str): The node wherein the commands are to be run. If
+                        None, a random node is picked.
+            xml_schemas (list): Optional schema from common.gluster_xml
+                                per command, used for shaping the output
+                                of the --xml commands.
+        Returns:
+            list: A dictionary per command, in the order of the commands,
+                  of the same form as the one returned by execute_command.
+        """
+        if node is None:
+            node = self._random_node()
+
+        ret_list = []
+        if not self.connect_flag:
+            return [{'Flag': False} for _ in cmd_list]
+        if not cmd_list:
+            return ret_list
+
+        marker = f"__redant_batch_{random.getrandbits(64):016x}"
+        script = self._form_batch_script(cmd_list, marker)
+        try:
+            _, stdout, stderr = self._get_client(node).exec_command(script)
+        except Exception:
+            # Reconnection to be done.
+            self.connect_node(node)
+            _, stdout, stderr = self._get_client(node).exec_command(script)
+
+        output = stdout.read()
+        batch_ret = stdout.channel.recv_exit_status()
+        try:
+            results = self._parse_batch_output(output, marker)
+        except Exception as error:
+            self.logger.error(f"Failed to parse the output of the batch on"
+                              f" {node} : {error}")
+            results = []
+        if len(results) != len(cmd_list):
+            self.logger.error(f"Batch on {node} exited with {batch_ret} "
+                              f"after {len(results)} of {len(cmd_list)}"
+                              " commands.")
+
+        if xml_schemas is None:
+            xml_schemas = [None] * len(cmd_list)
+        for (index, cmd) in enumerate(cmd_list):
+            ret_dict = {}
+            if index >= len(results):
+                ret_dict['Flag'] = False
+                ret_dict['msg'] = []
+                ret_dict['error_msg'] = "Command not run in the batch"
+                ret_dict['error_code'] = -1
+            else:
+                (ret_code, out, err) = results[index]
+                if ret_code != 0:
+                    ret_dict['Flag'] = False
+                    ret_dict['msg'] = out.splitlines(True)
+                    ret_dict['error_msg'] = err
+                elif cmd.find("--xml") != -1:
+                    ret_dict['msg'] = decode_cli_xml(out,
+                                                     xml_schemas[index])
+                    ret_dict['Flag'] = True
+                else:
+                    ret_dict['msg'] = out.splitlines(True)
+                    ret_dict['Flag'] = True
+                ret_dict['error_code'] = ret_code
+            ret_dict['node'] = node
+            ret_dict['cmd'] = cmd
+            ret_list.append(ret_dict)
+
+        self.logger.debug(self._trunc_repr(ret_list))
+        return ret_list
+
+    def execute_command_batch_multinode(self, cmd_list: list,
+                                        node_list: list = None) -> dict:
+        """
+        Function to execute a batch of commands in multiple nodes
+        parallely, a single round trip being made to each of the nodes.
+        Args:
+            cmd_list (list|dict): Commands to be executed. A dict maps each
+                                  node to its own commands, in which case
+                                  the node_list is ignored.
+            node_list (list): Nodes wherein the commands are to be run. If
+                              None, the commands are run in all the nodes.
+        Returns:
+            dict: The node mapped to the list of results of the commands
+                  in that node, as returned by execute_command_batch.
+        """
+        if isinstance(cmd_list, dict):
+            cmd_dict = cmd_list
+        else:
+            if node_list is None:
+                node_list = list(self.host_dict.keys())
+            cmd_dict = {node: cmd_list for node in node_list}
+
+        ret_val = {}
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(len(cmd_dict), 1)) as executor:
+
+            future_exec = {executor.submit(
+                self.execute_command_batch, node_cmds, node): node
+                for (node, node_cmds) in cmd_dict.items()}
+            for future_handle in concurrent.futures.as_completed(future_exec):
+                try:
+                    ret_val[future_exec[future_handle]] = \
+                        future_handle.result()
+                except Exception as exc:
+                    print(f"Generated exception : {exc}")
+        self.logger.info(self._trunc_repr(ret_val))
         return ret_val
 
     def transfer_file_from_local(self, source_path, dest_path, dest_node,
@@ -300,12 +1192,57 @@ class Rexe:
             remove (bool) : If True removes the file and then copies.
                             Defaults to False
         """
-        sftp = self.node_dict[dest_node].open_sftp()
+        sftp = self._get_client(dest_node).open_sftp()
         if remove:
             sftp.remove(dest_path)
         sftp.put(source_path, dest_path)
         sftp.close()
 
+    def transfer_files_from_local(self, file_list: list, dest_node: str):
+        """
+        Method to transfer a set of files to the dest node over a single
+        sftp session.
+        Args:
+            file_list (list): List of (source path, dest path) tuples.
+            dest_node (str)
+        """
+        sftp = self._get_client(dest_node).open_sftp()
+        try:
+            for (source_path, dest_path) in file_list:
+                sftp.put(source_path, dest_path)
+        finally:
+            sftp.close()
+
+    def read_files_from_node(self, remote_dir: str, node: str,
+                             offsets: dict = None) -> dict:
+        """
+        Method to read all the files of a directory of a node over a single
+        sftp session.
+        Args:
+            remote_dir (str): The absolute path of the remote directory.
+            node (str)
+        Optional:
+            offsets (dict): The names of the files mapped to the offset
+                            from which they are to be read, so that only
+                            what was appended since an earlier read is
+                            fetched. The other files are read whole.
+        Returns:
+            dict: The names of the files mapped to their content from the
+                  offset, as bytes.
+        """
+        offsets = offsets or {}
+        files = {}
+        sftp = self._get_client(node).open_sftp()
+        try:
+            for name in sftp.listdir(remote_dir):
+                with sftp.open(f"{remote_dir}/{name}", "rb") as remote_fd:
+                    remote_fd.seek(offsets.get(name, 0))
+                    remote_fd.prefetch()
+                    files[name] = remote_fd.read()
+        finally:
+            sftp.close()
+        return files
+
     def reboot_node(self, node: str) -> bool:
         """
         Reboot of a node is a special case and we need to execute his using
@@ -321,7 +1258,7 @@ class Rexe:
         self.logger.info(f"Rebooting node: {node} ...")
         cmd = "reboot"
         try:
-            _, stdout, _ = self.node_dict[node].exec_command(cmd)
+            _, stdout, _ = self._get_client(node).exec_command(cmd)
         except Exception as err:
             # In case command execution fails, handle exception
             self.logger.error("Failed to execute 'reboot' command. "
@@ -332,4 +1269,7 @@ class Rexe:
         if stdout:
             stdout.channel.close()
 
+        # The pooled connection dies with the reboot, drop it so that the
+        # next command on the node dials afresh.
+        ConnectionPool.invalidate(node)
         return True
@@ -0,0 +1,34 @@
+"""
+Checks the gluster xml decoder against xmltodict, whose output it
+reproduces.
+"""
+import pytest
+
+from common.gluster_xml import CliXmlDecoder, decode_cli_xml
+
+xmltodict = pytest.importorskip("xmltodict")
+
+DOCS = [
+    "<cliOutput><opRet>0</opRet><opErrno>0</opErrno><opErrstr/>"
+    "</cliOutput>",
+    "<cliOutput><a x='1'>t<b>1</b>u<b>2</b> v </a><c/></cliOutput>",
+    "<cliOutput><volInfo><volumes><volume><name>v1</name><bricks>"
+    "<brick uuid='u1'>h1:/b1<name>h1:/b1</name></brick>"
+    "<brick uuid='u2'>h2:/b2<name>h2:/b2</name></brick>"
+    "</bricks></volume><count>1</count></volumes></volInfo></cliOutput>",
+]
+
+
+@pytest.mark.parametrize("doc", DOCS)
+def test_matches_xmltodict(doc):
+    expected = xmltodict.parse(doc)['cliOutput']
+    assert decode_cli_xml(doc) == expected
+
+
+@pytest.mark.parametrize("doc", DOCS)
+def test_matches_xmltodict_fed_by_byte(doc):
+    expected = xmltodict.parse(doc)['cliOutput']
+    decoder = CliXmlDecoder()
+    for char in doc.encode():
+        decoder.feed(bytes([char]))
+    assert decoder.close() == expected
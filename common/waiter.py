@@ -0,0 +1,126 @@
+"""
+Condition wait engine used by the wait_* helpers of the ops. A condition
+is polled with an exponential backoff, starting with a short interval so
+that a condition which flips soon is noticed soon, and capped so that a
+long wait doesn't hammer the nodes. A random jitter keeps the waits of
+the parallel tests from polling in lock step.
+
+Deadlines propagate through the nested waits of a thread. A wait entered
+while a Deadline is active never outlives it, hence a helper which waits
+for a few conditions one after the other can bound all of them with its
+own timeout.
+"""
+import time
+import random
+import threading
+
+_ambient = threading.local()
+
+
+def _ambient_deadline():
+    """
+    The innermost Deadline active in the thread, if any.
+    """
+    return getattr(_ambient, 'deadline', None)
+
+
+class Deadline:
+    """
+    Point in time by which a wait has to end. A Deadline used as a context
+    manager becomes the ambient deadline for the waits nested in it.
+    """
+
+    def __init__(self, timeout: float = None):
+        """
+        Args:
+            timeout (float): Time in seconds from now. If None, only the
+                             ambient deadline, if any, applies.
+        """
+        self.expiry = None
+        if timeout is not None:
+            self.expiry = time.monotonic() + timeout
+        outer = _ambient_deadline()
+        if outer is not None and outer.expiry is not None:
+            if self.expiry is None or outer.expiry < self.expiry:
+                self.expiry = outer.expiry
+        self._outer = None
+
+    def remaining(self):
+        """
+        Returns:
+            float: Seconds left, never below 0, or None if unbounded.
+        """
+        if self.expiry is None:
+            return None
+        return max(self.expiry - time.monotonic(), 0)
+
+    def expired(self) -> bool:
+        """
+        Returns:
+            bool: True if the deadline has passed.
+        """
+        return self.expiry is not None and time.monotonic() >= self.expiry
+
+    def __enter__(self):
+        self._outer = _ambient_deadline()
+        _ambient.deadline = self
+        return self
+
+    def __exit__(self, *args):
+        _ambient.deadline = self._outer
+        self._outer = None
+
+
+def remaining_time(timeout: float = None):
+    """
+    Clamps a timeout to the ambient deadline.
+    Args:
+        timeout (float): Timeout in seconds or None.
+    Returns:
+        float: The time left for a wait of the said timeout, or None if
+               unbounded.
+    """
+    return Deadline(timeout).remaining()
+
+
+def wait_until(predicate, timeout: float = None, interval: float = 0.25,
+               max_interval: float = 5, backoff: float = 1.5,
+               jitter: float = 0.1, abort=None):
+    """
+    Waits till the predicate holds.
+    Args:
+        predicate (func): Called without arguments, the wait ends when it
+                          returns a truthy value.
+        timeout (float): Time in seconds after which the wait gives up.
+                         Default is None, i.e. bounded only by the ambient
+                         deadline.
+        interval (float): The first interval between two checks.
+        max_interval (float): The cap on the interval between two checks.
+                              Default is 5, as most of the conditions
+                              run a gluster command.
+        backoff (float): Factor by which the interval grows after each
+                         failed check.
+        jitter (float): Fraction of the interval by which it is randomly
+                        stretched or shortened.
+        abort (func): Called after each failed check. If it returns a
+                      truthy value, the wait ends early.
+    Returns:
+        The truthy value of the predicate, or False if the wait timed out
+        or was aborted.
+    """
+    with Deadline(timeout) as deadline:
+        delay = interval
+        while True:
+            value = predicate()
+            if value:
+                return value
+            if abort is not None and abort():
+                return False
+            remaining = deadline.remaining()
+            if remaining is not None and remaining <= 0:
+                return False
+            pause = delay * (1 + random.uniform(-jitter, jitter))
+            if remaining is not None:
+                pause = min(pause, remaining)
+            time.sleep(pause)
+            delay = min(delay * backoff, max_interval)
@@ -3,6 +3,10 @@ import sys
 from socket import timeout
 import copy
 import traceback
+import hashlib
+import tarfile
+import tempfile
+import concurrent.futures
 import paramiko
 from halo import Halo
 sys.path.insert(1, ".")
@@ -15,6 +19,8 @@ class environ:
     the setup and the cleanup.
     """
 
+    script_dir = "/usr/share/redant/script"
+
     def __init__(self, param_obj, es, error_handler,
                  log_path: str, log_level: str):
         """
@@ -58,100 +64,173 @@ class environ:
         """
         return self.redant.logger
 
-    def _transfer_files_to_machines(self, machines: list, spath: str,
-                                    dpath: str):
+    def _transfer_files_to_machines(self, machines: list,
+                                    file_list: list) -> dict:
         """
-        Transfers files from source path to destination
-        path
+        Transfers files from source path to destination path. Each
+        machine gets all of its files over a single sftp session, the
+        machines being served parallely. The destination directories are
+        expected to exist.
+        Args:
+            machines (list): Nodes to which the files are copied.
+            file_list (list): List of (source path, dest path) tuples.
+        Returns:
+            dict: The node mapped to None if the files were copied, or
+                  the error which failed the copy.
+        """
+        report = {}
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(len(machines), 1)) as executor:
+            future_exec = {executor.submit(
+                self.redant.transfer_files_from_local, file_list, node): node
+                for node in machines}
+            for future_handle in concurrent.futures.as_completed(future_exec):
+                node = future_exec[future_handle]
+                try:
+                    future_handle.result()
+                    report[node] = None
+                    self.redant.logger.info(f"Copied {len(file_list)} "
+                                            f"files to {node}")
+                except Exception as error:
+                    report[node] = error
+                    self.redant.logger.error(f"Copying files to {node} "
+                                             f"failed : {error}")
+
+        failed = [node for node in report if report[node] is not None]
+        if failed:
+            raise Exception(f"Failed to copy the files to {failed}")
+        return report
+
+    @staticmethod
+    def _get_local_scripts() -> dict:
         """
-        remove = False
-        check_path = False
-        if not self.redant.path_exists(machines, "/usr/share/redant/script"):
-            for node in machines:
-                self.redant.create_dir('/usr/share', 'redant/script', node)
-                check_path = True
+        Lists the scripts which are deployed on the machines, along with
+        the sha256 digest of their content.
+        Returns:
+            dict: The script name mapped to a tuple of its local path and
+                  its digest.
+        """
+        scripts = ['tools/scripts/file_dir_ops.py',
+                   'tools/scripts/compute_hash.py',
+                   'tools/scripts/file_lock.py',
+                   'tools/scripts/fd_writes.py',
+                   'tools/scripts/walk_dir.py',
+                   'tools/scripts/proc_sampler.py',
+                   'tools/scripts/heal_monitor.py',
+                   'tools/scripts/redant_agent.py',
+                   'tools/scripts/tree_scan.py',
+                   'tools/scripts/stat_record.py',
+                   'tools/scripts/arequal_shards.py',
+                   'tools/pre-req_scripts/arequal_install.sh',
+                   'tools/pre-req_scripts/crefi_install.sh']
+        local_scripts = {}
+        for script in scripts:
+            spath = f'{os.getcwd()}/{script}'
+            with open(spath, 'rb') as script_fd:
+                digest = hashlib.sha256(script_fd.read()).hexdigest()
+            local_scripts[os.path.basename(script)] = (spath, digest)
+        return local_scripts
 
-        if check_path and self.redant.path_exists(machines, [dpath]):
-            remove = True
+    @staticmethod
+    def _reset_owner(tarinfo):
+        """
+        Drops the local ownership of a file added to the script bundle,
+        so that the extracted scripts are owned by the remote user.
+        """
+        tarinfo.uid = tarinfo.gid = 0
+        tarinfo.uname = tarinfo.gname = "root"
+        return tarinfo
 
+    def _probe_machines(self, machines: list, scripts: list) -> dict:
+        """
+        Takes the manifest of the deployed scripts, i.e. their sha256
+        digests, and checks for arequal checksum and crefi on the machines,
+        in a single round trip per machine. The digests are taken afresh,
+        hence a script changed or removed on a machine is caught as well.
+        Args:
+            machines (list): Nodes to be probed.
+            scripts (list): Names of the scripts to be looked up.
+        Returns:
+            dict: The node mapped to its probe, for example,
+                  {
+                    "node1" : {
+                        "manifest" : {"file_dir_ops.py" : "<digest>", ...},
+                        "arequal" : True,
+                        "crefi" : False
+                    },
+                    ...
+                  }
+        """
+        cmd_list = [f"mkdir -p {self.script_dir}; cd {self.script_dir} && "
+                    f"sha256sum {' '.join(scripts)} 2> /dev/null",
+                    "arequal-checksum", "crefi"]
+        ret = self.redant.execute_abstract_op_batch_multinode(cmd_list,
+                                                              machines,
+                                                              False)
+        probe = {}
         for node in machines:
-            self.redant.logger.info(f'Copying file to {node}')
-            self.redant.transfer_file_from_local(spath,
-                                                 dpath, node,
-                                                 remove)
-
-    def _check_and_copy_scripts(self):
-        """
-        Check if the I/O script exists in the client
-        machines. If not transfer it there.
-        """
-        scripts_dpath = ['/usr/share/redant/script/file_dir_ops.py',
-                         '/usr/share/redant/script/compute_hash.py',
-                         '/usr/share/redant/script/file_lock.py',
-                         '/usr/share/redant/script/fd_writes.py',
-                         '/usr/share/redant/script/walk_dir.py',
-                         '/usr/share/redant/script/memory_and_cpu_logger.py']
-        scripts_spath = ['tools/scripts/file_dir_ops.py',
-                         'tools/scripts/compute_hash.py',
-                         'tools/scripts/file_lock.py',
-                         'tools/scripts/fd_writes.py',
-                         'tools/scripts/walk_dir.py',
-                         'tools/scripts/memory_and_cpu_logger.py']
-
-        total_nodes = list(set(self.client_list + self.server_list))
-        for ind, script in enumerate(scripts_spath):
-            self._transfer_files_to_machines(total_nodes,
-                                             f'{os.getcwd()}/{script}',
-                                             scripts_dpath[ind])
-
-    def _list_of_machines_without_package(self, nodes: list, package: str,
-                                          error_code: int):
-        """
-        This function returns the list of machines without
-        arequal checksum/crefi installed on it.
-        """
-        nodes = set(nodes)
-        machines = []
-        for node in nodes:
-            ret = self.redant.execute_abstract_op_node(package, node, False)
-            if ret['error_code'] != error_code:
-                machines.append(node)
-        return machines
-
-    def _check_and_install_scripts(self):
-        """
-        Checks if arequal checksum and crefi is present on
-        the servers and clients and if not present
-        installs it.
-        """
-        total_nodes = list(set(self.client_list + self.server_list))
-
-        # check for arequal checksum
-        arequal_dpath = '/usr/share/redant/script/arequal_install.sh'
-        arequal_spath = (f'{os.getcwd()}/tools/pre-req_scripts/'
-                         'arequal_install.sh')
-
-        arequal_machines = self._list_of_machines_without_package(
-            total_nodes, "arequal-checksum", 64)
-        if len(arequal_machines) > 0:
-            self._transfer_files_to_machines(arequal_machines, arequal_spath,
-                                             arequal_dpath)
-
-            cmd = f"sh {arequal_dpath}"
-            self.redant.execute_abstract_op_multinode(cmd, arequal_machines)
-
-        # check for crefi
-        crefi_dpath = '/usr/share/redant/script/crefi_install.sh'
-        crefi_spath = f'{os.getcwd()}/tools/pre-req_scripts/crefi_install.sh'
-
-        crefi_machines = self._list_of_machines_without_package(total_nodes,
-                                                                "crefi", 2)
-        if len(crefi_machines) > 0:
-            self._transfer_files_to_machines(crefi_machines, crefi_spath,
-                                             crefi_dpath)
-
-            cmd = f"sh {crefi_dpath}"
-            self.redant.execute_abstract_op_multinode(cmd, crefi_machines)
+            if node not in ret:
+                raise Exception(f"Failed to probe {node}")
+            (manifest_ret, arequal_ret, crefi_ret) = ret[node]
+            manifest = {}
+            for line in manifest_ret['msg']:
+                fields = line.split()
+                if len(fields) == 2:
+                    manifest[fields[1]] = fields[0]
+            probe[node] = {'manifest': manifest,
+                           'arequal': arequal_ret['error_code'] == 64,
+                           'crefi': crefi_ret['error_code'] == 2}
+        return probe
+
+    def _check_and_copy_scripts(self, local_scripts: dict, probe: dict):
+        """
+        Deploys the scripts on the machines whose manifest doesn't match
+        the local scripts. The scripts are bundled into a single tarball
+        which is copied to and extracted on each of those machines.
+        Args:
+            local_scripts (dict): The scripts to be deployed, as returned
+                                  by _get_local_scripts.
+            probe (dict): The probe of the machines, as returned by
+                          _probe_machines.
+        """
+        expected = {name: digest for (name, (_, digest))
+                    in local_scripts.items()}
+        machines = [node for node in probe
+                    if any(probe[node]['manifest'].get(name) != digest
+                           for (name, digest) in expected.items())]
+        if not machines:
+            self.redant.logger.info("Scripts are up to date on all the "
+                                    "machines.")
+            return
+
+        bundle_dpath = f"{self.script_dir}/.bundle.tar.gz"
+        with tempfile.NamedTemporaryFile(suffix='.tar.gz') as bundle_fd:
+            with tarfile.open(fileobj=bundle_fd, mode='w:gz') as bundle:
+                for (name, (spath, _)) in local_scripts.items():
+                    bundle.add(spath, arcname=name,
+                               filter=self._reset_owner)
+            bundle_fd.flush()
+            self._transfer_files_to_machines(machines,
+                                             [(bundle_fd.name,
+                                               bundle_dpath)])
+
+        cmd = (f"tar -xzf {bundle_dpath} -C {self.script_dir} && "
+               f"rm -f {bundle_dpath}")
+        self.redant.execute_abstract_op_multinode(cmd, machines)
+
+    def _check_and_install_scripts(self, probe: dict):
+        """
+        Installs arequal checksum and crefi on the servers and clients
+        wherein they are not present.
+        Args:
+            probe (dict): The probe of the machines, as returned by
+                          _probe_machines.
+        """
+        for package in ('arequal', 'crefi'):
+            machines = [node for node in probe if not probe[node][package]]
+            if machines:
+                cmd = f"sh {self.script_dir}/{package}_install.sh"
+                self.redant.execute_abstract_op_multinode(cmd, machines)
 
     def setup_env(self, keep_logs):
         """
@@ -170,8 +249,12 @@ class environ:
             self.redant.start_glusterd(self.server_list)
             self.redant.create_cluster(self.server_list)
             self.redant.wait_till_all_peers_connected(self.server_list)
-            self._check_and_copy_scripts()
-            self._check_and_install_scripts()
+            local_scripts = self._get_local_scripts()
+            probe = self._probe_machines(
+                list(set(self.client_list + self.server_list)),
+                list(local_scripts))
+            self._check_and_copy_scripts(local_scripts, probe)
+            self._check_and_install_scripts(probe)
             self.redant.logger.info("Environment setup success.")
             self.spinner.succeed("Environment setup successful.")
         except Exception as error:
@@ -197,6 +280,9 @@ class environ:
             self.redant.logger.error(f"Environment teardown failure : {error}")
             self.redant.logger.error(tb)
             self.spinner.fail("Environment Teardown failed.")
+        finally:
+            # Close the pooled connections of the framework process.
+            self.redant.deconstruct_connection(purge=True)
 
 
 class FrameworkEnv:
@@ -4,6 +4,7 @@ which contains APIs for configuration parameter
 parsing.
 """
 import os
+import copy
 from parsing.test_parser import Parser
 
 
@@ -160,6 +161,27 @@ class ParamsHandler:
             brick_roots[server] = self.server_config[server]['brick_root']
         return brick_roots
 
+    def get_partition(self, servers: list, clients: list):
+        """
+        Creates a params handler restricted to a subset of the servers
+        and clients, used for running a test on an isolated sub-cluster.
+        Args:
+            servers (list): Server ips which are part of the partition.
+            clients (list): Client ips which are part of the partition.
+        Returns:
+            ParamsHandler: Copy of this handler with only the said servers
+                           and clients.
+        """
+        partition = copy.copy(self)
+        partition.server_config = {server: self.server_config[server]
+                                   for server in servers}
+        partition.client_config = {client: self.client_config[client]
+                                   for client in clients}
+        partition.config_hashmap = dict(self.config_hashmap)
+        partition.config_hashmap['servers_info'] = partition.server_config
+        partition.config_hashmap['clients_info'] = partition.client_config
+        return partition
+
     def get_excluded_tests(self) -> tuple:
         """
         Gets a list of exluded tests from the config file.
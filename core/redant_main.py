@@ -16,6 +16,8 @@ from environ import environ, FrameworkEnv
 from parsing.params_handler import ParamsHandler
 from test_list_builder import TestListBuilder
 from test_runner import TestRunner
+from test_history import TestHistory
+from test_index import TestIndex
 from result_handler import handle_results
 from common.relog import Logger
 sys.path.insert(1, ".")
@@ -46,6 +48,10 @@ def pars_args():
     parser.add_argument("-cc", "--concurrency-count",
                         help="Number of concurrent test runs. Default is 2.",
                         dest="concur_count", default=2, type=int)
+    parser.add_argument("-dc", "--disruptive-concurrency",
+                        help="Number of disruptive tests run concurrently on"
+                        " disjoint sets of servers. Default is 1.",
+                        dest="dt_concur_count", default=1, type=int)
     parser.add_argument("-xls", "--excel-sheet",
                         help="Spreadsheet for result. Default value is NULL",
                         dest="excel_sheet", default=None, type=str)
@@ -99,11 +105,14 @@ def main():
         sys.exit(1)
 
     excluded_tests = excluded_result[0]
+    history = TestHistory(args.log_dir)
+    test_index = TestIndex(args.log_dir)
     spec_test = (args.test_dir.endswith(".py")
                  and args.test_dir.split("/")[-1].startswith("test"))
     try:
         TestListBuilder.create_test_dict(args.test_dir, excluded_tests,
-                                         param_obj.volume_types, spec_test)
+                                         param_obj.volume_types, spec_test,
+                                         history, test_index)
     except FileNotFoundError as e:
         spinner.fail("FileNotFoundError in test list builder")
         errer(e, "Error: Can't find the file")
@@ -120,6 +129,7 @@ def main():
     os.symlink(current_time_rep, tmplink)
     os.rename(tmplink, f"{args.log_dir}/{latest}")
     spinner.succeed("Log dir creation successful.")
+    test_index.save()
 
     # Framework Environment datastructure.
     env_obj = FrameworkEnv()
@@ -135,7 +145,8 @@ def main():
     # invoke the test_runner.
     logger_obj.debug("Running the test cases.")
     TestRunner.init(TestListBuilder, param_obj, env_set, log_dir_current,
-                    args.log_level, args.concur_count, spec_test)
+                    args.log_level, args.concur_count, spec_test, history,
+                    args.dt_concur_count)
     result_queue = TestRunner.run_tests(env_obj)
     logger_obj.debug("Collected test results queue.")
 
@@ -0,0 +1,102 @@
+"""
+This component keeps the history of the test runs across the sessions.
+The duration and the outcome of every test run for a volume type is stored
+in a json file under the log directory, which is used for ordering the
+tests and estimating the run time of the jobs.
+"""
+import os
+import json
+
+
+class TestHistory:
+    """
+    Store of the run durations and outcomes of the tests, keyed by the
+    module path and the volume type, as the modules of different
+    components can share a name.
+    The durations are smoothed over the last few runs so that a single
+    slow run doesn't throw the estimates off.
+    """
+
+    history_file = "test_history.json"
+    smoothing_runs = 5
+
+    def __init__(self, log_dir: str):
+        """
+        Loads the history stored under the log dir, if any.
+        Args:
+            log_dir (str): The base log directory of redant.
+        """
+        self.path = f"{log_dir}/{self.history_file}"
+        self.history = {}
+        try:
+            with open(self.path, 'r') as history_fd:
+                self.history = json.load(history_fd)
+        except (OSError, ValueError):
+            self.history = {}
+
+    def record(self, module_path: str, vol_type: str, duration: float,
+               result: str):
+        """
+        Adds a test run to the history.
+        Args:
+            module_path (str): Path of the test module, e.g.
+                               tests/functional/dht/test_verify_create_hash.py
+            vol_type (str): Volume type on which the test was run.
+            duration (float): Run time in seconds.
+            result (str): PASS, FAIL or SKIP.
+        """
+        entry = self.history.setdefault(module_path, {}).setdefault(
+            vol_type, {"duration": duration, "runs": 0})
+        entry["runs"] += 1
+        weight = min(entry["runs"], self.smoothing_runs)
+        entry["duration"] += (duration - entry["duration"]) / weight
+        entry["result"] = result
+
+    def get_duration(self, module_path: str, vol_type: str):
+        """
+        Gives the recorded duration of a test on a volume type.
+        Returns:
+            float: Duration in seconds or None if the test has no history.
+        """
+        return self.history.get(module_path, {}).get(vol_type, {}).get(
+            "duration")
+
+    def estimate(self, module_path: str, vol_type: str) -> float:
+        """
+        Estimates the run time of a test for a volume type. A test which
+        hasn't run on the said volume type is estimated by its runs on the
+        other volume types or else by the mean of all the recorded
+        durations.
+        Returns:
+            float: The estimated time in seconds.
+        """
+        duration = self.get_duration(module_path, vol_type)
+        if duration is not None:
+            return duration
+
+        same_test = [entry["duration"]
+                     for entry in self.history.get(module_path, {}).values()]
+        if same_test:
+            return sum(same_test) / len(same_test)
+
+        all_tests = [entry["duration"] for test in self.history.values()
+                     for entry in test.values()]
+        if all_tests:
+            return sum(all_tests) / len(all_tests)
+        return 1.0
+
+    def save(self) -> bool:
+        """
+        Writes the history to the disk. The file is replaced atomically so
+        that an interrupted run doesn't leave a truncated history.
+        Returns:
+            bool: True if the history was saved.
+        """
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as history_fd:
+                json.dump(self.history, history_fd, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return False
+        return True
@@ -0,0 +1,235 @@
+"""
+This component builds the index of the test modules used by the test list
+builder. The test flags, the test class name and the number of servers
+and clients a test needs are obtained by parsing the source of its module,
+without importing it, and are cached in a json file under the log
+directory keyed by the modification time and size of the module file.
+"""
+import os
+import ast
+import json
+import tokenize
+
+
+class TestIndex:
+    """
+    Static index of the test modules. Each entry holds the flags in the
+    leading comment of the module, i.e. the nature of the test and the
+    volume types, along with the name of the test class and the number of
+    servers and clients the test needs.
+    """
+
+    index_file = "test_index.json"
+    # Bumped when the parsing changes, so that the older entries are
+    # parsed again.
+    index_version = 2
+
+    def __init__(self, log_dir: str = None):
+        """
+        Loads the cached index under the log dir, if any.
+        Args:
+            log_dir (str): The base log directory of redant. If None, the
+                           index isn't persisted.
+        """
+        self.path = None
+        self.index = {}
+        self.modified = False
+        if log_dir is None:
+            return
+        self.path = f"{log_dir}/{self.index_file}"
+        try:
+            with open(self.path, 'r') as index_fd:
+                self.index = json.load(index_fd)
+        except (OSError, ValueError):
+            self.index = {}
+
+    @staticmethod
+    def _parse_flags(tc_path: str) -> str:
+        """
+        Reads the first comment of the module, which holds the test flags.
+        The module is tokenized only till that comment.
+        Args:
+            tc_path (str): The path of the test case.
+        Returns:
+            str: The comment without the leading '#' or an empty string if
+                 the module has no comments, as in the special tests.
+        """
+        with tokenize.open(tc_path) as tc_fd:
+            for token in tokenize.generate_tokens(tc_fd.readline):
+                if token.type == tokenize.COMMENT:
+                    return token.string[1:]
+        return ""
+
+    @staticmethod
+    def _parse_class_name(tree, tc_path: str) -> str:
+        """
+        Finds the test class defined in the module. In case the module
+        defines more than one class, the one derived from a parent test
+        class is picked.
+        Args:
+            tree (ast.Module): The parsed module.
+            tc_path (str): The path of the test case.
+        Returns:
+            str: Name of the test class.
+        """
+        classes = [node for node in tree.body
+                   if isinstance(node, ast.ClassDef)]
+        for node in classes:
+            for base in node.bases:
+                if (isinstance(base, ast.Name)
+                   and base.id.endswith("ParentTest")):
+                    return node.name
+        if not classes:
+            raise Exception(f"{tc_path} doesn't define a test class")
+        return classes[0].name
+
+    @staticmethod
+    def _int_value(node) -> int:
+        """
+        The value of a node holding a non negative integer literal, else
+        None.
+        """
+        if node is None:
+            return None
+        try:
+            value = ast.literal_eval(node)
+        except ValueError:
+            return None
+        if (isinstance(value, bool) or not isinstance(value, int)
+           or value < 0):
+            return None
+        return value
+
+    @classmethod
+    def _subscript_count(cls, node, parent) -> int:
+        """
+        The number of nodes a reference to a node list needs, if it is
+        subscripted by a non negative literal index or by a slice with a
+        literal upper bound, else None.
+        """
+        if not isinstance(parent, ast.Subscript) or parent.value is not node:
+            return None
+        index = parent.slice
+        # Older pythons wrap a plain index in an ast.Index.
+        if type(index).__name__ == "Index":
+            index = index.value
+        if isinstance(index, ast.Slice):
+            if index.step is not None:
+                return None
+            upper = cls._int_value(index.upper)
+            if index.lower is not None and cls._int_value(index.lower) is None:
+                return None
+            return upper
+        value = cls._int_value(index)
+        return None if value is None else value + 1
+
+    @classmethod
+    def _parse_node_counts(cls, tree) -> dict:
+        """
+        Finds the number of servers and clients a test needs, i.e. the
+        counts it asks for through check_hardware_requirements or the
+        highest literal index it takes into the server and client lists,
+        whichever is larger. A test which uses a list in any other way,
+        e.g. iterates it, takes its len, passes it on or takes an open
+        slice of it, or asks for a non literal count, needs all the nodes.
+        Args:
+            tree (ast.Module): The parsed module.
+        Returns:
+            dict: {"server_list": count, "client_list": count}, the count
+                  being None if all the nodes are needed.
+        """
+        counts = {"server_list": 0, "client_list": 0}
+        keywords = {"servers_count": "server_list",
+                    "clients_count": "client_list"}
+        lists = {"servers": "servers_count", "clients": "clients_count"}
+        parents = {}
+        # The lists handed to check_hardware_requirements along with a
+        # count are bounded by that count.
+        checked = set()
+        for node in ast.walk(tree):
+            for child in ast.iter_child_nodes(node):
+                parents[child] = node
+            if isinstance(node, ast.Call):
+                names = {keyword.arg for keyword in node.keywords}
+                checked.update(id(keyword.value) for keyword in node.keywords
+                               if lists.get(keyword.arg) in names)
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.keyword) and node.arg in keywords:
+                name = keywords[node.arg]
+                count = cls._int_value(node.value)
+            elif isinstance(node, (ast.Attribute, ast.Name)):
+                name = getattr(node, "attr", getattr(node, "id", None))
+                if name not in counts or id(node) in checked:
+                    continue
+                count = cls._subscript_count(node, parents.get(node))
+            else:
+                continue
+            if counts[name] is None:
+                continue
+            counts[name] = None if count is None else max(counts[name],
+                                                          count)
+        return counts
+
+    def get_module_info(self, tc_path: str) -> dict:
+        """
+        Gives the flags and the test class name of a test module, parsing
+        the module only if it has changed since it was indexed.
+        Args:
+            tc_path (str): The path of the test case.
+        Returns:
+            dict: For example,
+                  {
+                    "tcNature" : "disruptive",
+                    "volType" : ["rep", ...],
+                    "testClass" : "TestCase",
+                    "serverCount" : 4,
+                    "clientCount" : 2
+                  }
+                  The counts being None for a test needing all the nodes.
+        """
+        stat = os.stat(tc_path)
+        entry = self.index.get(tc_path)
+        if (entry is not None and entry['mtime'] == stat.st_mtime_ns
+           and entry['size'] == stat.st_size
+           and entry.get("version") == self.index_version):
+            return entry
+
+        flags = self._parse_flags(tc_path).split(';')
+        vol_types = flags[1].split(',') if len(flags) > 1 else ['']
+        if vol_types == ['']:
+            vol_types = ["Generic"]
+        with tokenize.open(tc_path) as tc_fd:
+            tree = ast.parse(tc_fd.read(), tc_path)
+        counts = self._parse_node_counts(tree)
+        entry = {
+            "version": self.index_version,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "tcNature": flags[0].strip(),
+            "volType": vol_types,
+            "testClass": self._parse_class_name(tree, tc_path),
+            "serverCount": counts["server_list"],
+            "clientCount": counts["client_list"]
+        }
+        self.index[tc_path] = entry
+        self.modified = True
+        return entry
+
+    def save(self) -> bool:
+        """
+        Writes the index to the disk if it has changed.
+        Returns:
+            bool: True if the index is up to date on the disk.
+        """
+        if self.path is None or not self.modified:
+            return True
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as index_fd:
+                json.dump(self.index, index_fd, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return False
+        self.modified = False
+        return True
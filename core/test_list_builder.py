@@ -8,11 +8,10 @@ to be executed in the current session.
 
 """
 import os
-import inspect
 import importlib
 import copy
 import sys
-from comment_parser.comment_parser import extract_comments
+from test_index import TestIndex
 
 
 valid_vol_types = ['rep', 'dist', 'arb', 'disp', 'dist-rep', 'dist-arb',
@@ -45,7 +44,8 @@ class TestListBuilder:
 
     @classmethod
     def create_test_dict(cls, path: str, excluded_tests: list,
-                         volume_types_config: dict, single_tc: bool = False):
+                         volume_types_config: dict, single_tc: bool = False,
+                         history=None, test_index=None):
         """
         This method creates a dict of TCs wrt the given directory
         path.
@@ -57,12 +57,20 @@ class TestListBuilder:
                                         config file
             single_tc (bool): If the user wants to run a single TC instead
                               of the complete suite.
+            history (TestHistory): Durations of the earlier test runs, used
+                                   for ordering the tests longest first.
+            test_index (TestIndex): Index of the test modules. The modules
+                                    are parsed afresh if not given.
         Returns:
         """
         def path_error_handler(exception_instance):
             raise FileNotFoundError
 
         global valid_vol_types
+        if test_index is None:
+            test_index = TestIndex()
+        cls.test_index = test_index
+
         # Obtaining list of paths to the TCs under given directory.
         if not single_tc:
             if path.endswith("/"):
@@ -88,9 +96,11 @@ class TestListBuilder:
             test_dict["modulePath"] = test_case_path
             test_dict["moduleName"] = test_case_path.split("/")[-1]
             test_dict["componentName"] = test_case_path.split("/")[-2]
-            test_dict["testClass"] = cls._get_test_class(test_case_path)
+            test_dict["testClass"] = test_flags["testClass"]
             test_dict["testType"] = test_case_path.split("/")[-3]
             test_dict["tcNature"] = test_flags["tcNature"]
+            test_dict["serverCount"] = test_flags["serverCount"]
+            test_dict["clientCount"] = test_flags["clientCount"]
             if test_flags["tcNature"] == "disruptive":
                 for vol_type in test_flags["volType"]:
                     if vol_type not in valid_vol_types:
@@ -114,6 +124,9 @@ class TestListBuilder:
                 raise Exception(f"Invalid test nature : "
                                 f" {test_flags['tcNature']}")
 
+        if history is not None:
+            cls._order_by_history(history)
+
         cls.spec_vol = []
         nd_tests_count = 0
         for (vol_t, listv) in cls.nd_category.items():
@@ -125,6 +138,23 @@ class TestListBuilder:
         if nd_tests_count > 0:
             cls._create_nd_special_tests()
 
+    @classmethod
+    def _order_by_history(cls, history):
+        """
+        Orders the disruptive test list and each of the non disruptive
+        volume type lists with the longest running tests first, as per the
+        durations of the earlier runs. Tests which haven't run yet are
+        estimated from the history as a whole. The sort is stable, hence
+        tests with the same estimate stay in the directory walk order.
+        Arg:
+            history (TestHistory)
+        """
+        cls.dtest_list.sort(key=lambda test: history.estimate(
+            test['modulePath'], test['volType']), reverse=True)
+        for (vol_type, test_list) in cls.nd_category.items():
+            test_list.sort(key=lambda test: history.estimate(
+                test['modulePath'], vol_type), reverse=True)
+
     @classmethod
     def get_spec_vol_types(cls):
         """
@@ -148,7 +178,8 @@ class TestListBuilder:
             special_nd = {}
             special_nd['modulePath'] = path
             special_nd['moduleName'] = path.split("/")[-1]
-            special_nd['testClass'] = cls._get_test_class(path)
+            special_nd['testClass'] = \
+                cls.test_index.get_module_info(path)["testClass"]
             special_nd['tcNature'] = 's'
             if cls.test_nd_volc_dict == {}:
                 cls.test_nd_volc_dict = special_nd
@@ -212,39 +243,42 @@ class TestListBuilder:
     @classmethod
     def _get_test_module_info(cls, tc_path: str) -> dict:
         """
-        This method gets the volume types for which the TC is to be run
-        and the nature of a TC
+        This method gets the volume types for which the TC is to be run,
+        the nature of a TC, the name of the test class and the number of
+        servers and clients the TC needs from the test index, without
+        importing the module.
         Args:
            tc_path (str): The path of the test case.
 
         Returns:
            test_flags (dict): This dictionary contains the volume types
-                              for which the TC is to be run and the nature
-                              of the TC, i.e. Disruptive / Non-Disruptive.
+                              for which the TC is to be run, the nature
+                              of the TC, i.e. Disruptive / Non-Disruptive,
+                              the test class name and the node counts.
            For example,
                       {
                         "tcNature" : "disruptive",
-                        "volType" : [replicated, ...]
+                        "volType" : [replicated, ...],
+                        "testClass" : "TestCase",
+                        "serverCount" : 4,
+                        "clientCount" : 2
                       }
         """
-        flags = str(extract_comments(tc_path, mime="text/x-python")[0])
-        tc_flags = {}
-        tc_flags["tcNature"] = flags.split(';')[0].strip()
-        tc_flags["volType"] = flags.split(';')[1].split(',')
-        if tc_flags["volType"] == ['']:
-            tc_flags["volType"] = ["Generic"]
-        return tc_flags
+        return cls.test_index.get_module_info(tc_path)
 
     @classmethod
-    def _get_test_class(cls, tc_path: str):
+    def load_test_class(cls, test_dict: dict):
         """
-        Method to import the module and inspect the class to be stored
-        for creating objects later.
+        Method to import the test module and get the test class, to be
+        used for creating the test object. The import is deferred till the
+        test is run, so that only the modules of the tests which are run,
+        are imported and that too in the process running them.
+        Arg:
+            test_dict (dict)
+        Returns:
+            class: The test class.
         """
-        tc_module_str = tc_path.replace("/", ".")[:-3]
+        tc_module_str = test_dict["modulePath"].replace("/", ".")[:-3]
         sys.path.insert(1, ".")
         tc_module = importlib.import_module(tc_module_str)
-        tc_class_str = inspect.getmembers(tc_module,
-                                          inspect.isclass)[1][0]
-        tc_class = getattr(tc_module, tc_class_str)
-        return tc_class
+        return getattr(tc_module, test_dict["testClass"])
@@ -3,7 +3,9 @@ The test runner is responsible for handling the list of TCs
 to be run and invoking them.
 """
 import time
-from multiprocessing import Process, Queue
+from queue import Queue
+from multiprocessing import Process, Pipe
+from multiprocessing.connection import wait
 from halo import Halo
 from runner_thread import RunnerThread
 
@@ -17,7 +19,8 @@ class TestRunner:
 
     @classmethod
     def init(cls, TestListBuilder, param_obj, fmwk_obj, base_log_path: str,
-             log_level: str, multiprocess_count: int, spec_test: bool):
+             log_level: str, multiprocess_count: int, spec_test: bool,
+             history, dt_concur_count: int = 1):
         """
         Test runner intialization.
         Args:
@@ -27,9 +30,15 @@ class TestRunner:
             log_level (str)
             multiprocess_count (int)
             spec_test (bool) True if only one test is run.
+            history (TestHistory) Durations of the earlier test runs.
+            dt_concur_count (int) Number of disruptive tests which can run
+                                  concurrently on disjoint sets of servers.
+                                  Default is 1, i.e. a serial run.
         """
         cls.param_obj = param_obj
+        cls.fmwk_obj = fmwk_obj
         cls.concur_count = multiprocess_count
+        cls.dt_concur_count = dt_concur_count
         cls.base_log_path = base_log_path
         cls.log_level = log_level
         cls.threadList = []
@@ -37,34 +46,27 @@ class TestRunner:
         cls.get_ndtest_fn = TestListBuilder.get_ndtest_list
         cls.get_snd_test_fn = TestListBuilder.get_special_tests_dict
         cls.get_spec_vol_types_fn = TestListBuilder.get_spec_vol_types
+        cls.load_test_class_fn = TestListBuilder.load_test_class
         cls.nd_tests_count = TestListBuilder.get_nd_tests_count()
         cls.logger = fmwk_obj.get_framework_logger()
-        cls.logger.info("Creating thread queues for the tests")
-        cls._prepare_thread_queues(spec_test)
+        cls.history = history
+        cls.logger.info("Creating job lists for the tests")
+        cls._prepare_nd_jobs(spec_test)
 
     @classmethod
-    def _prepare_thread_queues(cls, spec_test: bool):
+    def _prepare_nd_jobs(cls, spec_test: bool):
         """
-        This method creates the requisite queues for the test run.
+        This method creates the jobs for the non disruptive test run. A job
+        is either a volume type lane, i.e. the list of tests which share
+        the volume of that type, sandwiched between the volume create and
+        destroy tests, or a single Generic test.
         Arg:
             spec_test (bool) True if only one test is to be run.
         """
         cls.job_result_queue = Queue()
-        cls.r_nd_jobq = Queue()
-        cls.dt_nd_jobq = Queue()
-        cls.a_nd_jobq = Queue()
-        cls.ds_nd_jobq = Queue()
-        cls.dtr_nd_jobq = Queue()
-        cls.dta_nd_jobq = Queue()
-        cls.dtds_nd_jobq = Queue()
-        cls.gen_nd_jobq = Queue()
-        cls.nd_vol_queue = Queue()
+        cls.nd_jobs = []
         vol_types = ['rep', 'dist', 'disp', 'arb', 'dist-rep', 'dist-disp',
                      'dist-arb']
-        cls.queue_map = {'arb': cls.a_nd_jobq, 'disp': cls.ds_nd_jobq,
-                         'dist-rep': cls.dtr_nd_jobq, 'rep': cls.r_nd_jobq,
-                         'dist-arb': cls.dta_nd_jobq, 'dist': cls.dt_nd_jobq,
-                         'dist-disp': cls.dtds_nd_jobq}
 
         # Get special tests dict
         special_test_dict = cls.get_snd_test_fn()
@@ -79,52 +81,374 @@ class TestRunner:
                     vol_types = spec_vols
 
             for vol_type in vol_types:
-                cls.queue_map[vol_type].put(special_test_dict[0])
+                lane = ([special_test_dict[0]] + cls.get_ndtest_fn(vol_type)
+                        + [special_test_dict[1]])
+                cls.nd_jobs.append({"volType": vol_type, "tests": lane})
 
-            for vol_type in vol_types:
-                cls.nd_vol_queue.put(vol_type)
-                for test in cls.get_ndtest_fn(vol_type):
-                    cls.queue_map[vol_type].put(test)
+        # Every Generic test is a job on its own.
+        for test in cls.get_ndtest_fn('Generic'):
+            cls.nd_jobs.append({"volType": "Generic", "tests": [test]})
 
-            for vol_type in vol_types:
-                cls.queue_map[vol_type].put(special_test_dict[1])
+    @classmethod
+    def _estimate_test_time(cls, test_dict: dict, vol_type: str) -> float:
+        """
+        Estimates the run time of a test for a volume type from the
+        durations recorded in the test history.
+        Args:
+            test_dict (dict)
+            vol_type (str)
+        Returns:
+            float: The estimated time in seconds.
+        """
+        return cls.history.estimate(test_dict["modulePath"], vol_type)
 
-        # Populating the generic queue.
-        for test in cls.get_ndtest_fn('Generic'):
-            cls.gen_nd_jobq.put(test)
+    @classmethod
+    def _estimate_job_time(cls, job: dict) -> float:
+        """
+        Estimates the run time of a non disruptive job.
+        Arg:
+            job (dict)
+        Returns:
+            float: The estimated time in seconds.
+        """
+        return sum([cls._estimate_test_time(test, job['volType'])
+                    for test in job['tests']])
+
+    @classmethod
+    def _record_result(cls, result_value: dict):
+        """
+        Stores the result of a test run and notes its duration in the test
+        history for the estimation of the pending jobs and of the future
+        runs.
+        Arg:
+            result_value (dict)
+        """
+        for test_stats in result_value.values():
+            cls.history.record(test_stats['modulePath'],
+                               test_stats['volType'],
+                               test_stats['timeTaken'],
+                               test_stats['testResult'])
+        if not cls.history.save():
+            cls.logger.error("Couldn't save the test history.")
+        cls.job_result_queue.put(result_value)
 
     @classmethod
-    def _nd_worker_process(cls, vol_queue, queue_map, gen_nd_jobq, ):
+    def _nd_worker_process(cls, conn):
         """
-        Worker process has two set of queue hierarchy to deal with.
-        It picks up a volume type from the volume queue and then
-        starts picking off jobs specific to that particular volume. Once, the
-        jobs related to this volume ends, it picks up a new volume to work
-        with. Once a worker find the vol queue as empty, it goes ahead and
-        starts working with Generic cases.
+        Worker process runs the jobs sent by the scheduler over its end of
+        the pipe. The result of each test is sent back as soon as it ends
+        and a 'done' message marks the end of the job, a test whose run
+        fails being reported as a failure. A None job is the sentinel for
+        the worker to exit.
         Args:
-            vol_queue (Queue) : Queue containing volume types of gluster.
-            queue_map (Dict) : A dictionary mapping volume types to sub queues
-                               for given volume type.
-            gen_nd_jobq (Queue) : Queue containing jobs for Generic
-                                  non disruptive cases.
-        """
-        while not vol_queue.empty():
-            job_vol = vol_queue.get()
-            cls.logger.info(f"Worker picked up job_volume {job_vol}")
-            job_queue = queue_map[job_vol]
-            while not job_queue.empty():
-                job_data = job_queue.get()
+            conn (Connection) : Worker's end of the pipe to the scheduler.
+        """
+        while True:
+            job_index = conn.recv()
+            if job_index is None:
+                break
+            job = cls.nd_jobs[job_index]
+            cls.logger.info(f"Worker picked up job_volume {job['volType']}")
+            for job_data in job['tests']:
                 cls.logger.info(f"Worker picked up job {job_data}")
-                job_data['volType'] = job_vol
-                cls._run_test(job_data)
+                job_data['volType'] = job['volType']
+                start = time.time()
+                try:
+                    result_value = cls._run_test(job_data)
+                except Exception as error:
+                    cls.logger.error(f"Run of {job_data} failed : {error}")
+                    result_value = cls._failed_result(job_data,
+                                                      time.time() - start)
+                conn.send(("result", result_value))
+            conn.send(("done", job_index))
+        conn.close()
 
-        if gen_nd_jobq.qsize() != 0:
-            while not gen_nd_jobq.empty():
-                job_data = gen_nd_jobq.get()
-                cls.logger.info(f"Worker picked up job {job_data}")
-                job_data['volType'] = "Generic"
-                cls._run_test(job_data)
+    @classmethod
+    def _spawn_nd_worker(cls) -> tuple:
+        """
+        Starts a non disruptive worker process.
+        Returns:
+            tuple: (scheduler's end of the pipe, worker process)
+        """
+        parent_conn, child_conn = Pipe()
+        proc = Process(target=cls._nd_worker_process, args=(child_conn,))
+        proc.start()
+        child_conn.close()
+        return (parent_conn, proc)
+
+    @classmethod
+    def _run_nd_jobs(cls):
+        """
+        Scheduler for the non disruptive jobs. Every idle worker is handed
+        the pending job with the longest estimated run time, the estimates
+        being refined with the durations of the tests which have ended.
+        The scheduler blocks on the worker pipes and process sentinels,
+        hence it reacts to a result, a job completion or a worker death as
+        soon as it happens. The tests of a job left unrun by the death of
+        its worker are recorded as failures.
+        """
+        pending = list(range(len(cls.nd_jobs)))
+        idle = []
+        busy = {}
+        for _ in range(min(cls.concur_count, len(pending))):
+            idle.append(cls._spawn_nd_worker())
+
+        while pending or busy:
+            while idle and pending:
+                job_index = max(pending, key=lambda index:
+                                cls._estimate_job_time(cls.nd_jobs[index]))
+                pending.remove(job_index)
+                (conn, proc) = idle.pop()
+                try:
+                    conn.send(job_index)
+                except OSError:
+                    cls.logger.error(f"Worker {proc.pid} is gone.")
+                    pending.append(job_index)
+                    conn.close()
+                    proc.join()
+                    idle.append(cls._spawn_nd_worker())
+                    continue
+                busy[conn] = (proc, job_index, 0)
+
+            if not busy:
+                cls.logger.error("No worker left to run the pending jobs "
+                                 f"{[cls.nd_jobs[i] for i in pending]}")
+                break
+
+            sentinels = {proc.sentinel: conn
+                         for (conn, (proc, _, _)) in busy.items()}
+            for ready in wait(list(busy.keys()) + list(sentinels.keys())):
+                conn = sentinels.get(ready, ready)
+                if conn not in busy:
+                    continue
+                (proc, job_index, reported) = busy[conn]
+                try:
+                    while conn.poll():
+                        (msg_type, value) = conn.recv()
+                        if msg_type == "result":
+                            cls._record_result(value)
+                            reported += 1
+                            busy[conn] = (proc, job_index, reported)
+                        else:
+                            del busy[conn]
+                            idle.append((conn, proc))
+                            break
+                except (EOFError, OSError):
+                    job = cls.nd_jobs[job_index]
+                    cls.logger.error(f"Worker {proc.pid} died while running"
+                                     f" {job}")
+                    for test in job['tests'][reported:]:
+                        cls._record_result(cls._failed_result(
+                            dict(test, volType=job['volType'])))
+                    del busy[conn]
+                    conn.close()
+                    proc.join()
+                    if pending:
+                        idle.append(cls._spawn_nd_worker())
+
+        for (conn, proc) in idle:
+            conn.send(None)
+            conn.close()
+            proc.join()
+
+    @classmethod
+    def _log_path(cls, test_dict: dict) -> str:
+        """
+        Path of the log of a test run.
+        Arg:
+            test_dict (dict)
+        Returns:
+            str
+        """
+        return (f"{cls.base_log_path+test_dict['modulePath'][5:-3]}/"
+                f"{test_dict['volType']}/{test_dict['moduleName'][:-3]}.log")
+
+    @classmethod
+    def _failed_result(cls, test_dict: dict, time_taken: float = 0) -> dict:
+        """
+        Result of a test whose run couldn't report one, e.g. as its worker
+        failed or died.
+        Args:
+            test_dict (dict)
+            time_taken (float)
+        Returns:
+            dict: The test name mapped to its run stats.
+        """
+        return {test_dict["moduleName"][:-3]: {
+            'timeTaken': time_taken,
+            'volType': test_dict['volType'],
+            'skipReason': "NA",
+            'testResult': "FAIL",
+            'tcNature': test_dict['tcNature'],
+            'modulePath': test_dict['modulePath'],
+            'component': cls._log_path(test_dict).split('/')[-4]}}
+
+    @classmethod
+    def _servers_required(cls, test: dict) -> int:
+        """
+        Number of servers a disruptive test is given when run on a
+        partition. It is the number of bricks of the volume type or the
+        number of servers the test uses, whichever is larger, capped by
+        the servers at hand. Generic tests and the tests whose use of the
+        servers couldn't be bounded get all the servers, hence they are
+        run serially.
+        Arg:
+            test (dict)
+        Returns:
+            int
+        """
+        total = len(cls.param_obj.get_server_ip_list())
+        if test['volType'] == "Generic" or test.get('serverCount') is None:
+            return total
+        conf_hash = cls.param_obj.get_volume_types()[test['volType']]
+        if "replica_count" in conf_hash:
+            brick_count = conf_hash["replica_count"]
+            if "arbiter_count" in conf_hash:
+                brick_count += conf_hash["arbiter_count"]
+            if "dist_count" in conf_hash:
+                brick_count *= conf_hash["dist_count"]
+        elif "dist_count" in conf_hash:
+            brick_count = conf_hash["dist_count"]
+            if "disperse_count" in conf_hash:
+                brick_count *= conf_hash["disperse_count"]
+        else:
+            brick_count = conf_hash["disperse_count"]
+        return min(max(brick_count, test['serverCount']), total)
+
+    @classmethod
+    def _clients_required(cls, test: dict) -> int:
+        """
+        Number of clients a disruptive test is given when run on a
+        partition, i.e. the number of clients the test uses, at least one,
+        capped by the clients at hand. A test whose use of the clients
+        couldn't be bounded gets all the clients.
+        Arg:
+            test (dict)
+        Returns:
+            int
+        """
+        total = len(cls.param_obj.get_client_ip_list())
+        if test.get('clientCount') is None:
+            return total
+        return min(max(test['clientCount'], 1), total)
+
+    @classmethod
+    def _dt_worker_process(cls, conn, test: dict, servers: list,
+                           clients: list):
+        """
+        Worker process running a disruptive test on a partition of the
+        servers and clients. A result is always sent back, a test whose
+        run fails being reported as a failure. Once the test ends, the
+        partition is hard terminated so that its servers are left out of
+        any trusted pool and can be handed to the next test.
+        Args:
+            conn (Connection) : Worker's end of the pipe to the scheduler.
+            test (dict) : The test to be run.
+            servers (list) : Servers of the partition.
+            clients (list) : Clients of the partition.
+        """
+        param_obj = cls.param_obj.get_partition(servers, clients)
+        start = time.time()
+        try:
+            cls.env_obj.init_ds()
+            result_value = cls._run_test(test, param_obj)
+        except Exception as error:
+            cls.logger.error(f"Run of {test} failed : {error}")
+            result_value = cls._failed_result(test, time.time() - start)
+        conn.send(("result", result_value))
+        try:
+            cls.fmwk_obj.redant.hard_terminate(servers, clients,
+                                               param_obj.get_brick_roots())
+        except Exception as error:
+            cls.logger.error(f"Cleanup of the partition {servers} failed :"
+                             f" {error}")
+        conn.close()
+
+    @classmethod
+    def _run_partitioned_dtests(cls, dtests: list) -> list:
+        """
+        Scheduler for running the disruptive tests concurrently. Each test
+        is handed a partition of the servers and of the clients sized by
+        its volume type and by the nodes it uses, none of which is used by
+        any other running test. The pending test with the longest
+        estimated run time which fits in the free nodes is started first.
+        Before the run, the trusted pool is broken so that every partition
+        can form its own pool.
+        Arg:
+            dtests (list) : Disruptive tests needing only a part of the
+                            servers.
+        Returns:
+            list: Tests which are to be run again on all the servers as
+                  they were skipped on a partition.
+        """
+        free_servers = cls.param_obj.get_server_ip_list()
+        free_clients = cls.param_obj.get_client_ip_list()
+        total = len(free_servers)
+        cls.fmwk_obj.redant.delete_cluster(free_servers)
+
+        pending = list(dtests)
+        running = {}
+        rerun_tests = []
+        while pending or running:
+            while pending and len(running) < cls.dt_concur_count:
+                fitting = [test for test in pending
+                           if (cls._servers_required(test)
+                               <= len(free_servers)
+                               and cls._clients_required(test)
+                               <= len(free_clients))]
+                if not fitting:
+                    break
+                test = max(fitting, key=lambda test: cls._estimate_test_time(
+                    test, test['volType']))
+                pending.remove(test)
+                server_count = cls._servers_required(test)
+                client_count = cls._clients_required(test)
+                servers = free_servers[:server_count]
+                clients = free_clients[:client_count]
+                del free_servers[:server_count]
+                del free_clients[:client_count]
+
+                parent_conn, child_conn = Pipe()
+                proc = Process(target=cls._dt_worker_process,
+                               args=(child_conn, test, servers, clients))
+                proc.start()
+                child_conn.close()
+                running[parent_conn] = (proc, test, servers, clients)
+
+            if not running:
+                cls.logger.error("No partition can fit the pending tests "
+                                 f"{pending}")
+                rerun_tests.extend(pending)
+                break
+
+            sentinels = {proc.sentinel: conn
+                         for (conn, (proc, _, _, _)) in running.items()}
+            for ready in wait(list(running.keys()) + list(sentinels.keys())):
+                conn = sentinels.get(ready, ready)
+                if conn not in running:
+                    continue
+                (proc, test, servers, clients) = running[conn]
+                try:
+                    (_, result_value) = conn.recv()
+                    test_stats = list(result_value.values())[0]
+                    if (test_stats['testResult'] == "SKIP"
+                       and len(servers) < total):
+                        cls.logger.info(f"{test} skipped on the partition "
+                                        f"{servers}, it will be run on all"
+                                        " the servers.")
+                        rerun_tests.append(test)
+                    else:
+                        cls._record_result(result_value)
+                except (EOFError, OSError):
+                    cls.logger.error(f"Worker {proc.pid} died while running"
+                                     f" {test}")
+                    cls._record_result(cls._failed_result(test))
+                conn.close()
+                proc.join()
+                del running[conn]
+                free_servers.extend(servers)
+                free_clients.extend(clients)
+        return rerun_tests
 
     @classmethod
     def run_tests(cls, env_obj):
@@ -133,69 +457,63 @@ class TestRunner:
         1. Stage 1 is for non disruptive test cases which can run in the
            concurrent flow and can use a pre-existing volume or don't
            even need a pre-existing volume ( psst. Generic cases ).
-        3. Stage 2 is the run of Disruptive test cases.
+        3. Stage 2 is the run of Disruptive test cases. When the
+           disruptive concurrency is more than 1, the tests which don't need
+           all the servers are run concurrently on disjoint partitions of
+           the servers, the rest being run serially later.
         """
         cls.env_obj = env_obj
         # Stage 1
-        jobs = []
         if bool(cls.nd_tests_count):
             cls.logger.info("Starting Non Disruptive test case runs.")
-            for _ in range(cls.concur_count):
-                proc = Process(target=cls._nd_worker_process,
-                               args=(cls.nd_vol_queue, cls.queue_map,
-                                     cls.gen_nd_jobq,))
-                jobs.append(proc)
-                proc.start()
-
-            # TODO replace sleep with a signalling and lock.
-            while len(jobs) > 0:
-                jobs = [job for job in jobs if job.is_alive()]
-                time.sleep(1)
-
-            for _ in range(cls.concur_count):
-                proc.join()
+            cls._run_nd_jobs()
 
         # Stage 2
         if cls.get_dtest_fn():
             cls.logger.info("Starting Disruptive test case runs.")
-            for test in cls.get_dtest_fn():
-                cls._run_test(test)
-
-        # Because of the infinitesimal delay in value being reflected in Queue
-        # it was found that sometimes the Queue which was empty had been given
-        # some value, it still showed itself as empty.
-        # TODO: Handle it without sleep.
-        itr = 0
-        while itr < 5:
-            if cls.job_result_queue.empty():
-                time.sleep(1)
-            else:
-                break
-            itr += 1
+            serial_dtests = cls.get_dtest_fn()
+            if cls.dt_concur_count > 1:
+                total = len(cls.param_obj.get_server_ip_list())
+                partial_dtests = [test for test in serial_dtests
+                                  if cls._servers_required(test) < total]
+                serial_dtests = [test for test in serial_dtests
+                                 if test not in partial_dtests]
+                if partial_dtests:
+                    serial_dtests += \
+                        cls._run_partitioned_dtests(partial_dtests)
+            for test in serial_dtests:
+                cls._record_result(cls._run_test(test))
 
         cls.logger.info("Finished test executions.")
         return cls.job_result_queue
 
     @classmethod
-    def _run_test(cls, test_dict: dict):
+    def _run_test(cls, test_dict: dict, param_obj=None) -> dict:
         """
         A generic method handling the run of both disruptive and non
         disruptive tests.
+        Args:
+            test_dict (dict)
+            param_obj (object): Params to run the test with, by default
+                                the params of all the servers and clients.
+        Returns:
+            dict: The test name mapped to its run stats.
         """
 
         spinner = Halo(spinner='dots', text_color='yellow')
-        tc_class = test_dict["testClass"]
+        tc_class = cls.load_test_class_fn(test_dict)
         volume_type = test_dict["volType"]
         mname = test_dict["moduleName"][:-3]
 
-        tc_log_path = (f"{cls.base_log_path+test_dict['modulePath'][5:-3]}/"
-                       f"{volume_type}/{mname}.log")
+        tc_log_path = cls._log_path(test_dict)
 
         # to calculate time spent to execute the test
         start = time.time()
 
         spinner.succeed(text=f"Running test case : {mname}-{volume_type}")
-        runner_thread_obj = RunnerThread(tc_class, cls.param_obj, volume_type,
+        if param_obj is None:
+            param_obj = cls.param_obj
+        runner_thread_obj = RunnerThread(tc_class, param_obj, volume_type,
                                          mname, cls.logger, cls.env_obj,
                                          tc_log_path, cls.log_level)
 
@@ -203,6 +521,7 @@ class TestRunner:
 
         test_stats['timeTaken'] = time.time() - start
         test_stats['tcNature'] = test_dict['tcNature']
+        test_stats['modulePath'] = test_dict['modulePath']
         spinner.clear()
         result_text = f"{test_dict['moduleName'][:-3]}-{test_dict['volType']}"
         if test_stats['testResult'][0] is True:
@@ -223,4 +542,4 @@ class TestRunner:
         test_stats['component'] = tc_log_path.split('/')[-4]
 
         result_value = {test_dict["moduleName"][:-3]: test_stats}
-        cls.job_result_queue.put(result_value)
+        return result_value
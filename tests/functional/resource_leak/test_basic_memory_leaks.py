@@ -63,10 +63,9 @@ class TestBasicMemoryleak(DParentTest):
                                                            self.mounts):
                     raise Exception("Failed to wait for I/O to complete")
 
-            # Remove any csv files, generated from memory_logger script
-            cmd = "rm -f *.csv"
-            for node in [self.server_list + self.client_list]:
-                self.redant.execute_abstract_op_node(cmd, node)
+            # Remove the samples, generated by the proc_sampler script
+            self.redant.remove_resource_samples(
+                self.server_list + self.client_list, self.test_id)
 
         except Exception as error:
             tb = traceback.format_exc()
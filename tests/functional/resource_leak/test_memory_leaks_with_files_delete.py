@@ -35,10 +35,9 @@ class TestCase(DParentTest):
                     raise Exception("ERROR: Failed to stop monitoring "
                                     "processes")
 
-            # Remove any csv files, generated from memory_logger script
-            cmd = "rm -f *.csv"
-            for node in [self.server_list + self.client_list]:
-                self.redant.execute_abstract_op_node(cmd, node)
+            # Remove the samples, generated by the proc_sampler script
+            self.redant.remove_resource_samples(
+                self.server_list + self.client_list, self.test_id)
 
         except Exception as error:
             tb = traceback.format_exc()
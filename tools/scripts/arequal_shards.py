@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Sharded arequal checksum of a tree on a mount or a brick. The tree is
+split into its top level entries, each top level directory being a
+shard of its own and the entries directly under the root forming the
+'.' shard. The shards are checksummed by arequal-checksum in parallel
+and printed as one json line per shard, e.g.
+
+    {"shard": "dir1", "signature": "9e1f...", "rc": 0,
+     "output": ["Entry counts", "Regular files   : 120", ...]}
+
+The signature of a shard is a digest of the path, the mtime, the ctime,
+the size and the mode of all of its entries, taken by a stat walk which
+is much cheaper than the checksum. A shard whose signature is given by
+--known, or by the json object {shard: signature} read by --known-from,
+is left unchanged since then, hence it isn't checksummed again and is
+printed with "cached": true instead of an output. As a tree can hold
+thousands of shards, the latter, which reads the stdin given '-', keeps
+the signatures off the command line and its ARG_MAX limit.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from multiprocessing.pool import ThreadPool
+
+DEFAULT_IGNORE = (".glusterfs", ".landfill", ".trashcan")
+ANON_INODE_PREFIX = ".glusterfs-anonymous-inode"
+
+
+def _is_ignored(name, ignore):
+    """
+    Tells whether an entry is left out of the checksums.
+    """
+    return name in ignore or name.startswith(ANON_INODE_PREFIX)
+
+
+def _stat_line(path, rel_path):
+    """
+    The line of an entry in the signature of its shard.
+    """
+    lstat = os.lstat(path)
+    return ("%s\0%d\0%d\0%d\0%o\n" % (rel_path, lstat.st_mtime_ns,
+                                      lstat.st_ctime_ns, lstat.st_size,
+                                      lstat.st_mode)).encode(
+                                          "utf-8", "surrogateescape")
+
+
+def shard_signature(root, shard, ignore):
+    """
+    The signature of a shard, or None if it can't be walked.
+    """
+    digest = hashlib.md5()
+    try:
+        if shard == ".":
+            digest.update(_stat_line(root, "."))
+            for name in sorted(os.listdir(root)):
+                path = os.path.join(root, name)
+                if not (_is_ignored(name, ignore)
+                        or (os.path.isdir(path)
+                            and not os.path.islink(path))):
+                    digest.update(_stat_line(path, name))
+            return digest.hexdigest()
+
+        top = os.path.join(root, shard)
+        digest.update(_stat_line(top, shard))
+        for (dirpath, dirs, files) in os.walk(top):
+            dirs[:] = sorted(name for name in dirs
+                             if not _is_ignored(name, ignore))
+            for name in dirs + sorted(files):
+                path = os.path.join(dirpath, name)
+                digest.update(_stat_line(path, os.path.relpath(path, root)))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def list_shards(root, ignore):
+    """
+    The shards of the tree, i.e. '.' and its top level directories.
+    """
+    shards = ["."]
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if (not _is_ignored(name, ignore) and os.path.isdir(path)
+                and not os.path.islink(path)):
+            shards.append(name)
+    return shards
+
+
+def checksum_shard(root, shard, ignore):
+    """
+    Runs arequal-checksum over a shard. The '.' shard is the root with
+    all the top level directories left out.
+    """
+    path = root if shard == "." else os.path.join(root, shard)
+    names = set(ignore)
+    if shard == ".":
+        names.update(name for name in os.listdir(root)
+                     if os.path.isdir(os.path.join(root, name))
+                     and not os.path.islink(os.path.join(root, name)))
+    cmd = ["arequal-checksum", "-p", path]
+    for name in sorted(names):
+        cmd += ["-i", name]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE)
+    return (proc.returncode,
+            proc.stdout.decode("utf-8", "replace").splitlines(),
+            proc.stderr.decode("utf-8", "replace"))
+
+
+def read_known(known_from):
+    """
+    Reads the signatures of the shards already checksummed, a json object
+    mapping a shard to its signature, from a file or from the stdin if
+    '-'.
+    """
+    if known_from == "-":
+        known = json.load(sys.stdin)
+    else:
+        with open(known_from) as known_fd:
+            known = json.load(known_fd)
+    if not isinstance(known, dict):
+        raise ValueError("expected a json object")
+    return known
+
+
+def main():
+    """
+    Main function of the sharded checksum.
+    """
+    parser = argparse.ArgumentParser(
+        description="Print the arequal checksum of every top level shard "
+                    "of a tree as json lines")
+    parser.add_argument(
+        "root", metavar="ROOT", help="Root of the tree to checksum")
+    parser.add_argument(
+        "-i", "--ignore", action="append", dest="ignore", metavar="NAME",
+        help="Name of the directories left out of the checksums. Can be "
+             "repeated (Default:%s and the anonymous inode dirs)"
+             % ",".join(DEFAULT_IGNORE))
+    parser.add_argument(
+        "-k", "--known", action="append", dest="known", default=[],
+        metavar="SHARD=SIGNATURE", help="Signature of a shard already "
+                                        "checksummed. Can be repeated")
+    parser.add_argument(
+        "--known-from", dest="known_from", metavar="FILE",
+        help="File holding the signatures of the shards already "
+             "checksummed as a json object {shard: signature}, or '-' "
+             "for the stdin")
+    parser.add_argument(
+        "-P", "--parallel", type=int, dest="parallel",
+        default=os.cpu_count() or 1,
+        help="Number of shards checksummed in parallel (Default:number of "
+             "cores)")
+    args = parser.parse_args()
+
+    root = os.path.normpath(args.root)
+    if not os.path.isdir(root):
+        sys.stderr.write("Directory %s doesn't exist\n" % root)
+        return 2
+    ignore = set(args.ignore or DEFAULT_IGNORE)
+    known = dict(entry.rsplit("=", 1) for entry in args.known)
+    if args.known_from is not None:
+        try:
+            known.update(read_known(args.known_from))
+        except (IOError, OSError, ValueError) as err:
+            sys.stderr.write("Unable to read the known signatures : %s\n"
+                             % err)
+            return 2
+    shards = list_shards(root, ignore)
+
+    def _process(shard):
+        record = {"shard": shard,
+                  "signature": shard_signature(root, shard, ignore)}
+        if (record["signature"] is not None
+                and known.get(shard) == record["signature"]):
+            record["cached"] = True
+            return record
+        (record["rc"], record["output"], error) = checksum_shard(
+            root, shard, ignore)
+        if record["rc"]:
+            record["error"] = error
+        return record
+
+    pool = ThreadPool(max(args.parallel, 1))
+    try:
+        for record in pool.imap_unordered(_process, shards):
+            sys.stdout.write(json.dumps(record) + "\n")
+            sys.stdout.flush()
+    finally:
+        pool.close()
+        pool.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,15 +18,16 @@ from __future__ import print_function
 import ctypes
 import sys
 
-filename = sys.argv[1]
 glusterfs = ctypes.cdll.LoadLibrary("libglusterfs.so.0")
 
-# In case of python3 encode string to ascii
-if sys.version_info.major == 3:
-    computed_hash = ctypes.c_uint32(glusterfs.gf_dm_hashfn(
-        filename.encode('ascii'), len(filename)))
-else:
-    computed_hash = ctypes.c_uint32(glusterfs.gf_dm_hashfn(
-        filename, len(filename)))
+# One hash is printed per line for each of the given names
+for filename in sys.argv[1:]:
+    # In case of python3 encode string to ascii
+    if sys.version_info.major == 3:
+        computed_hash = ctypes.c_uint32(glusterfs.gf_dm_hashfn(
+            filename.encode('ascii'), len(filename)))
+    else:
+        computed_hash = ctypes.c_uint32(glusterfs.gf_dm_hashfn(
+            filename, len(filename)))
 
-print(computed_hash.value)
+    print(computed_hash.value)
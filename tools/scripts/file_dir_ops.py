@@ -23,15 +23,19 @@ from __future__ import print_function
 import argparse
 import contextlib
 import datetime
-from multiprocessing import Process
+import hashlib
+import json
+from multiprocessing import Process, Value
 from multiprocessing.pool import ThreadPool
 import os
 import platform
 import random
 import shutil
+import stat as stat_module
 import string
 import subprocess
 import sys
+import time
 import pkg_resources
 
 required = {'numpy', 'sh'}
@@ -46,6 +50,8 @@ if missing:
 import numpy as np
 from sh import rsync as sh_rsync
 
+from stat_record import path_stat
+
 if platform.system() == "Windows":
     path_sep = "\\"
 elif platform.system() == "Linux":
@@ -126,7 +132,8 @@ def create_dir(dir_path):
 
 def create_dirs(dir_path, depth, num_of_dirs, num_of_files=0,
                 fixed_file_size=None, base_file_name='testfile',
-                file_types='txt'):
+                file_types='txt', size_dist=None, fsync='none',
+                workers=None, stats=None, seed=None, root=None):
     """Recursively creates dirs under the dir_path with specified depth
         and num_of_dirs in each level
 
@@ -142,13 +149,21 @@ def create_dirs(dir_path, depth, num_of_dirs, num_of_files=0,
             Defaults to None.
         base_file_name (str): base name of the file to be created.
         file_types (str): file types to be created.
+        size_dist (str): distribution of the file sizes, see _file_sizes.
+        fsync (str): fsync policy of the files, see _create_files.
+        workers (int): number of files written in parallel.
+        stats (dict): files and bytes written, updated in place.
+        seed (int): seed of the content of the files, see _create_files.
+        root (str): root of the tree the paths of the seeded files are
+            taken relative to.
     """
     if not os.path.exists(dir_path):
         try:
             os.makedirs(dir_path)
             if num_of_files != 0:
                 _create_files(dir_path, num_of_files, fixed_file_size,
-                              base_file_name, file_types)
+                              base_file_name, file_types, size_dist, fsync,
+                              workers, stats, seed, root)
         except (OSError, IOError) as e:
             if 'File exists' not in e.strerror:
                 print("Unable to create dir '%s' : %s" % (
@@ -166,7 +181,24 @@ def create_dirs(dir_path, depth, num_of_dirs, num_of_files=0,
     for i in range(num_of_dirs):
         dirname = "dir%d" % i
         create_dirs(os.path.join(dir_path, dirname), depth - 1, num_of_dirs,
-                    num_of_files, fixed_file_size)
+                    num_of_files, fixed_file_size, base_file_name,
+                    file_types, size_dist, fsync, workers, stats, seed, root)
+
+
+def _create_dirs_with_report(files_written, bytes_written, seed, root,
+                             *args):
+    """Runs create_dirs in a process of its own, adding the files and the
+        bytes it wrote to the shared files_written and bytes_written.
+    """
+    stats = {'files': 0, 'bytes': 0}
+    try:
+        create_dirs(*args, stats=stats, seed=seed, root=root)
+    finally:
+        _close_pools()
+        with files_written.get_lock():
+            files_written.value += stats['files']
+        with bytes_written.get_lock():
+            bytes_written.value += stats['bytes']
 
 
 def create_deep_dirs(args):
@@ -233,6 +265,8 @@ def create_deep_dirs_with_files(args):
         fixed_file_size = None
     base_file_name = args.base_file_name
     dirname_start_num = args.dirname_start_num
+    (size_dist, fsync, workers) = _get_workload_args(args)
+    seed = getattr(args, 'seed', None)
 
     # Check if dir_path is '/'
     if is_root(dir_path):
@@ -248,19 +282,30 @@ def create_deep_dirs_with_files(args):
         os.remove("/tmp/file_dir_ops_create_dirs_rc")
 
     process_list = []
+    files_written = Value('q', 0)
+    bytes_written = Value('q', 0)
     for i in range(dirname_start_num, (dirname_start_num + dir_length)):
         num_of_dirs = random.choice(range(1, max_num_of_dirs + 1))
         process_dir_path = os.path.join(dir_path, "user%d" % i)
         process_list.append(Process(
-            target=create_dirs,
-            args=(process_dir_path, dir_depth, num_of_dirs, num_of_files,
-                  fixed_file_size, base_file_name, file_types)
+            target=_create_dirs_with_report,
+            args=(files_written, bytes_written, seed, dir_path,
+                  process_dir_path, dir_depth, num_of_dirs, num_of_files,
+                  fixed_file_size, base_file_name, file_types, size_dist,
+                  fsync, workers)
         ))
+    start_time = time.monotonic()
     for each_process in process_list:
         each_process.start()
 
     for each_process in process_list:
         each_process.join()
+    if fsync == 'end':
+        os.sync()
+    _print_workload_report({'files': files_written.value,
+                            'bytes': bytes_written.value},
+                           time.monotonic() - start_time,
+                           len(process_list) * workers)
     rc = 0
     if os.path.exists("/tmp/file_dir_ops_create_dirs_rc"):
         fd = open("/tmp/file_dir_ops_create_dirs_rc", "r")
@@ -270,26 +315,208 @@ def create_deep_dirs_with_files(args):
     return int(rc)
 
 
-def _create_file(file_abs_path, file_type, file_size):
+# The content of the text files is sliced out of a buffer of random
+# printable characters, generated once per process.
+_BUFFER_SIZE = 4 * 1048576
+_CHUNK_SIZE = 1048576
+_workload = {}
+# The content of the seeded files is made of blocks, each drawn from a
+# stream of its own. The size is drawn from a stream past the blocks.
+_SEED_BLOCK_SIZE = 65536
+_SEED_SIZE_STREAM = 1 << 40
+
+
+def _parse_size(size):
+    """Parses a size such as 513, 10k, 1M or 1.5G into bytes."""
+    units = {'k': 1024, 'K': 1024, 'M': 1048576, 'G': 1073741824}
+    if size[-1:] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+def _file_sizes(num_of_files, fixed_file_size=None, size_dist=None,
+                uniforms=None):
+    """Draws the sizes of the files, all at once.
+
+    Args:
+        num_of_files (int): Number of files.
+
+    Kwargs:
+        fixed_file_size (str): Size of all the files, e.g. 10k.
+        size_dist (str): Distribution of the sizes, one of
+            fixed:SIZE, choice:SIZE,SIZE,.., uniform:MIN:MAX or
+            lognormal:MEDIAN:SIGMA. Takes precedence over fixed_file_size.
+            Defaults to a choice of 1k, 10k, 512k and 1M.
+        uniforms (array): Two uniform draws in [0, 1) per file the sizes
+            are derived from, for the sizes of the seeded files to be
+            reproducible. Random draws if None.
+
+    Returns:
+        numpy array of the sizes in bytes.
+
+    Raises:
+        ValueError if the size or the distribution is invalid.
+    """
+    if size_dist is None:
+        size_dist = ('choice:1k,10k,512k,1M' if fixed_file_size is None
+                     else "fixed:%s" % fixed_file_size)
+    kind, _, params = size_dist.partition(':')
+    params = params.replace(',', ':').split(':')
+    if uniforms is None:
+        uniforms = np.random.random_sample((num_of_files, 2))
+    # The sizes are derived from the uniform draws by inverse transforms.
+    if kind == 'fixed' and len(params) == 1:
+        sizes = np.full(num_of_files, _parse_size(params[0]))
+    elif kind == 'choice':
+        choices = np.array([_parse_size(size) for size in params])
+        sizes = choices[(uniforms[:, 0] * len(choices)).astype(np.int64)]
+    elif kind == 'uniform' and len(params) == 2:
+        low = _parse_size(params[0])
+        high = _parse_size(params[1])
+        sizes = low + np.floor(uniforms[:, 0] * (high - low + 1))
+    elif kind == 'lognormal' and len(params) == 2:
+        normal = (np.sqrt(-2 * np.log1p(-uniforms[:, 0]))
+                  * np.cos(2 * np.pi * uniforms[:, 1]))
+        sizes = np.exp(np.log(_parse_size(params[0]))
+                       + float(params[1]) * normal)
+    else:
+        raise ValueError("Invalid size distribution %s" % size_dist)
+    if np.any(sizes < 0):
+        raise ValueError("Negative size in %s" % size_dist)
+    return sizes.astype(np.int64)
+
+
+def _seeded_key(seed, rel_path):
+    """The key of the content of a seeded file, out of the seed and the
+    path of the file relative to the root of its tree.
+    """
+    digest = hashlib.blake2b(rel_path.encode('utf-8', 'surrogateescape'),
+                             digest_size=16).digest()
+    return (seed, int.from_bytes(digest[:8], 'little'),
+            int.from_bytes(digest[8:], 'little'))
+
+
+def _seeded_words(key, stream, count):
+    """count 64 bit words of a stream of the key. The bit generator is
+    used directly, its output being stable across the numpy versions.
+    """
+    bit_generator = np.random.PCG64(np.random.SeedSequence(key + (stream,)))
+    return bit_generator.random_raw(count).astype('<u8')
+
+
+def _seeded_uniforms(key):
+    """The two uniform draws the size of a seeded file is derived from."""
+    return _seeded_words(key, _SEED_SIZE_STREAM, 2) / 2.0 ** 64
+
+
+def _seeded_content(key, offset, size):
+    """The content of a seeded file from offset, as printable characters,
+    each block of the content being a pure function of the key and of
+    the index of the block.
+    """
+    table = np.frombuffer(string.printable.encode(), dtype=np.uint8)
+    first = offset // _SEED_BLOCK_SIZE
+    last = (offset + size - 1) // _SEED_BLOCK_SIZE
+    blocks = [_seeded_words(key, block, _SEED_BLOCK_SIZE // 8).view(np.uint8)
+              for block in range(first, last + 1)]
+    content = table[np.concatenate(blocks) % len(table)]
+    start = offset - first * _SEED_BLOCK_SIZE
+    return content[start:start + size]
+
+
+def _seed(value):
+    """Parses a seed, a non negative integer."""
+    seed = int(value)
+    if seed < 0:
+        raise argparse.ArgumentTypeError("The seed can't be negative")
+    return seed
+
+
+def _get_random_buffer():
+    """The buffer of random printable characters of the process, as a
+    memoryview to be sliced without copies.
+    """
+    if _workload.get('pid') != os.getpid():
+        table = np.frombuffer(string.printable.encode(), dtype=np.uint8)
+        noise = np.frombuffer(os.urandom(_BUFFER_SIZE), dtype=np.uint8)
+        _workload.clear()
+        _workload.update(pid=os.getpid(), pools={},
+                         buffer=memoryview(table[noise % len(table)]
+                                           .tobytes()))
+    return _workload['buffer']
+
+
+def _get_pool(workers):
+    """The pool of the process writing the files, kept across the dirs."""
+    _get_random_buffer()
+    if workers not in _workload['pools']:
+        _workload['pools'][workers] = ThreadPool(workers)
+    return _workload['pools'][workers]
+
+
+def _close_pools():
+    """Closes the pools of the process."""
+    for pool in _workload.get('pools', {}).values():
+        pool.close()
+        pool.join()
+    _workload.pop('pools', None)
+    _workload.pop('pid', None)
+
+
+def _get_workload_args(args):
+    """The size distribution, the fsync policy and the number of workers
+    of the create commands.
+    """
+    return (getattr(args, 'size_dist', None),
+            getattr(args, 'fsync', None) or 'none',
+            getattr(args, 'workers', None) or os.cpu_count() or 1)
+
+
+def _print_workload_report(stats, seconds, workers):
+    """Prints the throughput achieved by the create commands."""
+    seconds = max(seconds, 1e-6)
+    print("Workload report: %s" % json.dumps({
+        'files': stats['files'], 'bytes': stats['bytes'],
+        'seconds': round(seconds, 3), 'workers': workers,
+        'files_per_sec': round(stats['files'] / seconds, 2),
+        'mb_per_sec': round(stats['bytes'] / 1048576.0 / seconds, 2)}))
+
+
+def _create_file(file_abs_path, file_type, file_size, fsync=False,
+                 key=None):
     rc = 0
 
     if file_type == 'txt':
         file_abs_path += ".txt"
+        buffer = _get_random_buffer()
 
-        with open(file_abs_path, "w+") as new_file:
-            try:
-                new_file.write(''.join(
-                    np.random.choice(list(string.printable), file_size)))
+        try:
+            with open(file_abs_path, "wb") as new_file:
+                remaining = file_size
+                while remaining > 0:
+                    size = min(remaining, _CHUNK_SIZE)
+                    if key is not None:
+                        new_file.write(_seeded_content(
+                            key, file_size - remaining, size))
+                    else:
+                        # Every chunk starts at a random offset, so that
+                        # the files don't share their content.
+                        offset = random.randrange(_BUFFER_SIZE - size + 1)
+                        new_file.write(buffer[offset:offset + size])
+                    remaining -= size
                 new_file.flush()
-                new_file.close()
-            except IOError as err:
-                print("Unable to write to file '%s' : %s" % (
-                    file_abs_path, err.strerror))
-                rc = 1
+                if fsync:
+                    os.fsync(new_file.fileno())
+        except (IOError, OSError) as err:
+            print("Unable to write to file '%s' : %s" % (
+                file_abs_path, err.strerror))
+            rc = 1
 
     elif file_type == 'empty_file':
         try:
             with open(file_abs_path, "w+") as new_file:
+                if fsync:
+                    os.fsync(new_file.fileno())
                 new_file.close()
         except IOError as err:
             print("Unable to write to file '%s' : %s" % (
@@ -300,15 +527,26 @@ def _create_file(file_abs_path, file_type, file_size):
 
 
 def _create_files(dir_path, num_of_files, fixed_file_size=None,
-                  base_file_name='testfile', file_types='txt'):
+                  base_file_name='testfile', file_types='txt',
+                  size_dist=None, fsync='none', workers=None, stats=None,
+                  seed=None, root=None):
+    """Creates num_of_files files under dir_path, written in parallel by
+        a pool of workers.
+
+    Kwargs:
+        size_dist (str): distribution of the file sizes, see _file_sizes.
+        fsync (str): 'file' to fsync every file, 'end' to sync once all
+            the files are written by the caller, 'none' not to sync.
+        workers (int): number of files written in parallel. Defaults to
+            the number of cores.
+        stats (dict): files and bytes written, updated in place.
+        seed (int): if given, the size and the content of every file are
+            a pure function of the seed and of the path of the file
+            relative to root, as checked by the verify command.
+        root (str): root of the tree. Defaults to dir_path.
+    """
     rc = 0
     file_types_list = file_types.split()
-    file_sizes_dict = {
-        '1k': 1024,
-        '10k': 10240,
-        '512k': 524288,
-        '1M': 1048576,
-    }
 
     # Create dir_path
     rc = create_dir(dir_path)
@@ -316,29 +554,40 @@ def _create_files(dir_path, num_of_files, fixed_file_size=None,
         return rc
 
     fname_abs_path = os.path.join(dir_path, base_file_name)
-    if fixed_file_size is None:
-        # this generator yields file tuples: (file name, file type, file size)
-        files = ((fname_abs_path + str(num),
-                  random.choice(file_types_list),
-                  random.choice(list(file_sizes_dict.values())))
-                 for num in range(num_of_files))
-    else:
-        try:
-            files = ((fname_abs_path + str(num),
-                      random.choice(file_types_list),
-                      file_sizes_dict[fixed_file_size])
-                     for num in range(num_of_files))
-        except KeyError:
-            print("File sizes can be [1k, 10k, 512k, 1M]")
-            return 1
+    types = [random.choice(file_types_list) for _ in range(num_of_files)]
+    keys = [None] * num_of_files
+    uniforms = None
+    if seed is not None:
+        keys = [_seeded_key(seed, os.path.relpath(
+            fname_abs_path + str(num) + ('.txt' if types[num] == 'txt'
+                                         else ''), root or dir_path))
+                for num in range(num_of_files)]
+        uniforms = np.array([_seeded_uniforms(key) for key in keys])
+        uniforms = uniforms.reshape(num_of_files, 2)
+
+    try:
+        sizes = _file_sizes(num_of_files, fixed_file_size, size_dist,
+                            uniforms)
+    except ValueError:
+        print("File sizes can be like 1k, 10k, 512k, 1M and the size "
+              "distributions fixed:SIZE, choice:SIZE,SIZE,.., "
+              "uniform:MIN:MAX or lognormal:MEDIAN:SIGMA")
+        return 1
 
-    # Thread per filetype (for now)
-    pool = ThreadPool(len(file_types_list))
-    ret = pool.map(lambda file_tuple: _create_file(*file_tuple), files)
-    pool.close()
-    pool.join()
+    files = [(fname_abs_path + str(num), types[num], int(sizes[num]),
+              fsync == 'file', keys[num]) for num in range(num_of_files)]
+
+    workers = workers or os.cpu_count() or 1
+    pool = _get_pool(workers)
+    ret = pool.map(lambda file_tuple: _create_file(*file_tuple), files,
+                   max(1, num_of_files // (workers * 4)))
     rc = 1 if any(ret) else 0
 
+    if stats is not None:
+        written = [not file_rc and file_type == 'txt' for (file_rc, file_type)
+                   in zip(ret, types)]
+        stats['files'] += ret.count(0)
+        stats['bytes'] += int(sizes[np.array(written, dtype=bool)].sum())
     return rc
 
 
@@ -354,6 +603,8 @@ def create_files(args):
         fixed_file_size = None
     base_file_name = args.base_file_name
     file_types = args.file_types
+    (size_dist, fsync, workers) = _get_workload_args(args)
+    seed = getattr(args, 'seed', None)
 
     # Check if dir_path is '/'
     if is_root(dir_path):
@@ -365,14 +616,156 @@ def create_files(args):
         return rc
 
     rc = 0
+    stats = {'files': 0, 'bytes': 0}
+    start_time = time.monotonic()
     for dirName, subdirList, fileList in os.walk(dir_path, topdown=False):
         _rc = _create_files(dirName, num_of_files, fixed_file_size,
-                            base_file_name, file_types)
+                            base_file_name, file_types, size_dist, fsync,
+                            workers, stats, seed, dir_path)
         if _rc != 0:
             rc = 1
+    _close_pools()
+    if fsync == 'end':
+        os.sync()
+    _print_workload_report(stats, time.monotonic() - start_time, workers)
     return rc
 
 
+def _verify_seeded_file(path, rel_path, seed, size_dist):
+    """Compares a file with the content it was seeded with, streaming it
+        chunk by chunk.
+
+    Returns:
+        (size, record) where record describes the first mismatch, or is
+        None if the file is intact.
+    """
+    key = _seeded_key(seed, rel_path)
+    try:
+        lstat = os.lstat(path)
+        if not stat_module.S_ISREG(lstat.st_mode):
+            return (0, None)
+        # Skip the dht link files of the bricks.
+        if not lstat.st_size and stat_module.S_IMODE(lstat.st_mode) == 0o1000:
+            return (0, None)
+        size = lstat.st_size
+        # The text files are seeded while the others are created empty.
+        expected = size
+        if size_dist is not None:
+            expected = 0
+            if path.endswith('.txt'):
+                expected = int(_file_sizes(1, None, size_dist,
+                                           _seeded_uniforms(key)
+                                           .reshape(1, 2))[0])
+        checked = min(size, expected) if path.endswith('.txt') else 0
+        with open(path, "rb") as file_fd:
+            chunk = bytearray(_CHUNK_SIZE)
+            offset = 0
+            while offset < checked:
+                length = file_fd.readinto(chunk)
+                if not length:
+                    break
+                length = min(length, checked - offset)
+                found = np.frombuffer(chunk, dtype=np.uint8, count=length)
+                diff = np.flatnonzero(
+                    found != _seeded_content(key, offset, length))
+                if len(diff):
+                    return (size, {'path': path, 'error': 'content',
+                                   'offset': offset + int(diff[0]),
+                                   'size': size, 'expected_size': expected})
+                offset += length
+    except (IOError, OSError) as err:
+        return (0, {'path': path, 'error': 'unreadable', 'offset': 0,
+                    'msg': err.strerror})
+    if size != expected:
+        return (size, {'path': path, 'error': 'size',
+                       'offset': min(size, expected), 'size': size,
+                       'expected_size': expected})
+    return (size, None)
+
+
+def _read_expected_files(expected_files):
+    """Reads the paths of the expected files, one per line relative to
+        the verified dir, from the given file or from the stdin if '-'.
+    """
+    if expected_files == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(expected_files) as expected_fd:
+            lines = expected_fd.read().splitlines()
+    return set(os.path.normpath(line) for line in lines if line)
+
+
+def verify(args):
+    """Verifies the files seeded by the create commands under 'dir',
+        recomputing the expected content on the fly. A json line is
+        printed for each file which doesn't match, with the offset of the
+        first mismatch, and for each expected file which is missing,
+        followed by a summary line.
+    """
+    dir_path = os.path.abspath(args.dir)
+    size_dist = args.size_dist
+    if size_dist is None and not args.skip_size_check:
+        size_dist = ('choice:1k,10k,512k,1M' if args.fixed_file_size is None
+                     else "fixed:%s" % args.fixed_file_size)
+    exclude = set(args.exclude or ['.glusterfs', '.trashcan'])
+    workers = args.workers or os.cpu_count() or 1
+
+    if not path_exists(dir_path):
+        print("Directory '%s' does not exist" % dir_path)
+        return 2
+    try:
+        if size_dist is not None:
+            _file_sizes(1, None, size_dist)
+    except ValueError as err:
+        print(err)
+        return 2
+    expected_files = None
+    if args.expected_files is not None:
+        try:
+            expected_files = _read_expected_files(args.expected_files)
+        except (IOError, OSError) as err:
+            print("Unable to read the expected files : %s" % err.strerror)
+            return 2
+
+    def _paths():
+        for (dir_name, subdir_list, file_list) in os.walk(dir_path):
+            subdir_list[:] = [name for name in subdir_list
+                              if name not in exclude]
+            for fname in file_list:
+                path = os.path.join(dir_name, fname)
+                rel_path = os.path.relpath(path, dir_path)
+                if expected_files is not None:
+                    expected_files.discard(rel_path)
+                yield (path, rel_path)
+
+    summary = {'files': 0, 'bytes': 0, 'mismatches': 0}
+    start_time = time.monotonic()
+    pool = ThreadPool(workers)
+    try:
+        for (size, record) in pool.imap_unordered(
+                lambda paths: _verify_seeded_file(*paths, args.seed,
+                                                  size_dist),
+                _paths(), 16):
+            summary['files'] += 1
+            summary['bytes'] += size
+            if record is not None:
+                summary['mismatches'] += 1
+                print(json.dumps(record))
+    finally:
+        pool.close()
+        pool.join()
+    for rel_path in sorted(expected_files or ()):
+        summary['mismatches'] += 1
+        print(json.dumps({'path': os.path.join(dir_path, rel_path),
+                          'error': 'missing', 'offset': 0}))
+    seconds = max(time.monotonic() - start_time, 1e-6)
+    summary.update(seconds=round(seconds, 3),
+                   mb_per_sec=round(summary['bytes'] / 1048576.0 / seconds,
+                                    2))
+    print(json.dumps({'summary': summary}))
+    return 1 if summary['mismatches'] else 0
+
+
 def rename(args):
     """Recursively rename all the files/dirs under 'dir' to
         "'filename'/'dirname' + '_postfix'".
@@ -443,7 +836,7 @@ def ls(args):
 def _get_path_stats(path):
     """Get the stat of a specified path."""
     rc = 0
-    path = os.path.abspath(args.path)
+    path = os.path.abspath(path)
     file_stats = {}
 
     if platform.system() == "Linux":
@@ -482,12 +875,54 @@ def _get_path_stats(path):
     return (rc, file_stats, err)
 
 
+def _get_path_stat_record(path):
+    """Get the stat of a specified path as a json record. The stat holds
+    the same fields as the printed stat, with the mode, owner and type of
+    the path itself and the rest following the symlinks.
+    """
+    record = {'path': path}
+    try:
+        record['stat'] = path_stat(path)
+    except OSError as err:
+        record['error'] = ("Unable to get the stat of path %s : %s"
+                           % (path, err.strerror))
+    return record
+
+
+def _print_path_stat_records(path, recursive):
+    """Print the stat record of the path, and of the files/dirs under it
+    if recursive, as one json line per path. The records are printed as
+    the paths are visited, hence the output is streamed.
+    """
+    if recursive and os.path.isdir(path):
+        def _paths():
+            for dirName, subdirList, fileList in os.walk(path,
+                                                         topdown=False):
+                yield dirName
+                for fname in fileList:
+                    yield os.path.join(dirName, fname)
+        paths = _paths()
+    else:
+        paths = [path]
+
+    rc = 0
+    for entry in paths:
+        record = _get_path_stat_record(entry)
+        if 'error' in record:
+            rc = 1
+        print(json.dumps(record))
+    return rc
+
+
 def get_path_stats(args):
     """Get file/dir Stat."""
     path = os.path.abspath(args.path)
     recursive = args.recursive
     log_file_name = args.log_file_name
 
+    if args.json:
+        return _print_path_stat_records(path, recursive)
+
     # Check if dir_path exists
     if not path_exists(path):
         print("PATH '%s' does not exist" % path)
@@ -977,8 +1412,8 @@ if __name__ == "__main__":
         metavar=('num_of_files'), dest='num_of_files', default=1,
         type=int)
     create_deep_dir_with_files_parser.add_argument(
-        '--fixed-file-size', help=("Fixed file size. The sizes can be "
-                                   "1k, 10k, 512k, 1M"),
+        '--fixed-file-size', help=("Fixed file size, e.g. 1k, 10k, 512k, "
+                                   "1M"),
         metavar=('file_size'), dest='fixed_file_size', type=str)
     create_deep_dir_with_files_parser.add_argument(
         '--base-file-name', help=("Base File Name"),
@@ -990,6 +1425,26 @@ if __name__ == "__main__":
                               " separated with space"),
         metavar=('file_types'), dest='file_types', type=str,
         default="txt")
+    create_deep_dir_with_files_parser.add_argument(
+        '--size-dist', help=("Distribution of the file sizes, one of "
+                             "fixed:SIZE, choice:SIZE,SIZE,.., "
+                             "uniform:MIN:MAX or lognormal:MEDIAN:SIGMA, "
+                             "e.g. uniform:1k:1M. Overrides the fixed "
+                             "file size"),
+        metavar=('size_dist'), dest='size_dist', type=str)
+    create_deep_dir_with_files_parser.add_argument(
+        '--fsync', help=("fsync every file, sync once at the end or "
+                         "don't sync"),
+        choices=['file', 'end', 'none'], dest='fsync', default='none')
+    create_deep_dir_with_files_parser.add_argument(
+        '--workers', help=("Number of files written in parallel. Defaults "
+                           "to the number of cores"),
+        metavar=('workers'), dest='workers', type=int)
+    create_deep_dir_with_files_parser.add_argument(
+        '--seed', help=("Seed the size and the content of the files by "
+                        "their path relative to 'dir', for the verify "
+                        "command to check them"),
+        metavar=('seed'), dest='seed', type=_seed)
     create_deep_dir_with_files_parser.add_argument(
         '--dirname-start-num',
         help="Start the directory naming from 'dirname-start-num'",
@@ -1011,8 +1466,8 @@ if __name__ == "__main__":
         metavar=('num_of_files'), dest='num_of_files', default=1,
         type=int)
     create_files_parser.add_argument(
-        '--fixed-file-size', help=("Fixed file size. The sizes can be "
-                                   "1k, 10k, 512k, 1M"),
+        '--fixed-file-size', help=("Fixed file size, e.g. 1k, 10k, 512k, "
+                                   "1M"),
         metavar=('file_size'), dest='fixed_file_size', type=str)
     create_files_parser.add_argument(
         '--base-file-name', help=("Base File Name"),
@@ -1024,11 +1479,73 @@ if __name__ == "__main__":
                               " separated with space"),
         metavar=('file_types'), dest='file_types', type=str,
         default="txt")
+    create_files_parser.add_argument(
+        '--size-dist', help=("Distribution of the file sizes, one of "
+                             "fixed:SIZE, choice:SIZE,SIZE,.., "
+                             "uniform:MIN:MAX or lognormal:MEDIAN:SIGMA, "
+                             "e.g. uniform:1k:1M. Overrides the fixed "
+                             "file size"),
+        metavar=('size_dist'), dest='size_dist', type=str)
+    create_files_parser.add_argument(
+        '--fsync', help=("fsync every file, sync once at the end or "
+                         "don't sync"),
+        choices=['file', 'end', 'none'], dest='fsync', default='none')
+    create_files_parser.add_argument(
+        '--workers', help=("Number of files written in parallel. Defaults "
+                           "to the number of cores"),
+        metavar=('workers'), dest='workers', type=int)
+    create_files_parser.add_argument(
+        '--seed', help=("Seed the size and the content of the files by "
+                        "their path relative to 'dir', for the verify "
+                        "command to check them"),
+        metavar=('seed'), dest='seed', type=_seed)
     create_files_parser.add_argument(
         'dir', metavar='DIR', type=str,
         help="Directory on which operations has to be performed")
     create_files_parser.set_defaults(func=create_files)
 
+    # Verify the seeded files under dir
+    verify_parser = subparsers.add_parser(
+        'verify',
+        help=("Verify the size and the content of the files under 'dir' "
+              "created with a seed, printing a json line per mismatch."),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    verify_parser.add_argument(
+        '--seed', help="Seed the files were created with",
+        metavar=('seed'), dest='seed', type=_seed, required=True)
+    verify_parser.add_argument(
+        '--fixed-file-size', help=("Fixed file size the files were created "
+                                   "with"),
+        metavar=('file_size'), dest='fixed_file_size', type=str)
+    verify_parser.add_argument(
+        '--size-dist', help=("Distribution of the file sizes the files "
+                             "were created with"),
+        metavar=('size_dist'), dest='size_dist', type=str)
+    verify_parser.add_argument(
+        '--skip-size-check', help=("Verify the content of the files "
+                                   "without checking their sizes"),
+        action='store_true', dest='skip_size_check')
+    verify_parser.add_argument(
+        '-e', '--exclude', help=("Name of the dirs not to descend into. "
+                                 "Can be repeated. Defaults to .glusterfs "
+                                 "and .trashcan"),
+        metavar=('name'), dest='exclude', action='append')
+    verify_parser.add_argument(
+        '--workers', help=("Number of files verified in parallel. Defaults "
+                           "to the number of cores"),
+        metavar=('workers'), dest='workers', type=int)
+    verify_parser.add_argument(
+        '--expected-files', help=("File listing the paths of the files "
+                                  "expected under 'dir', one per line "
+                                  "relative to 'dir', or '-' for the "
+                                  "stdin. The ones not found are reported "
+                                  "as missing"),
+        metavar=('file'), dest='expected_files', type=str)
+    verify_parser.add_argument(
+        'dir', metavar='DIR', type=str,
+        help="Directory on which operations has to be performed")
+    verify_parser.set_defaults(func=verify)
+
     # Rename all files/directories recursively under dir
     rename_parser = subparsers.add_parser(
         'mv',
@@ -1067,6 +1584,11 @@ if __name__ == "__main__":
         '-R', '--recursive',
         help="Recursively get the stat of files/dirs under given dir",
         dest='recursive', action='store_true')
+    stat_parser.add_argument(
+        '-j', '--json',
+        help=("Print the stat of each file/dir as a json line, "
+              "as it is taken"),
+        dest='json', action='store_true')
     stat_parser.add_argument(
         '-l', '--log-file',
         help="Redirect the output to specified log file name",
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Heal progress monitor for the bricks on a node. The xattrop index of each
+of the given bricks is polled and the count of the entries pending heal
+on every brick is printed as a json line, whenever a count changes and
+periodically otherwise, e.g.
+
+    {"time": 1625563742.125, "pending": {"/bricks/brick1/vol_b0": 42}}
+
+The monitor exits with 0 as soon as no heal is pending on any of the
+bricks and with 124 if the heal doesn't complete within the timeout.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def pending_heal_count(brick_path):
+    """
+    Counts the entries in the xattrop index of a brick, leaving out the
+    base index file. A missing index counts as no entries.
+    """
+    index_dir = os.path.join(brick_path, ".glusterfs", "indices", "xattrop")
+    try:
+        entries = os.listdir(index_dir)
+    except OSError:
+        return 0
+    return len([name for name in entries if "xattrop-" not in name])
+
+
+def main():
+    """
+    Main function of the monitor.
+    """
+    parser = argparse.ArgumentParser(
+        description="Monitor the pending heals on the bricks of the node")
+    parser.add_argument(
+        "bricks", nargs='+', metavar="BRICK",
+        help="Paths of the bricks to monitor")
+    parser.add_argument(
+        "-i", "--interval", type=float, dest="interval", default=0.5,
+        help="Time interval between two checks (Default:0.5)")
+    parser.add_argument(
+        "-r", "--report", type=float, dest="report", default=10,
+        help="Time interval after which the counts are printed even if "
+             "they didn't change (Default:10)")
+    parser.add_argument(
+        "-t", "--timeout", type=float, dest="timeout", default=1200,
+        help="Time after which the monitor gives up (Default:1200)")
+    args = parser.parse_args()
+
+    start = time.time()
+    last_pending = None
+    last_report = 0
+    while True:
+        now = time.time()
+        pending = dict((brick, pending_heal_count(brick))
+                       for brick in args.bricks)
+        if pending != last_pending or now - last_report >= args.report:
+            print(json.dumps({"time": round(now, 3), "pending": pending}))
+            sys.stdout.flush()
+            last_pending = pending
+            last_report = now
+
+        if not any(pending.values()):
+            return 0
+        if now - start >= args.timeout:
+            return 124
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
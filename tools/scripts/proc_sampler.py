@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Resource sampler for the gluster processes of a node. The /proc entries
+of all the glusterd, glusterfsd and glusterfs processes are read
+directly, without spawning any command, hence the processes can be
+sampled at sub second intervals by a single sampler per node.
+
+The samples of a test go to a directory of their own, OUTDIR/TESTNAME,
+holding,
+
+- sampler.json : the parameters of the sampling and of the node, along
+                 with the boot time, from which the start time of a
+                 process is told in epoch time.
+- procs.jsonl  : a json line per process, written when it is first seen,
+                 e.g. {"key": "1432-81234", "pid": 1432, "name":
+                 "glusterfsd", "role": "brick", "start": 81234,
+                 "cmdline": [...]}
+- KEY.samples  : the samples of a process, as fixed width records of
+                 little endian fields, appended and flushed per sample.
+
+    time (f8), rss (u8), vsz (u8), utime (u8), stime (u8),
+    read_bytes (u8), write_bytes (u8), threads (u4), fds (u4)
+
+The rss and vsz are in bytes, the utime and stime in clock ticks and the
+time is the epoch time of the sample. The key of a process is its pid
+and its start time, in clock ticks since the boot, so that a restarted
+process gets a file of its own.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+
+RECORD = struct.Struct("<dQQQQQQII")
+FIELDS = ("time", "rss", "vsz", "utime", "stime", "read_bytes",
+          "write_bytes", "threads", "fds")
+NAMES = ("glusterd", "glusterfsd", "glusterfs")
+
+_stop = []
+
+
+def proc_role(name, cmdline):
+    """
+    Tells the role of a gluster process from its command line.
+    """
+    if name in ("glusterd", "glusterfsd"):
+        return "glusterd" if name == "glusterd" else "brick"
+    args = " ".join(cmdline)
+    if "glustershd" in args or "shd/" in args:
+        return "shd"
+    if "--volfile-id" in args and cmdline and cmdline[-1].startswith("/"):
+        return "fuse"
+    return "other"
+
+
+def read_proc(pid):
+    """
+    Reads the stat line of a process.
+    Returns:
+        list: The fields following the command name.
+    """
+    with open("/proc/%d/stat" % pid, "rb") as stat_fd:
+        data = stat_fd.read()
+    # The command name is enclosed in parentheses and may contain spaces.
+    return data[data.rindex(b")") + 2:].split()
+
+
+def boot_time():
+    """
+    The epoch time at which the node booted.
+    """
+    with open("/proc/stat") as stat_fd:
+        for line in stat_fd:
+            if line.startswith("btime "):
+                return int(line.split()[1])
+    return None
+
+
+def read_io(pid):
+    """
+    Reads the bytes read and written by a process from the storage.
+    """
+    read_bytes = write_bytes = 0
+    try:
+        with open("/proc/%d/io" % pid, "rb") as io_fd:
+            for line in io_fd:
+                if line.startswith(b"read_bytes:"):
+                    read_bytes = int(line.split()[1])
+                elif line.startswith(b"write_bytes:"):
+                    write_bytes = int(line.split()[1])
+    except OSError:
+        pass
+    return (read_bytes, write_bytes)
+
+
+class Sampler:
+    """
+    Samples the gluster processes of the node into the test directory.
+    """
+
+    def __init__(self, outdir, with_fds=True):
+        self.outdir = outdir
+        self.with_fds = with_fds
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self.procs = {}
+        self.skipped = set()
+        self.index = open(os.path.join(outdir, "procs.jsonl"), "a")
+
+    def _discover(self):
+        """
+        Looks for the gluster processes which came up since the last
+        sample, and forgets the ones which went away.
+        """
+        pids = set(int(entry) for entry in os.listdir("/proc")
+                   if entry.isdigit())
+        for pid in list(self.procs):
+            if pid not in pids:
+                self.procs.pop(pid)[1].close()
+        self.skipped &= pids
+
+        for pid in pids - set(self.procs) - self.skipped:
+            try:
+                with open("/proc/%d/comm" % pid) as comm_fd:
+                    name = comm_fd.read().strip()
+                if name not in NAMES:
+                    self.skipped.add(pid)
+                    continue
+                with open("/proc/%d/cmdline" % pid, "rb") as cmd_fd:
+                    cmdline = [arg.decode("utf-8", "replace") for arg
+                               in cmd_fd.read().split(b"\0") if arg]
+                start = int(read_proc(pid)[19])
+            except (OSError, ValueError, IndexError):
+                continue
+
+            key = "%d-%d" % (pid, start)
+            self.index.write(json.dumps({
+                "key": key, "pid": pid, "name": name,
+                "role": proc_role(name, cmdline), "start": start,
+                "cmdline": cmdline,
+                "first_seen": time.time()}) + "\n")
+            self.index.flush()
+            samples = open(os.path.join(self.outdir, key + ".samples"), "ab")
+            self.procs[pid] = (start, samples)
+
+    def sample(self):
+        """
+        Takes a sample of every gluster process.
+        """
+        self._discover()
+        now = time.time()
+        for (pid, (start, samples)) in list(self.procs.items()):
+            try:
+                fields = read_proc(pid)
+                if int(fields[19]) != start:
+                    # The pid was taken by another process, which is
+                    # picked up by the next discovery.
+                    self.procs.pop(pid)[1].close()
+                    continue
+                fds = 0
+                if self.with_fds:
+                    fds = len(os.listdir("/proc/%d/fd" % pid))
+            except (OSError, ValueError):
+                continue
+            (read_bytes, write_bytes) = read_io(pid)
+            samples.write(RECORD.pack(
+                now, int(fields[21]) * self.page_size, int(fields[20]),
+                int(fields[11]), int(fields[12]), read_bytes, write_bytes,
+                int(fields[17]), fds))
+            samples.flush()
+
+    def close(self):
+        """
+        Closes the files of the sampler.
+        """
+        for (_, samples) in self.procs.values():
+            samples.close()
+        self.procs = {}
+        self.index.close()
+
+
+def main():
+    """
+    Main function of the sampler.
+    """
+    parser = argparse.ArgumentParser(
+        description="Sample the resource usage of the gluster processes")
+    parser.add_argument(
+        "-t", "--testname", type=str, dest="testname", required=True,
+        help="Test name for which the usage is sampled")
+    parser.add_argument(
+        "-o", "--outdir", type=str, dest="outdir",
+        default="/var/log/redant/samples",
+        help="Directory under which the samples of the test are written "
+             "(Default:/var/log/redant/samples)")
+    parser.add_argument(
+        "-i", "--interval", type=float, dest="interval", default=0.5,
+        help="Time interval between two samples (Default:0.5)")
+    parser.add_argument(
+        "-d", "--duration", type=float, dest="duration", default=0,
+        help="Time for which to sample, 0 being till killed (Default:0)")
+    parser.add_argument(
+        "-l", "--log-interval", type=float, dest="log_interval", default=0,
+        help="Time interval at which the usage is checked for leaks, "
+             "recorded for the analysis of the samples, 0 being the "
+             "interval of the samples (Default:0)")
+    parser.add_argument(
+        "--no-fds", action="store_false", dest="with_fds",
+        help="Don't count the open fds of the processes")
+    args = parser.parse_args()
+
+    outdir = os.path.join(args.outdir, args.testname)
+    os.makedirs(outdir, exist_ok=True)
+    with open(os.path.join(outdir, "sampler.json"), "w") as meta_fd:
+        json.dump({"host": socket.gethostname(), "start": time.time(),
+                   "interval": args.interval,
+                   "log_interval": args.log_interval or args.interval,
+                   "btime": boot_time(),
+                   "clk_tck": os.sysconf("SC_CLK_TCK"),
+                   "page_size": os.sysconf("SC_PAGE_SIZE"),
+                   "record": RECORD.format, "fields": FIELDS}, meta_fd)
+
+    # A kill ends the sampling cleanly, between two samples.
+    signal.signal(signal.SIGTERM, lambda *args: _stop.append(True))
+    signal.signal(signal.SIGHUP, lambda *args: _stop.append(True))
+
+    sampler = Sampler(outdir, args.with_fds)
+    start = time.monotonic()
+    tick = start
+    try:
+        while not _stop:
+            sampler.sample()
+            if args.duration and time.monotonic() - start >= args.duration:
+                break
+            # The samples are kept on a fixed grid, whatever the time
+            # taken by a sample.
+            tick = max(tick + args.interval, time.monotonic())
+            time.sleep(max(tick - time.monotonic(), 0))
+    finally:
+        sampler.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
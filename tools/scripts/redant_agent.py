@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Long lived helper agent for a node. The agent is started over an SSH
+channel and serves the requests of the framework in-process, sparing a
+python startup per helper call.
+
+The requests and the responses are json objects, each framed by a 4 byte
+big endian length, exchanged over the stdin and stdout of the agent.
+
+    request  : {"id": 7, "op": "stat", "args": {"path": "/mnt/vol/f1"}}
+    response : {"id": 7, "result": {...}}
+             | {"id": 7, "error": "<message>", "errno": 2}
+
+The agent exits when its stdin is closed, i.e. when the channel or the
+SSH session goes away.
+"""
+import ctypes
+import hashlib
+import json
+import os
+import struct
+import sys
+
+from stat_record import path_stat
+
+_HEADER = struct.Struct(">I")
+_hashfn = []
+
+
+def op_ping():
+    """
+    Liveness check.
+    """
+    return {"pid": os.getpid()}
+
+
+def op_stat(path):
+    """
+    Stat of a path in the form of the stat of the file_dir_ops script, as
+    parsed by get_file_stat. The mode, owner and type describe the path
+    itself while the rest follows the symlinks.
+    """
+    return path_stat(path)
+
+
+def op_walk(path):
+    """
+    The levels of os.walk under the path.
+    """
+    return [[root, dirs, files] for (root, dirs, files) in os.walk(path)]
+
+
+def op_hash(names):
+    """
+    The gf_dm_hashfn hash of each of the names.
+    """
+    if not _hashfn:
+        glusterfs = ctypes.cdll.LoadLibrary("libglusterfs.so.0")
+        _hashfn.append(glusterfs.gf_dm_hashfn)
+    return [ctypes.c_uint32(_hashfn[0](name.encode('ascii'),
+                                       len(name))).value
+            for name in names]
+
+
+def op_getxattr(path, name=None):
+    """
+    The hex encoded value of the given xattr, or of all the xattrs of the
+    path. The symlinks are followed, as getfattr does without -h.
+    """
+    names = [name] if name is not None else os.listxattr(path)
+    return dict((xname, "0x" + os.getxattr(path, xname).hex())
+                for xname in names)
+
+
+def op_checksum(path, algo="md5"):
+    """
+    The hex digest of the content of a file.
+    """
+    digest = hashlib.new(algo)
+    with open(path, "rb") as file_fd:
+        for chunk in iter(lambda: file_fd.read(1048576), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+OPS = {
+    "ping": op_ping,
+    "stat": op_stat,
+    "walk": op_walk,
+    "hash": op_hash,
+    "getxattr": op_getxattr,
+    "checksum": op_checksum
+}
+
+
+def _read_exact(stream, size):
+    """
+    Reads the given number of bytes, or returns None at the end of the
+    stream.
+    """
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def serve(in_stream, out_stream):
+    """
+    Serves the requests till the end of the input stream.
+    """
+    while True:
+        header = _read_exact(in_stream, _HEADER.size)
+        if header is None:
+            return 0
+        body = _read_exact(in_stream, _HEADER.unpack(header)[0])
+        if body is None:
+            return 0
+
+        request = json.loads(body.decode())
+        response = {"id": request.get("id")}
+        try:
+            if request.get("op") not in OPS:
+                raise ValueError("Unknown op %s" % request.get("op"))
+            response["result"] = OPS[request["op"]](
+                **request.get("args", {}))
+        except OSError as error:
+            response["error"] = str(error)
+            response["errno"] = error.errno or -1
+        except Exception as error:
+            response["error"] = "%s: %s" % (type(error).__name__, error)
+            response["errno"] = -1
+
+        data = json.dumps(response, separators=(",", ":")).encode()
+        out_stream.write(_HEADER.pack(len(data)) + data)
+        out_stream.flush()
+
+
+def main():
+    """
+    Main function of the agent.
+    """
+    out_stream = sys.stdout.buffer
+    # Nothing else may write to the channel in between the responses.
+    sys.stdout = sys.stderr
+    return serve(sys.stdin.buffer, out_stream)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+The stat of a path as a json serialisable record, shared by the helper
+scripts and the helper agent which report it ( file_dir_ops.py,
+tree_scan.py and redant_agent.py ). The record holds the fields of
+'stat -c "%A %U %G %a %F"' along with those of os.stat, as parsed by
+get_file_stat.
+"""
+import grp
+import os
+import pwd
+import stat
+
+
+def file_type(mode, size):
+    """
+    Describes the type of a file the way 'stat -c %F' does.
+    """
+    if stat.S_ISREG(mode):
+        return "regular empty file" if size == 0 else "regular file"
+    if stat.S_ISDIR(mode):
+        return "directory"
+    if stat.S_ISLNK(mode):
+        return "symbolic link"
+    if stat.S_ISFIFO(mode):
+        return "fifo"
+    if stat.S_ISSOCK(mode):
+        return "socket"
+    if stat.S_ISCHR(mode):
+        return "character special file"
+    if stat.S_ISBLK(mode):
+        return "block special file"
+    return "weird file"
+
+
+def path_stat(path):
+    """
+    Stat of a path. The mode, owner and type describe the path itself
+    while the rest follows the symlinks, hence an OSError is raised for a
+    dangling symlink, as for a missing path.
+    """
+    lstat = os.lstat(path)
+    fstat = os.stat(path)
+    try:
+        user = pwd.getpwuid(lstat.st_uid).pw_name
+    except KeyError:
+        user = "UNKNOWN"
+    try:
+        group = grp.getgrgid(lstat.st_gid).gr_name
+    except KeyError:
+        group = "UNKNOWN"
+
+    stat_res = {
+        "mode": stat.filemode(lstat.st_mode),
+        "user": user,
+        "group": group,
+        "permission": int("%o" % stat.S_IMODE(lstat.st_mode)),
+        "fileType": file_type(lstat.st_mode, lstat.st_size),
+        "atime": repr(fstat.st_atime),
+        "mtime": repr(fstat.st_mtime),
+        "ctime": repr(fstat.st_ctime),
+        "inode": fstat.st_ino
+    }
+    for field in ("st_mode", "st_ino", "st_dev", "st_nlink", "st_uid",
+                  "st_gid", "st_size"):
+        stat_res[field] = getattr(fstat, field)
+    for field in ("st_atime", "st_mtime", "st_ctime"):
+        stat_res[field] = int(getattr(fstat, field))
+    return stat_res
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Bulk introspection of a directory tree on a mount or a brick. The stat,
+the selected xattrs and optionally the pathinfo of the root and of every
+entry under it are collected in a single pass and printed as one json
+line per entry, in the order of a top down walk, e.g.
+
+    {"path": "/bricks/brick1/vol_b0/d1", "stat": {...},
+     "xattrs": {"trusted.gfid": "0x6f1c..."}, "pathinfo": "(<DISTRI..>)"}
+
+The stat holds the same fields as that of 'file_dir_ops.py stat --json'.
+The xattrs are hex encoded, an xattr which isn't set being left out, and
+the symlinks are followed as getfattr does. A path which can't be
+stat'ed, like a dangling symlink, is printed with an "error" instead.
+"""
+import argparse
+import errno
+import fnmatch
+import json
+import os
+import sys
+
+from stat_record import path_stat
+
+DEFAULT_XATTRS = ("trusted.glusterfs.dht", "trusted.gfid",
+                  "trusted.glusterfs.dht.linkto", "trusted.afr.*")
+
+
+def path_xattrs(path, patterns):
+    """
+    The hex encoded values of the xattrs of the path matching the
+    patterns, following the symlinks. The names are listed only when
+    a pattern has a wildcard.
+    """
+    if any("*" in pattern for pattern in patterns):
+        names = [name for name in os.listxattr(path)
+                 if any(fnmatch.fnmatchcase(name, pattern)
+                        for pattern in patterns)]
+    else:
+        names = patterns
+
+    xattrs = {}
+    for name in names:
+        try:
+            value = os.getxattr(path, name)
+        except OSError as error:
+            if error.errno in (errno.ENODATA, errno.ENOTSUP):
+                continue
+            raise
+        xattrs[name] = "0x" + value.hex()
+    return xattrs
+
+
+def path_record(path, patterns, pathinfo):
+    """
+    The record of a path.
+    """
+    record = {"path": path}
+    try:
+        record["stat"] = path_stat(path)
+        if patterns:
+            record["xattrs"] = path_xattrs(path, patterns)
+        if pathinfo == "all" or (pathinfo == "dirs"
+                                 and record["stat"]["fileType"]
+                                 == "directory"):
+            try:
+                value = os.getxattr(path, "trusted.glusterfs.pathinfo")
+                record["pathinfo"] = value.rstrip(b"\0").decode(
+                    "utf-8", "replace")
+            except OSError as error:
+                if error.errno not in (errno.ENODATA, errno.ENOTSUP):
+                    raise
+    except OSError as error:
+        record["error"] = ("Unable to scan path %s : %s"
+                           % (path, error.strerror))
+    return record
+
+
+def scan(root, patterns, pathinfo, exclude):
+    """
+    Prints the records of the root and of the entries under it, as they
+    are visited. The directories named in exclude aren't descended into.
+    """
+    emit = sys.stdout.write
+    emit(json.dumps(path_record(root, patterns, pathinfo)) + "\n")
+    for (dirpath, dirs, files) in os.walk(root):
+        dirs[:] = [name for name in dirs if name not in exclude]
+        for name in dirs + files:
+            record = path_record(os.path.join(dirpath, name), patterns,
+                                 pathinfo)
+            emit(json.dumps(record) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    """
+    Main function of the scanner.
+    """
+    parser = argparse.ArgumentParser(
+        description="Print the stat, xattrs and pathinfo of every entry "
+                    "of a tree as json lines")
+    parser.add_argument(
+        "root", metavar="ROOT", help="Root of the tree to scan")
+    parser.add_argument(
+        "-x", "--xattr", action="append", dest="xattrs", metavar="NAME",
+        help="Xattr to collect, a '*' matching any characters. Can be "
+             "repeated (Default:%s)" % ",".join(DEFAULT_XATTRS))
+    parser.add_argument(
+        "--no-xattrs", action="store_true", dest="no_xattrs",
+        help="Don't collect any xattr")
+    parser.add_argument(
+        "-p", "--pathinfo", nargs="?", const="all", choices=["all", "dirs"],
+        dest="pathinfo", help="Collect the pathinfo, on a glusterfs mount, "
+                              "of all the entries or of the directories "
+                              "only (Default:all)")
+    parser.add_argument(
+        "-e", "--exclude", action="append", dest="exclude", default=[],
+        metavar="NAME", help="Name of the directories not to descend "
+                             "into, e.g. .glusterfs. Can be repeated")
+    args = parser.parse_args()
+
+    patterns = []
+    if not args.no_xattrs:
+        patterns = args.xattrs or list(DEFAULT_XATTRS)
+    root = os.path.normpath(args.root)
+    if not os.path.lexists(root):
+        sys.stderr.write("Path %s doesn't exist\n" % root)
+        return 2
+    scan(root, patterns, args.pathinfo, set(args.exclude))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
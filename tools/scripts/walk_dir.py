@@ -14,13 +14,26 @@
 #  with this program; if not, write to the Free Software Foundation, Inc.,
 #  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
+# Usage: walk_dir.py [--json] ROOTDIR
+#
+# By default the levels of os.walk under the rootdir are printed as a
+# single python list. With --json, each level is printed as a json line,
+# [root, dirs, files], as soon as it is walked.
+
 from __future__ import print_function
+import json
 import os
 import sys
 
-rootdir = sys.argv[1]
+args = sys.argv[1:]
+json_output = "--json" in args
+rootdir = [arg for arg in args if arg != "--json"][0]
 
-list_of_levels = []
-for level in os.walk(rootdir):
-    list_of_levels.append(level)
-print(list_of_levels)
+if json_output:
+    for level in os.walk(rootdir):
+        print(json.dumps(level))
+else:
+    list_of_levels = []
+    for level in os.walk(rootdir):
+        list_of_levels.append(level)
+    print(list_of_levels)